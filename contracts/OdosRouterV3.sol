@@ -5,6 +5,7 @@ import "../interfaces/IOdosRouterV3.sol";
 import "../interfaces/IOdosExecutor.sol";
 import "../interfaces/IOdosHook.sol";
 import "../interfaces/ISignatureTransfer.sol";
+import "../interfaces/IAllowanceTransfer.sol";
 
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
@@ -349,6 +350,67 @@ contract OdosRouterV3 is IOdosRouterV3, Ownable2Step {
     );
   }
 
+  /// @notice Externally facing interface for swapping two tokens with a standing Permit2 allowance
+  /// @param permit2 Address of the Permit2 contract holding the allowance for the router
+  /// @param tokenInfo All information about the tokens being swapped
+  /// @param pathDefinition Encoded path definition for executor
+  /// @param executor Address of contract that will execute the path
+  /// @param referralInfo referral info to specify the source of and fee for the swap
+  function swapPermit2Allowance(
+    address permit2,
+    swapTokenInfo memory tokenInfo,
+    bytes calldata pathDefinition,
+    address executor,
+    swapReferralInfo memory referralInfo
+  )
+    external
+    returns (uint256 amountOut)
+  {
+    return _swapPermit2Allowance(
+      permit2,
+      tokenInfo,
+      pathDefinition,
+      executor,
+      referralInfo
+    );
+  }
+
+  /// @notice Internal function for transferring through an existing Permit2 allowance before a swap
+  /// @param permit2 Address of the Permit2 contract holding the allowance for the router
+  /// @param tokenInfo All information about the tokens being swapped
+  /// @param pathDefinition Encoded path definition for executor
+  /// @param executor Address of contract that will execute the path
+  /// @param referralInfo referral info to specify the source of and fee for the swap
+  function _swapPermit2Allowance(
+    address permit2,
+    swapTokenInfo memory tokenInfo,
+    bytes calldata pathDefinition,
+    address executor,
+    swapReferralInfo memory referralInfo
+  )
+    internal
+    returns (uint256 amountOut)
+  {
+    // Support rebasing tokens by allowing the user to trade the entire balance
+    if (tokenInfo.inputAmount == 0) {
+      tokenInfo.inputAmount = IERC20(tokenInfo.inputToken).balanceOf(msg.sender);
+    }
+    require(tokenInfo.inputAmount <= type(uint160).max, "Amount too large");
+
+    IAllowanceTransfer(permit2).transferFrom(
+      msg.sender,
+      tokenInfo.inputReceiver,
+      uint160(tokenInfo.inputAmount),
+      tokenInfo.inputToken
+    );
+    return _swap(
+      tokenInfo,
+      pathDefinition,
+      executor,
+      referralInfo
+    );
+  }
+
   /// @notice contains the main logic for swapping one token for another
   /// Assumes input tokens have already been sent to their destinations and
   /// that msg.value is set to expected ETH input value, or 0 for ERC20 input
@@ -801,6 +863,92 @@ contract OdosRouterV3 is IOdosRouterV3, Ownable2Step {
     );
   }
 
+  /// @notice Externally facing function for swapping between two sets of tokens with a standing Permit2 allowance
+  /// @param permit2 Address of the Permit2 contract holding the allowances for the router
+  /// @param inputs list of input token structs for the path being executed
+  /// @param outputs list of output token structs for the path being executed
+  /// @param pathDefinition Encoded path definition for executor
+  /// @param executor Address of contract that will execute the path
+  /// @param referralInfo referral info to specify the source of and fee for the swap
+  function swapMultiPermit2Allowance(
+    address permit2,
+    inputTokenInfo[] memory inputs,
+    outputTokenInfo[] memory outputs,
+    bytes calldata pathDefinition,
+    address executor,
+    swapReferralInfo memory referralInfo
+  )
+    external
+    payable
+    returns (uint256[] memory amountsOut)
+  {
+    return _swapMultiPermit2Allowance(
+      permit2,
+      inputs,
+      outputs,
+      pathDefinition,
+      executor,
+      referralInfo
+    );
+  }
+
+  /// @notice Internal function for transferring through existing Permit2 allowances before swapping multiple tokens
+  /// @param permit2 Address of the Permit2 contract holding the allowances for the router
+  /// @param inputs list of input token structs for the path being executed
+  /// @param outputs list of output token structs for the path being executed
+  /// @param pathDefinition Encoded path definition for executor
+  /// @param executor Address of contract that will execute the path
+  /// @param referralInfo referral info to specify the source of and fee for the swap
+  function _swapMultiPermit2Allowance(
+    address permit2,
+    inputTokenInfo[] memory inputs,
+    outputTokenInfo[] memory outputs,
+    bytes calldata pathDefinition,
+    address executor,
+    swapReferralInfo memory referralInfo
+  )
+    internal
+    returns (uint256[] memory amountsOut)
+  {
+    IAllowanceTransfer.AllowanceTransferDetails[] memory transferDetails = 
+      new IAllowanceTransfer.AllowanceTransferDetails[](msg.value > 0 ? inputs.length - 1 : inputs.length);
+    {
+      uint256 expected_msg_value = 0;
+      for (uint256 i = 0; i < inputs.length; i++) {
+
+        if (inputs[i].tokenAddress == _ETH) {
+          if (inputs[i].amountIn == 0) {
+            inputs[i].amountIn = msg.value;
+          }
+          expected_msg_value = inputs[i].amountIn;
+        }
+        else {
+          if (inputs[i].amountIn == 0) {
+            inputs[i].amountIn = IERC20(inputs[i].tokenAddress).balanceOf(msg.sender);
+          }
+          require(inputs[i].amountIn <= type(uint160).max, "Amount too large");
+
+          uint256 transfer_index = expected_msg_value == 0 ? i : i - 1;
+
+          transferDetails[transfer_index].from = msg.sender;
+          transferDetails[transfer_index].to = inputs[i].receiver;
+          transferDetails[transfer_index].amount = uint160(inputs[i].amountIn);
+          transferDetails[transfer_index].token = inputs[i].tokenAddress;
+        }
+      }
+      require(msg.value == expected_msg_value, "Wrong msg.value");
+    }
+    IAllowanceTransfer(permit2).transferFrom(transferDetails);
+
+    return _swapMulti(
+      inputs,
+      outputs,
+      pathDefinition,
+      executor,
+      referralInfo
+    );
+  }
+
   /// @notice contains the main logic for swapping between two sets of tokens
   /// assumes that inputs have already been sent to the right location and msg.value
   /// is set correctly to be 0 for no native input and match native inpuit otherwise
@@ -939,11 +1087,23 @@ contract OdosRouterV3 is IOdosRouterV3, Ownable2Step {
     external
     onlyOwner
   {
+    emit AddressListAppended(addressList.length, addresses);
+
     for (uint256 i = 0; i < addresses.length; i++) {
       addressList.push(addresses[i]);
     }
   }
 
+  /// @notice Number of addresses in the cached address list
+  /// @return length of the cached address list
+  function addressListLength()
+    external
+    view
+    returns (uint256)
+  {
+    return addressList.length;
+  }
+
   /// @notice Allows the owner to transfer funds held by the router contract
   /// @param tokens List of token address to be transferred
   /// @param amounts List of amounts of each token to be transferred
@@ -983,6 +1143,167 @@ contract OdosRouterV3 is IOdosRouterV3, Ownable2Step {
   {
     require(msg.sender == liquidatorAddress || msg.sender == owner(), "Address not allowed");
 
+    return _swapRouterFunds(
+      inputs,
+      outputs,
+      pathDefinition,
+      executor
+    );
+  }
+
+  /// @notice Directly swap funds held in router along several paths in one transaction
+  /// @param swaps list of router fund swaps to be executed in order
+  function swapRouterFundsBatch(
+    routerFundsSwapInfo[] calldata swaps
+  )
+    external
+    returns (uint256[][] memory amountsOut)
+  {
+    require(msg.sender == liquidatorAddress || msg.sender == owner(), "Address not allowed");
+
+    amountsOut = new uint256[][](swaps.length);
+
+    for (uint256 i = 0; i < swaps.length; i++) {
+      amountsOut[i] = _swapRouterFunds(
+        swaps[i].inputs,
+        swaps[i].outputs,
+        swaps[i].pathDefinition,
+        swaps[i].executor
+      );
+    }
+  }
+
+  /// @notice Custom decoder to swap batches of router funds with compact calldata
+  function swapRouterFundsCompact()
+    external
+    returns (uint256[][] memory amountsOut)
+  {
+    require(msg.sender == liquidatorAddress || msg.sender == owner(), "Address not allowed");
+
+    // The swap count is only read through amountsOut.length so it does not hold a stack slot
+    // through the decoding loop below
+    {
+      uint256 numSwaps;
+      assembly {
+        numSwaps := shr(248, calldataload(4))
+      }
+      amountsOut = new uint256[][](numSwaps);
+    }
+    uint256 pos = 5;
+    for (uint256 s = 0; s < amountsOut.length; s++) {
+      address executor;
+
+      inputTokenInfo[] memory inputs;
+      outputTokenInfo[] memory outputs;
+      {
+        uint256 numInputs;
+        uint256 numOutputs;
+
+        assembly {
+          numInputs := shr(248, calldataload(pos))
+          numOutputs := shr(248, calldataload(add(pos, 1)))
+        }
+        inputs = new inputTokenInfo[](numInputs);
+        outputs = new outputTokenInfo[](numOutputs);
+      }
+      bytes calldata pathDefinition;
+
+      assembly {
+        // Define function to load in token address, either from calldata or from storage
+        function getAddress(currPos) -> result, newPos {
+          let inputPos := shr(240, calldataload(currPos))
+
+          switch inputPos
+          // Reserve the null address as a special case that can be specified with 2 null bytes
+          case 0x0000 {
+            newPos := add(currPos, 2)
+          }
+          // This case means that the address is encoded in the calldata directly following the code
+          case 0x0001 {
+            result := and(shr(80, calldataload(currPos)), 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF)
+            newPos := add(currPos, 22)
+          }
+          // Otherwise we use the case to load in from the cached address list
+          default {
+            result := sload(add(addressListStart, sub(inputPos, 2)))
+            newPos := add(currPos, 2)
+          }
+        }
+        pos := add(pos, 2)
+        executor, pos := getAddress(pos)
+
+        let result := 0
+        let memPos := 0
+
+        for { let element := 0 } lt(element, mload(inputs)) { element := add(element, 1) }
+        {
+          memPos := mload(add(inputs, add(mul(element, 0x20), 0x20)))
+
+          // Load in the token address
+          result, pos := getAddress(pos)
+          mstore(memPos, result)
+
+          // Load in the input amount - a 0 byte means the full router balance is to be used
+          let inputAmountLength := shr(248, calldataload(pos))
+          pos := add(pos, 1)
+
+          if inputAmountLength {
+            mstore(add(memPos, 0x20), shr(mul(sub(32, inputAmountLength), 8), calldataload(pos)))
+            pos := add(pos, inputAmountLength)
+          }
+          result, pos := getAddress(pos)
+          if eq(result, 0) { result := executor }
+
+          mstore(add(memPos, 0x40), result)
+        }
+        for { let element := 0 } lt(element, mload(outputs)) { element := add(element, 1) }
+        {
+          memPos := mload(add(outputs, add(mul(element, 0x20), 0x20)))
+
+          // Load in the token address
+          result, pos := getAddress(pos)
+          mstore(memPos, result)
+
+          // Load in the minimum output amount
+          let outputMinLength := shr(248, calldataload(pos))
+          pos := add(pos, 1)
+
+          if outputMinLength {
+            mstore(add(memPos, 0x40), shr(mul(sub(32, outputMinLength), 8), calldataload(pos)))
+            pos := add(pos, outputMinLength)
+          }
+          // Zero denotes msg.sender
+          result, pos := getAddress(pos)
+          mstore(add(memPos, 0x60), result)
+        }
+        // Set the offset and size for the pathDefinition portion of the msg.data
+        pathDefinition.length := mul(shr(248, calldataload(pos)), 32)
+        pathDefinition.offset := add(pos, 1)
+        pos := add(pathDefinition.offset, pathDefinition.length)
+      }
+      amountsOut[s] = _swapRouterFunds(
+        inputs,
+        outputs,
+        pathDefinition,
+        executor
+      );
+    }
+  }
+
+  /// @notice Internal logic for swapping funds held in router
+  /// @param inputs list of input token structs for the path being executed
+  /// @param outputs list of output token structs for the path being executed
+  /// @param pathDefinition Encoded path definition for executor
+  /// @param executor Address of contract that will execute the path
+  function _swapRouterFunds(
+    inputTokenInfo[] memory inputs,
+    outputTokenInfo[] memory outputs,
+    bytes calldata pathDefinition,
+    address executor
+  )
+    internal
+    returns (uint256[] memory amountsOut)
+  {
     uint256[] memory amountsIn = new uint256[](inputs.length);
     address[] memory tokensIn = new address[](inputs.length);
 
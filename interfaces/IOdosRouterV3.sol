@@ -36,6 +36,13 @@ interface IOdosRouterV3 {
     uint256 amountMin;
     address receiver;
   }
+  /// @dev Contains all information needed to describe one swap of router funds
+  struct routerFundsSwapInfo {
+    inputTokenInfo[] inputs;
+    outputTokenInfo[] outputs;
+    bytes pathDefinition;
+    address executor;
+  }
   /// @dev Holds all information for a given referral
   struct swapReferralInfo {
     uint64 code;
@@ -45,6 +52,9 @@ interface IOdosRouterV3 {
   /// @dev Event emitted on changing the liquidator address
   event LiquidatorAddressChanged(address indexed account);
 
+  /// @dev Event emitted on appending addresses to the cached address list
+  event AddressListAppended(uint256 startIndex, address[] addresses);
+
   // @dev event for swapping one token for another
   event Swap(
     address sender,
@@ -89,6 +99,15 @@ interface IOdosRouterV3 {
   )
     external returns (uint256 amountOut);
 
+  function swapPermit2Allowance(
+    address permit2,
+    swapTokenInfo memory tokenInfo,
+    bytes calldata pathDefinition,
+    address executor,
+    swapReferralInfo memory referralInfo
+  )
+    external returns (uint256 amountOut);
+
   function swapMultiCompact() external payable returns (uint256[] memory amountsOut);
 
   function swapMulti(
@@ -110,6 +129,16 @@ interface IOdosRouterV3 {
   )
     external payable returns (uint256[] memory amountsOut);
 
+  function swapMultiPermit2Allowance(
+    address permit2,
+    inputTokenInfo[] memory inputs,
+    outputTokenInfo[] memory outputs,
+    bytes calldata pathDefinition,
+    address executor,
+    swapReferralInfo memory referralInfo
+  )
+    external payable returns (uint256[] memory amountsOut);
+
   function changeLiquidatorAddress(address account)
     external;
 
@@ -118,6 +147,11 @@ interface IOdosRouterV3 {
   ) 
     external;
 
+  function addressListLength()
+    external
+    view
+    returns (uint256);
+
   function transferRouterFunds(
     address[] calldata tokens,
     uint256[] calldata amounts,
@@ -133,4 +167,14 @@ interface IOdosRouterV3 {
   )
     external
     returns (uint256[] memory amountsOut);
+
+  function swapRouterFundsBatch(
+    routerFundsSwapInfo[] calldata swaps
+  )
+    external
+    returns (uint256[][] memory amountsOut);
+
+  function swapRouterFundsCompact()
+    external
+    returns (uint256[][] memory amountsOut);
 }
\ No newline at end of file
@@ -0,0 +1,416 @@
+# Specialized ABI encoders for the router entry points. The argument layouts are fixed, so every
+# head word and tail offset is written directly instead of walking the types like eth_abi does.
+# Arguments are given as they would be to eth_abi: structs as tuples in field order, addresses as
+# hex strings and bytes as bytes or hex strings. Structs may also be structs module instances,
+# whose cached encodings are used as they are
+SELECTORS = {
+    "swap": bytes.fromhex("30f80b4c"),
+    "swapWithHook": bytes.fromhex("57cfd3d4"),
+    "swapPermit2": bytes.fromhex("cab34731"),
+    "swapPermit2WithHook": bytes.fromhex("e8668cac"),
+    "swapPermit2Allowance": bytes.fromhex("43a2658f"),
+    "swapMulti": bytes.fromhex("fef828dc"),
+    "swapMultiWithHook": bytes.fromhex("638cc0fa"),
+    "swapMultiPermit2": bytes.fromhex("108e3a77"),
+    "swapMultiPermit2WithHook": bytes.fromhex("0d459c08"),
+    "swapMultiPermit2Allowance": bytes.fromhex("42f7716a"),
+    "swapRouterFunds": bytes.fromhex("98281469"),
+    "swapRouterFundsBatch": bytes.fromhex("3c375c95"),
+    "transferRouterFunds": bytes.fromhex("174da621"),
+}
+
+# Argument types of every entry point, as eth_abi type strings
+SWAP_TOKEN_INFO = "(address,uint256,address,address,uint256,uint256,address)"
+SWAP_REFERRAL_INFO = "(uint64,uint64,address)"
+PERMIT2_INFO = "(address,uint256,uint256,bytes)"
+INPUT_TOKEN_INFO_ARRAY = "(address,uint256,address)[]"
+OUTPUT_TOKEN_INFO_ARRAY = "(address,uint256,uint256,address)[]"
+ROUTER_FUNDS_SWAP_INFO_ARRAY = (
+    f"({INPUT_TOKEN_INFO_ARRAY},{OUTPUT_TOKEN_INFO_ARRAY},bytes,address)[]"
+)
+
+ARGUMENT_TYPES = {
+    "swap": [SWAP_TOKEN_INFO, "bytes", "address", SWAP_REFERRAL_INFO],
+    "swapWithHook": [SWAP_TOKEN_INFO, "bytes", "address", SWAP_REFERRAL_INFO, "address", "bytes"],
+    "swapPermit2": [PERMIT2_INFO, SWAP_TOKEN_INFO, "bytes", "address", SWAP_REFERRAL_INFO],
+    "swapPermit2WithHook": [
+        PERMIT2_INFO, SWAP_TOKEN_INFO, "bytes", "address", SWAP_REFERRAL_INFO, "address", "bytes"
+    ],
+    "swapPermit2Allowance": ["address", SWAP_TOKEN_INFO, "bytes", "address", SWAP_REFERRAL_INFO],
+    "swapMulti": [
+        INPUT_TOKEN_INFO_ARRAY, OUTPUT_TOKEN_INFO_ARRAY, "bytes", "address", SWAP_REFERRAL_INFO
+    ],
+    "swapMultiWithHook": [
+        INPUT_TOKEN_INFO_ARRAY,
+        OUTPUT_TOKEN_INFO_ARRAY,
+        "bytes",
+        "address",
+        SWAP_REFERRAL_INFO,
+        "address",
+        "bytes",
+    ],
+    "swapMultiPermit2": [
+        PERMIT2_INFO,
+        INPUT_TOKEN_INFO_ARRAY,
+        OUTPUT_TOKEN_INFO_ARRAY,
+        "bytes",
+        "address",
+        SWAP_REFERRAL_INFO,
+    ],
+    "swapMultiPermit2WithHook": [
+        PERMIT2_INFO,
+        INPUT_TOKEN_INFO_ARRAY,
+        OUTPUT_TOKEN_INFO_ARRAY,
+        "bytes",
+        "address",
+        SWAP_REFERRAL_INFO,
+        "address",
+        "bytes",
+    ],
+    "swapMultiPermit2Allowance": [
+        "address",
+        INPUT_TOKEN_INFO_ARRAY,
+        OUTPUT_TOKEN_INFO_ARRAY,
+        "bytes",
+        "address",
+        SWAP_REFERRAL_INFO,
+    ],
+    "swapRouterFunds": [INPUT_TOKEN_INFO_ARRAY, OUTPUT_TOKEN_INFO_ARRAY, "bytes", "address"],
+    "swapRouterFundsBatch": [ROUTER_FUNDS_SWAP_INFO_ARRAY],
+    "transferRouterFunds": ["address[]", "uint256[]", "address"],
+}
+
+_ZERO_PADDING = bytes(32)
+_ADDRESS_PADDING = bytes(12)
+
+
+def _uint(value):
+    return value.to_bytes(32, "big")
+
+
+def _address(address):
+    if isinstance(address, str):
+        address = bytes.fromhex(address[2:])
+    if len(address) != 20:
+        raise ValueError(f"Invalid address 0x{address.hex()}")
+    return _ADDRESS_PADDING + address
+
+
+def _bytes(data):
+    # Length word followed by the data padded to whole words
+    if isinstance(data, str):
+        data = bytes.fromhex(data[2:])
+    return _uint(len(data)) + data + _ZERO_PADDING[:-len(data) % 32]
+
+
+def _swap_token_info(token_info):
+    if not isinstance(token_info, (tuple, list)):
+        return token_info.abi_encoding
+    input_token, input_amount, input_receiver, output_token, quote, output_min, receiver = token_info
+    return b"".join(
+        [
+            _address(input_token),
+            _uint(input_amount),
+            _address(input_receiver),
+            _address(output_token),
+            _uint(quote),
+            _uint(output_min),
+            _address(receiver),
+        ]
+    )
+
+
+def _referral_info(referral_info):
+    if not isinstance(referral_info, (tuple, list)):
+        return referral_info.abi_encoding
+    code, fee, fee_recipient = referral_info
+    if code >> 64 or fee >> 64:
+        raise ValueError("Referral code and fee must fit in uint64")
+    return _uint(code) + _uint(fee) + _address(fee_recipient)
+
+
+def _permit2_info(permit2):
+    if not isinstance(permit2, (tuple, list)):
+        return permit2.abi_encoding
+    contract_address, nonce, deadline, signature = permit2
+    # The signature is the only dynamic member, so its offset is always four words
+    return b"".join(
+        [_address(contract_address), _uint(nonce), _uint(deadline), _uint(128), _bytes(signature)]
+    )
+
+
+def _inputs(inputs):
+    words = [_uint(len(inputs))]
+    for token_info in inputs:
+        if not isinstance(token_info, (tuple, list)):
+            words.append(token_info.abi_encoding)
+            continue
+        token, amount, receiver = token_info
+        words += [_address(token), _uint(amount), _address(receiver)]
+    return b"".join(words)
+
+
+def _outputs(outputs):
+    words = [_uint(len(outputs))]
+    for token_info in outputs:
+        if not isinstance(token_info, (tuple, list)):
+            words.append(token_info.abi_encoding)
+            continue
+        token, quote, amount_min, receiver = token_info
+        words += [_address(token), _uint(quote), _uint(amount_min), _address(receiver)]
+    return b"".join(words)
+
+
+def _addresses(addresses):
+    return _uint(len(addresses)) + b"".join([_address(address) for address in addresses])
+
+
+def _uints(values):
+    return _uint(len(values)) + b"".join([_uint(value) for value in values])
+
+
+def _router_funds_swaps(swaps):
+    # Array of (inputs, outputs, path definition, executor) tuples. Every tuple is dynamic, so the
+    # length is followed by their offsets from the end of the length word, then the tuples
+    encodings = [
+        _encode(
+            b"",
+            4 * 32,
+            [
+                (False, _inputs(inputs)),
+                (False, _outputs(outputs)),
+                (False, _bytes(path_definition)),
+                (True, _address(executor)),
+            ],
+        )
+        for inputs, outputs, path_definition, executor in swaps
+    ]
+    offsets = []
+    offset = 32 * len(encodings)
+    for encoding in encodings:
+        offsets.append(_uint(offset))
+        offset += len(encoding)
+    return b"".join([_uint(len(encodings))] + offsets + encodings)
+
+
+def _encode(selector, head_size, arguments):
+    # arguments are (static, encoding) pairs in order, static encodings go in the head as they
+    # are and dynamic ones are replaced by their offset from the start of the arguments
+    head = [selector]
+    tail = []
+    offset = head_size
+    for static, encoding in arguments:
+        if static:
+            head.append(encoding)
+        else:
+            head.append(_uint(offset))
+            tail.append(encoding)
+            offset += len(encoding)
+    return b"".join(head + tail)
+
+
+# Head sizes in bytes: swapTokenInfo is 7 words and swapReferralInfo 3 words inline, every other
+# argument is either a single word or an offset
+def encode_swap(token_info, path_definition, executor, referral_info):
+    return _encode(
+        SELECTORS["swap"],
+        12 * 32,
+        [
+            (True, _swap_token_info(token_info)),
+            (False, _bytes(path_definition)),
+            (True, _address(executor)),
+            (True, _referral_info(referral_info)),
+        ],
+    )
+
+
+def encode_swap_with_hook(
+    token_info, path_definition, executor, referral_info, hook_target, hook_data
+):
+    return _encode(
+        SELECTORS["swapWithHook"],
+        14 * 32,
+        [
+            (True, _swap_token_info(token_info)),
+            (False, _bytes(path_definition)),
+            (True, _address(executor)),
+            (True, _referral_info(referral_info)),
+            (True, _address(hook_target)),
+            (False, _bytes(hook_data)),
+        ],
+    )
+
+
+def encode_swap_permit2(permit2, token_info, path_definition, executor, referral_info):
+    return _encode(
+        SELECTORS["swapPermit2"],
+        13 * 32,
+        [
+            (False, _permit2_info(permit2)),
+            (True, _swap_token_info(token_info)),
+            (False, _bytes(path_definition)),
+            (True, _address(executor)),
+            (True, _referral_info(referral_info)),
+        ],
+    )
+
+
+def encode_swap_permit2_with_hook(
+    permit2, token_info, path_definition, executor, referral_info, hook_target, hook_data
+):
+    return _encode(
+        SELECTORS["swapPermit2WithHook"],
+        15 * 32,
+        [
+            (False, _permit2_info(permit2)),
+            (True, _swap_token_info(token_info)),
+            (False, _bytes(path_definition)),
+            (True, _address(executor)),
+            (True, _referral_info(referral_info)),
+            (True, _address(hook_target)),
+            (False, _bytes(hook_data)),
+        ],
+    )
+
+
+def encode_swap_permit2_allowance(permit2, token_info, path_definition, executor, referral_info):
+    return _encode(
+        SELECTORS["swapPermit2Allowance"],
+        13 * 32,
+        [
+            (True, _address(permit2)),
+            (True, _swap_token_info(token_info)),
+            (False, _bytes(path_definition)),
+            (True, _address(executor)),
+            (True, _referral_info(referral_info)),
+        ],
+    )
+
+
+def encode_swap_multi(inputs, outputs, path_definition, executor, referral_info):
+    return _encode(
+        SELECTORS["swapMulti"],
+        7 * 32,
+        [
+            (False, _inputs(inputs)),
+            (False, _outputs(outputs)),
+            (False, _bytes(path_definition)),
+            (True, _address(executor)),
+            (True, _referral_info(referral_info)),
+        ],
+    )
+
+
+def encode_swap_multi_with_hook(
+    inputs, outputs, path_definition, executor, referral_info, hook_target, hook_data
+):
+    return _encode(
+        SELECTORS["swapMultiWithHook"],
+        9 * 32,
+        [
+            (False, _inputs(inputs)),
+            (False, _outputs(outputs)),
+            (False, _bytes(path_definition)),
+            (True, _address(executor)),
+            (True, _referral_info(referral_info)),
+            (True, _address(hook_target)),
+            (False, _bytes(hook_data)),
+        ],
+    )
+
+
+def encode_swap_multi_permit2(permit2, inputs, outputs, path_definition, executor, referral_info):
+    return _encode(
+        SELECTORS["swapMultiPermit2"],
+        8 * 32,
+        [
+            (False, _permit2_info(permit2)),
+            (False, _inputs(inputs)),
+            (False, _outputs(outputs)),
+            (False, _bytes(path_definition)),
+            (True, _address(executor)),
+            (True, _referral_info(referral_info)),
+        ],
+    )
+
+
+def encode_swap_multi_permit2_with_hook(
+    permit2, inputs, outputs, path_definition, executor, referral_info, hook_target, hook_data
+):
+    return _encode(
+        SELECTORS["swapMultiPermit2WithHook"],
+        10 * 32,
+        [
+            (False, _permit2_info(permit2)),
+            (False, _inputs(inputs)),
+            (False, _outputs(outputs)),
+            (False, _bytes(path_definition)),
+            (True, _address(executor)),
+            (True, _referral_info(referral_info)),
+            (True, _address(hook_target)),
+            (False, _bytes(hook_data)),
+        ],
+    )
+
+
+def encode_swap_multi_permit2_allowance(
+    permit2, inputs, outputs, path_definition, executor, referral_info
+):
+    return _encode(
+        SELECTORS["swapMultiPermit2Allowance"],
+        8 * 32,
+        [
+            (True, _address(permit2)),
+            (False, _inputs(inputs)),
+            (False, _outputs(outputs)),
+            (False, _bytes(path_definition)),
+            (True, _address(executor)),
+            (True, _referral_info(referral_info)),
+        ],
+    )
+
+
+def encode_swap_router_funds(inputs, outputs, path_definition, executor):
+    return _encode(
+        SELECTORS["swapRouterFunds"],
+        4 * 32,
+        [
+            (False, _inputs(inputs)),
+            (False, _outputs(outputs)),
+            (False, _bytes(path_definition)),
+            (True, _address(executor)),
+        ],
+    )
+
+
+def encode_swap_router_funds_batch(swaps):
+    return _encode(SELECTORS["swapRouterFundsBatch"], 32, [(False, _router_funds_swaps(swaps))])
+
+
+def encode_transfer_router_funds(tokens, amounts, dest):
+    return _encode(
+        SELECTORS["transferRouterFunds"],
+        3 * 32,
+        [(False, _addresses(tokens)), (False, _uints(amounts)), (True, _address(dest))],
+    )
+
+
+ENCODERS = {
+    "swap": encode_swap,
+    "swapWithHook": encode_swap_with_hook,
+    "swapPermit2": encode_swap_permit2,
+    "swapPermit2WithHook": encode_swap_permit2_with_hook,
+    "swapPermit2Allowance": encode_swap_permit2_allowance,
+    "swapMulti": encode_swap_multi,
+    "swapMultiWithHook": encode_swap_multi_with_hook,
+    "swapMultiPermit2": encode_swap_multi_permit2,
+    "swapMultiPermit2WithHook": encode_swap_multi_permit2_with_hook,
+    "swapMultiPermit2Allowance": encode_swap_multi_permit2_allowance,
+    "swapRouterFunds": encode_swap_router_funds,
+    "swapRouterFundsBatch": encode_swap_router_funds_batch,
+    "transferRouterFunds": encode_transfer_router_funds,
+}
+
+
+def encode_call(function, *args):
+    return ENCODERS[function](*args)
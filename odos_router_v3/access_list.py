@@ -0,0 +1,160 @@
+from typing import NamedTuple
+
+from odos_router_v3.compact import NULL_ADDRESS, decode_compact_call
+
+
+# EIP-2929 / EIP-2930 gas costs
+ACCESS_LIST_ADDRESS_COST = 2400
+ACCESS_LIST_STORAGE_KEY_COST = 1900
+COLD_ACCOUNT_ACCESS_COST = 2600
+COLD_SLOAD_COST = 2100
+WARM_STORAGE_READ_COST = 100
+
+# Net gas saved by pre-warming an address or a slot that the transaction is going to touch
+ADDRESS_SAVING = COLD_ACCOUNT_ACCESS_COST - WARM_STORAGE_READ_COST - ACCESS_LIST_ADDRESS_COST
+SLOT_SAVING = COLD_SLOAD_COST - WARM_STORAGE_READ_COST - ACCESS_LIST_STORAGE_KEY_COST
+
+# Storage slot of addressList[0] in OdosRouterV3, keccak256(uint256(2))
+ADDRESS_LIST_START = 29102676481673041902632991033461445430619272659676223336789171408008386403022
+
+
+class TokenLayout(NamedTuple):
+    # Storage slots of the balance and allowance mappings of an ERC20
+    balance_slot: int
+    allowance_slot: int
+
+
+# Layout of the WETH9 contract deployed on mainnet and used in the tests
+WETH9_LAYOUT = TokenLayout(3, 4)
+
+
+def _keccak(data):
+    from eth_utils import keccak
+
+    return keccak(data)
+
+
+def _key(key):
+    if isinstance(key, str):
+        key = int(key, 16)
+    return key.to_bytes(32, "big")
+
+
+def mapping_slot(key, slot):
+    # Slot of mapping[key] for a mapping declared at slot, keys are ints or hex addresses
+    return int.from_bytes(_keccak(_key(key) + _key(slot)), "big")
+
+
+def erc20_balance_slot(holder, balance_slot):
+    return mapping_slot(holder, balance_slot)
+
+
+def erc20_allowance_slot(owner, spender, allowance_slot):
+    return mapping_slot(spender, mapping_slot(owner, allowance_slot))
+
+
+def address_list_slot(position):
+    return ADDRESS_LIST_START + position
+
+
+def compact_swap_accesses(
+    data, router_address, sender, address_list=None, token_layouts=None, extra_accesses=None
+):
+    # Addresses and storage slots the router touches while executing swapCompact or
+    # swapMultiCompact call data, as {address: set of slots}. Token slots are only known for
+    # tokens in token_layouts; anything the executor touches along the path goes in extra_accesses
+    swap = decode_compact_call(data, address_list)
+    if address_list is None and swap.address_list_positions:
+        raise ValueError("Call data reads the address list but no address list was given")
+
+    router_address = router_address.lower()
+    sender = sender.lower()
+    token_layouts = {
+        token.lower(): layout for token, layout in (token_layouts or {}).items()
+    }
+    accesses = {}
+
+    def touch(address, *slots):
+        accesses.setdefault(address.lower(), set()).update(slots)
+
+    def touch_balances(token, *holders):
+        layout = token_layouts.get(token.lower())
+        touch(token)
+        if layout is not None:
+            touch(token, *[erc20_balance_slot(holder, layout.balance_slot) for holder in holders])
+
+    touch(router_address, *[address_list_slot(position) for position in swap.address_list_positions])
+    touch(swap.executor)
+
+    for token, amount, receiver in swap.inputs:
+        # Native inputs are forwarded to the executor as msg.value
+        if token == NULL_ADDRESS:
+            continue
+        touch_balances(token, sender, receiver)
+
+        layout = token_layouts.get(token.lower())
+        if layout is not None:
+            touch(token, erc20_allowance_slot(sender, router_address, layout.allowance_slot))
+
+    pays_fee = (
+        swap.referral_fee > 0 and swap.referral_fee_recipient.lower() != router_address
+    )
+    for token, quote, amount_min, receiver in swap.outputs:
+        receivers = [sender if receiver == NULL_ADDRESS else receiver]
+        if pays_fee:
+            receivers.append(swap.referral_fee_recipient)
+
+        # Native balances of the router are read with SELFBALANCE, which is always warm
+        if token == NULL_ADDRESS:
+            for receiver in receivers:
+                touch(receiver)
+        else:
+            touch_balances(token, router_address, *receivers)
+
+    for address, slots in (extra_accesses or {}).items():
+        touch(address, *slots)
+
+    return accesses
+
+
+def access_list_saving(address, slots, warm_addresses):
+    # Net gas saved by listing address with slots. Warm addresses (the sender, tx.to and
+    # precompiles) still pay for their entry, so they only pay off once enough slots are listed
+    saving = len(slots) * SLOT_SAVING - ACCESS_LIST_ADDRESS_COST
+    if address.lower() not in warm_addresses:
+        saving += COLD_ACCOUNT_ACCESS_COST - WARM_STORAGE_READ_COST
+    return saving
+
+
+def build_access_list(accesses, warm_addresses=()):
+    # EIP-2930 access list with only the entries that lower the gas of the transaction
+    from eth_utils import to_checksum_address
+
+    warm_addresses = {address.lower() for address in warm_addresses}
+
+    return [
+        {
+            "address": to_checksum_address(address),
+            "storageKeys": ["0x" + format(slot, "064x") for slot in sorted(slots)],
+        }
+        for address, slots in sorted(accesses.items())
+        if address != NULL_ADDRESS and access_list_saving(address, slots, warm_addresses) > 0
+    ]
+
+
+def compact_access_list(
+    data, router_address, sender, address_list=None, token_layouts=None, extra_accesses=None
+):
+    # Access list for a swapCompact or swapMultiCompact transaction sent by sender to the router
+    accesses = compact_swap_accesses(
+        data, router_address, sender, address_list, token_layouts, extra_accesses
+    )
+    return build_access_list(accesses, [router_address, sender])
+
+
+def access_list_gas(access_list):
+    # Intrinsic gas added to the transaction by the access list itself
+    return sum(
+        ACCESS_LIST_ADDRESS_COST + ACCESS_LIST_STORAGE_KEY_COST * len(entry["storageKeys"])
+        for entry in access_list
+    )
@@ -0,0 +1,220 @@
+import bisect
+import json
+import os
+
+from odos_router_v3.addresses import canonical
+from odos_router_v3.rpc import batch_request
+
+
+ADDRESS_LIST_APPENDED_TOPIC = "0xf9a18c5d385d5c4103128852d330c3b9d42098ff515e96f5fbdd68008b085de8"
+
+DEFAULT_LOG_CHUNK_BLOCKS = 10_000
+
+
+class AddressListCodebook:
+    # Local copy of a router's append-only addressList, as of last_block.
+    # Supports `in`, index() and [] like the plain address lists the compact codec takes.
+    # The list length after each block with appends is kept so that old payloads can be decoded
+    # against the list as it was when they were mined, see at_block()
+
+    def __init__(self, chain_id, router_address, addresses=(), last_block=-1, history=None):
+        self.chain_id = chain_id
+        self.router_address = router_address.lower()
+        self.addresses = []
+        self.positions = {}
+        self.last_block = last_block
+        self.history_blocks = []
+        self.history_lengths = []
+
+        self.append(0, addresses)
+
+        if history is not None:
+            self.history_blocks = [block for block, length in history]
+            self.history_lengths = [length for block, length in history]
+        elif addresses:
+            # Without a history the entries are only known to exist as of last_block
+            self.history_blocks = [last_block]
+            self.history_lengths = [len(self.addresses)]
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def append(self, start_index, addresses, block=None):
+        # Entries are never changed or removed on-chain, so anything but a contiguous append is a gap
+        if start_index != len(self.addresses):
+            raise ValueError(
+                f"Address list append at {start_index} but codebook has {len(self.addresses)} entries"
+            )
+        for address in addresses:
+            address = canonical(address)
+            self.positions.setdefault(address, len(self.addresses))
+            self.addresses.append(address)
+
+        if block is None:
+            return
+        if self.history_blocks and block < self.history_blocks[-1]:
+            raise ValueError(f"Address list append at block {block} is older than the history")
+
+        if self.history_blocks and block == self.history_blocks[-1]:
+            self.history_lengths[-1] = len(self.addresses)
+        else:
+            self.history_blocks.append(block)
+            self.history_lengths.append(len(self.addresses))
+
+    def length_at(self, block):
+        # Length of the list at the end of block, found by binary search over the append history
+        i = bisect.bisect_right(self.history_blocks, block)
+        return self.history_lengths[i - 1] if i else 0
+
+    def at_block(self, block):
+        return AddressListVersion(self, self.length_at(block))
+
+    def __getitem__(self, position):
+        return self.addresses[position]
+
+    def find(self, address):
+        # Position of address in the list, or None if it is not cached. Takes any form canonical()
+        # does, hex in any case, 20 bytes or an int
+        return self.positions.get(canonical(address))
+
+    def index(self, address):
+        position = self.find(address)
+        if position is None:
+            raise ValueError(f"{address} is not in the address list")
+        return position
+
+    def __contains__(self, address):
+        return canonical(address) in self.positions
+
+    def to_json(self):
+        return {
+            "chainId": self.chain_id,
+            "router": self.router_address,
+            "lastBlock": self.last_block,
+            "addresses": self.addresses,
+            "history": list(zip(self.history_blocks, self.history_lengths)),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            data["chainId"],
+            data["router"],
+            data["addresses"],
+            data["lastBlock"],
+            data.get("history"),
+        )
+
+    def save(self, path):
+        # Write then rename so a crash never leaves a truncated codebook behind
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_json(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls.from_json(json.load(f))
+
+
+class AddressListVersion:
+    # The first length entries of a codebook, i.e. the address list as it was at some block.
+    # Indexes past the list length at that block were not valid yet and fail to resolve
+
+    def __init__(self, codebook, length):
+        self.codebook = codebook
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, position):
+        if not 0 <= position < self.length:
+            raise IndexError(
+                f"Address list index {position} is past the list length {self.length}"
+            )
+        return self.codebook.addresses[position]
+
+    def find(self, address):
+        position = self.codebook.find(address)
+        return position if position is not None and position < self.length else None
+
+    def index(self, address):
+        position = self.find(address)
+        if position is None:
+            raise ValueError(f"{address} is not in the address list")
+        return position
+
+    def __contains__(self, address):
+        return self.find(address) is not None
+
+
+def codebook_path(directory, chain_id, router_address):
+    return os.path.join(directory, f"address_list_{chain_id}_{router_address.lower()}.json")
+
+
+def decode_address_list_appended(log):
+    from eth_abi import decode
+
+    start_index, addresses = decode(["uint256", "address[]"], bytes.fromhex(log["data"][2:]))
+    return start_index, addresses
+
+
+def fetch_address_list_logs(
+    endpoint_uri, router_address, from_block, to_block, chunk_blocks=DEFAULT_LOG_CHUNK_BLOCKS
+):
+    # All AddressListAppended logs in [from_block, to_block], fetched chunk_blocks at a time in one batch
+    calls = [
+        (
+            "eth_getLogs",
+            [
+                {
+                    "address": router_address,
+                    "topics": [ADDRESS_LIST_APPENDED_TOPIC],
+                    "fromBlock": hex(start),
+                    "toBlock": hex(min(start + chunk_blocks - 1, to_block)),
+                }
+            ],
+        )
+        for start in range(from_block, to_block + 1, chunk_blocks)
+    ]
+    logs = [log for result in batch_request(endpoint_uri, calls) for log in result]
+    logs.sort(key=lambda log: (int(log["blockNumber"], 16), int(log["logIndex"], 16)))
+
+    return logs
+
+
+def sync_address_list(
+    endpoint_uri,
+    router_address,
+    directory,
+    deployment_block=0,
+    confirmations=0,
+    chunk_blocks=DEFAULT_LOG_CHUNK_BLOCKS,
+):
+    # Catches the persisted codebook for this chain up to head - confirmations using logs only
+    chain_id, head = [
+        int(result, 16)
+        for result in batch_request(endpoint_uri, [("eth_chainId", []), ("eth_blockNumber", [])])
+    ]
+    path = codebook_path(directory, chain_id, router_address)
+
+    if os.path.exists(path):
+        codebook = AddressListCodebook.load(path)
+    else:
+        codebook = AddressListCodebook(chain_id, router_address, last_block=deployment_block - 1)
+
+    to_block = head - confirmations
+    if to_block <= codebook.last_block:
+        return codebook
+
+    for log in fetch_address_list_logs(
+        endpoint_uri, router_address, codebook.last_block + 1, to_block, chunk_blocks
+    ):
+        codebook.append(*decode_address_list_appended(log), int(log["blockNumber"], 16))
+
+    codebook.last_block = to_block
+    codebook.save(path)
+
+    return codebook
@@ -0,0 +1,50 @@
+import functools
+import sys
+
+
+# Canonical address handling. Internally an address is its lowercase 0x hex string, interned so
+# that every copy decoded from logs, calldata or the event store is the same object: equal
+# addresses then compare by identity and hash once, and a million decoded rows hold one string
+# per distinct address. Hex strings stay the internal form because every source hands them out
+# (JSON-RPC, logs, the tests), lowercasing one is several times cheaper than parsing it into bytes
+# or an int, and dicts keyed by interned strings look up as fast as by either.
+# Checksummed addresses are only produced at the edges, through the cached to_checksum
+
+
+def canonical(address):
+    # Interned lowercase hex of an address given as hex in any case, 20 bytes or an int
+    if isinstance(address, str):
+        address = address.lower()
+        if len(address) != 42 or address[:2] != "0x":
+            raise ValueError(f"Invalid address {address}")
+        return sys.intern(address)
+    return sys.intern("0x" + to_bytes(address).hex())
+
+
+def to_bytes(address):
+    if isinstance(address, str):
+        raw = bytes.fromhex(address[2:])
+    elif isinstance(address, int):
+        if address >> 160 or address < 0:
+            raise ValueError(f"Invalid address {address}")
+        raw = address.to_bytes(20, "big")
+    else:
+        raw = bytes(address)
+    if len(raw) != 20:
+        raise ValueError(f"Invalid address 0x{raw.hex()}")
+    return raw
+
+
+@functools.lru_cache(maxsize=65_536)
+def _checksum(address):
+    from eth_hash.auto import keccak
+
+    digest = keccak(address[2:].encode()).hex()
+    return "0x" + "".join(
+        char.upper() if int(digest[i], 16) >= 8 else char for i, char in enumerate(address[2:])
+    )
+
+
+def to_checksum(address):
+    # EIP-55 checksummed form, cached as the same few addresses are shown over and over
+    return _checksum(canonical(address))
@@ -0,0 +1,165 @@
+import bisect
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from odos_router_v3 import event_store, events
+from odos_router_v3.rpc import batch_request
+
+
+BACKFILL_DIRECTORY = "backfill"
+DEFAULT_WORKERS = 4
+
+
+def backfill_shards(store, to_block):
+    # (start, last) block ranges from the store cursor to to_block, split on partition boundaries so
+    # that every shard becomes one partition version when merged
+    shards = []
+    from_block = store.last_block + 1
+    while from_block <= to_block:
+        last = min(store.partition_start(from_block) + store.partition_blocks - 1, to_block)
+        shards.append((from_block, last))
+        from_block = last + 1
+    return shards
+
+
+def shard_path(directory, start, last):
+    return os.path.join(directory, BACKFILL_DIRECTORY, f"{start:012d}-{last:012d}")
+
+
+def fetch_shard(endpoint_uri, router_address, start, last, chunk_blocks, path):
+    # Fetches and decodes one shard into path. The directory only appears once it is complete,
+    # so a shard that exists never needs to be fetched again
+    logs, checkpoints = event_store.fetch_router_logs(
+        endpoint_uri, router_address, start, last, chunk_blocks
+    )
+
+    tmp_path = f"{path}.tmp"
+    event_store.write_columns(tmp_path, *events.decode_router_logs(logs))
+    with open(os.path.join(tmp_path, "checkpoints.json"), "w") as f:
+        json.dump(checkpoints, f)
+    os.rename(tmp_path, path)
+
+    return path
+
+
+def _load_shard(path):
+    swaps, swap_multis = event_store.read_columns(path)
+    with open(os.path.join(path, "checkpoints.json"), "r") as f:
+        checkpoints = [tuple(checkpoint) for checkpoint in json.load(f)]
+    return swaps, swap_multis, checkpoints
+
+
+def _refetch_after_fork(endpoint_uri, router_address, fork_block, last, chunk_blocks, shard):
+    # Keeps the rows and checkpoints of a staged shard up to fork_block and fetches the blocks
+    # after it again
+    swaps, swap_multis, checkpoints = shard
+    logs, new_checkpoints = event_store.fetch_router_logs(
+        endpoint_uri, router_address, fork_block + 1, last, chunk_blocks
+    )
+    new_swaps, new_swap_multis = events.decode_router_logs(logs)
+
+    swaps = swaps.rows(0, bisect.bisect_right(swaps.block_number, fork_block))
+    swaps.extend(new_swaps)
+    swap_multis = swap_multis.rows(0, bisect.bisect_right(swap_multis.block_number, fork_block))
+    swap_multis.extend(new_swap_multis)
+    checkpoints = [checkpoint for checkpoint in checkpoints if checkpoint[0] <= fork_block]
+
+    return swaps, swap_multis, checkpoints + new_checkpoints
+
+
+def backfill_event_store(
+    endpoint_uri,
+    router_address,
+    directory,
+    deployment_block=0,
+    to_block=None,
+    confirmations=0,
+    workers=DEFAULT_WORKERS,
+    chunk_blocks=event_store.DEFAULT_LOG_CHUNK_BLOCKS,
+    partition_blocks=event_store.DEFAULT_PARTITION_BLOCKS,
+):
+    # Same result as sync_event_store, with the block range split into shards fetched by a pool of
+    # worker processes. Shards are staged on disk and merged into the store in block order, so the
+    # result never depends on which worker finished first.
+    # Failed shards raise after the prefix before them is merged, finished shards after them stay
+    # on disk and the next call only fetches what is missing
+    chain_id, head = [
+        int(result, 16)
+        for result in batch_request(endpoint_uri, [("eth_chainId", []), ("eth_blockNumber", [])])
+    ]
+    store = event_store.EventStore.open(
+        directory, chain_id, router_address, deployment_block, partition_blocks
+    )
+
+    fork_block = event_store.find_reorg(endpoint_uri, store.checkpoints)
+    if fork_block is not None:
+        # Shards fetched before the reorg may hold orphaned logs
+        store.rollback(fork_block)
+        shutil.rmtree(os.path.join(directory, BACKFILL_DIRECTORY), ignore_errors=True)
+
+    to_block = head - confirmations if to_block is None else to_block
+    shards = backfill_shards(store, to_block)
+    staging = os.path.join(directory, BACKFILL_DIRECTORY)
+    os.makedirs(staging, exist_ok=True)
+
+    # Leftovers of shards that were merged, cut differently or never completed
+    wanted = {os.path.basename(shard_path(directory, start, last)) for start, last in shards}
+    for name in os.listdir(staging):
+        if name not in wanted:
+            shutil.rmtree(os.path.join(staging, name))
+
+    missing = [
+        (start, last, shard_path(directory, start, last))
+        for start, last in shards
+        if not os.path.exists(shard_path(directory, start, last))
+    ]
+    errors = {}
+    if workers == 1:
+        for start, last, path in missing:
+            try:
+                fetch_shard(endpoint_uri, router_address, start, last, chunk_blocks, path)
+            except Exception as error:
+                errors[start] = error
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = {
+                start: pool.submit(
+                    fetch_shard, endpoint_uri, router_address, start, last, chunk_blocks, path
+                )
+                for start, last, path in missing
+            }
+            for start, future in futures.items():
+                if future.exception() is not None:
+                    errors[start] = future.exception()
+
+    for start, last in shards:
+        if start in errors:
+            raise ValueError(
+                f"{len(errors)} of {len(shards)} backfill shards failed, first at block {start}"
+            ) from errors[start]
+
+        path = shard_path(directory, start, last)
+        swaps, swap_multis, checkpoints = _load_shard(path)
+
+        # Staged shards can outlive a reorg, e.g. when they wait on disk for a failed shard before
+        # them, and the chain can also reorganize below the merged blocks while shards are fetched.
+        # Checked together with every merged checkpoint, a fork before the shard rolls the store
+        # back and the shard is fetched again from the fork
+        fork_block = event_store.find_reorg(endpoint_uri, store.checkpoints + checkpoints)
+        if fork_block is not None:
+            store.rollback(fork_block)
+            swaps, swap_multis, checkpoints = _refetch_after_fork(
+                endpoint_uri,
+                router_address,
+                fork_block,
+                last,
+                chunk_blocks,
+                (swaps, swap_multis, checkpoints),
+            )
+
+        store.append(swaps, swap_multis, last, checkpoints)
+        shutil.rmtree(path)
+
+    return store
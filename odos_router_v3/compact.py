@@ -0,0 +1,214 @@
+from sys import intern
+from typing import NamedTuple
+
+from odos_router_v3.addresses import canonical
+
+
+SWAP_COMPACT_SELECTOR = bytes.fromhex("83bd37f9")
+SWAP_MULTI_COMPACT_SELECTOR = bytes.fromhex("84a7f3dd")
+
+NULL_ADDRESS = intern("0x0000000000000000000000000000000000000000")
+
+# Largest slippage tolerance value, the minimum output is quote * (MAX - tolerance) / MAX
+SLIPPAGE_DENOM = 0xFFFFFF
+
+
+class CompactInput(NamedTuple):
+    token: str
+    amount: int  # 0 means the full balance of the sender
+    receiver: str
+
+
+class CompactOutput(NamedTuple):
+    token: str
+    quote: int
+    amount_min: int
+    receiver: str  # the null address means msg.sender
+
+
+class CompactSwap(NamedTuple):
+    inputs: list
+    outputs: list
+    executor: str
+    slippage_tolerance: int
+    referral_code: int
+    referral_fee: int
+    referral_fee_recipient: str
+    path_definition: bytes
+    address_list_positions: list  # addressList entries read from storage while decoding
+
+
+class _Reader:
+    # Mirrors the calldata walk done by the Yul decoders in OdosRouterV3
+
+    def __init__(self, payload, address_list):
+        self.payload = payload
+        self.pos = 0
+        self.address_list = address_list
+        self.address_list_positions = []
+
+    def uint(self, length):
+        value = int.from_bytes(self.payload[self.pos:self.pos + length], "big")
+        self.pos += length
+        return value
+
+    def amount(self):
+        return self.uint(self.uint(1))
+
+    def address(self):
+        code = self.uint(2)
+        if code == 0:
+            return NULL_ADDRESS
+        if code == 1:
+            return self._raw_address()
+
+        position = code - 2
+        self.address_list_positions.append(position)
+        if self.address_list is None:
+            return None
+        return self.address_list[position]
+
+    def _raw_address(self):
+        address = intern("0x" + self.payload[self.pos:self.pos + 20].hex())
+        self.pos += 20
+        return address
+
+    def referral(self):
+        code = self.uint(8)
+        if self.uint(1):
+            return code, self.uint(8), self._raw_address()
+        return code, 0, NULL_ADDRESS
+
+    def path_definition(self):
+        length = self.uint(1) * 32
+        path_definition = self.payload[self.pos:self.pos + length]
+        self.pos += length
+        return path_definition
+
+
+def _amount_min(quote, slippage_tolerance):
+    return quote * (SLIPPAGE_DENOM - slippage_tolerance) // SLIPPAGE_DENOM
+
+
+# Encoders for the pieces of compact calldata, the inverse of _Reader. address_list may be a plain
+# list of addresses or an address_list.AddressListCodebook
+def encode_address(address, address_list=None):
+    # 2 byte code: 0 for the null address, 1 followed by the raw address, else list position + 2.
+    # Addresses match the list whatever their case
+    address = canonical(address)
+    if address_list is not None:
+        find = getattr(address_list, "find", None)
+        if find is not None:
+            position = find(address)
+        else:
+            position = next(
+                (i for i, entry in enumerate(address_list) if canonical(entry) is address), None
+            )
+        if position is not None:
+            return (position + 2).to_bytes(2, "big")
+    if address is NULL_ADDRESS:
+        return b"\x00\x00"
+    return b"\x00\x01" + bytes.fromhex(address[2:])
+
+
+def encode_amount(amount):
+    # 1 byte length followed by the amount in that many bytes
+    length = (amount.bit_length() + 7) // 8
+    return bytes([length]) + amount.to_bytes(length, "big")
+
+
+def encode_referral(code, fee, fee_recipient):
+    if fee:
+        recipient = bytes.fromhex(fee_recipient[2:])
+        return code.to_bytes(8, "big") + b"\x01" + fee.to_bytes(8, "big") + recipient
+    return code.to_bytes(8, "big") + b"\x00"
+
+
+def encode_path_definition(path_definition):
+    # 1 byte length in words followed by the path definition padded to whole words
+    if isinstance(path_definition, str):
+        path_definition = bytes.fromhex(path_definition[2:])
+    words = (len(path_definition) + 31) // 32
+    return bytes([words]) + path_definition.ljust(words * 32, b"\x00")
+
+
+def decode_swap_compact(payload, address_list=None):
+    # Decodes swapCompact calldata following the selector. Cached addresses are resolved through
+    # address_list when given, otherwise they are left as None (positions are always recorded)
+    reader = _Reader(payload, address_list)
+
+    input_token = reader.address()
+    output_token = reader.address()
+    input_amount = reader.amount()
+    quote = reader.amount()
+    slippage_tolerance = reader.uint(3)
+    executor = reader.address()
+
+    input_receiver = reader.address()
+    if input_receiver == NULL_ADDRESS:
+        input_receiver = executor
+    output_receiver = reader.address()
+
+    code, fee, fee_recipient = reader.referral()
+
+    return CompactSwap(
+        [CompactInput(input_token, input_amount, input_receiver)],
+        [CompactOutput(output_token, quote, _amount_min(quote, slippage_tolerance), output_receiver)],
+        executor,
+        slippage_tolerance,
+        code,
+        fee,
+        fee_recipient,
+        reader.path_definition(),
+        reader.address_list_positions,
+    )
+
+
+def decode_swap_multi_compact(payload, address_list=None):
+    # Decodes swapMultiCompact calldata following the selector, see decode_swap_compact
+    reader = _Reader(payload, address_list)
+
+    num_inputs = reader.uint(1)
+    num_outputs = reader.uint(1)
+    executor = reader.address()
+    slippage_tolerance = reader.uint(3)
+
+    inputs = []
+    for i in range(num_inputs):
+        token = reader.address()
+        amount = reader.amount()
+        receiver = reader.address()
+        inputs.append(CompactInput(token, amount, executor if receiver == NULL_ADDRESS else receiver))
+
+    outputs = []
+    for i in range(num_outputs):
+        token = reader.address()
+        quote = reader.amount()
+        outputs.append(
+            CompactOutput(token, quote, _amount_min(quote, slippage_tolerance), reader.address())
+        )
+
+    code, fee, fee_recipient = reader.referral()
+
+    return CompactSwap(
+        inputs,
+        outputs,
+        executor,
+        slippage_tolerance,
+        code,
+        fee,
+        fee_recipient,
+        reader.path_definition(),
+        reader.address_list_positions,
+    )
+
+
+def decode_compact_call(data, address_list=None):
+    # Decodes full swapCompact or swapMultiCompact calldata, selector included, as bytes or hex
+    if isinstance(data, str):
+        data = bytes.fromhex(data[2:])
+    if data[:4] == SWAP_COMPACT_SELECTOR:
+        return decode_swap_compact(data[4:], address_list)
+    if data[:4] == SWAP_MULTI_COMPACT_SELECTOR:
+        return decode_swap_multi_compact(data[4:], address_list)
+    raise ValueError(f"Not a compact swap call: 0x{data[:4].hex()}")
@@ -0,0 +1,83 @@
+from odos_router_v3.compact import SWAP_COMPACT_SELECTOR, SWAP_MULTI_COMPACT_SELECTOR, _Reader
+
+
+def _amount_offsets(data):
+    # Offsets of the length byte of every input amount and output quote in compact calldata, in
+    # calldata order, and the number of inputs. Walks the payload like the compact decoders
+    reader = _Reader(data[4:], None)
+    offsets = []
+
+    def amount():
+        offsets.append(reader.pos + 4)
+        reader.amount()
+
+    if data[:4] == SWAP_COMPACT_SELECTOR:
+        reader.address()
+        reader.address()
+        amount()
+        amount()
+        return offsets, 1
+
+    if data[:4] != SWAP_MULTI_COMPACT_SELECTOR:
+        raise ValueError(f"Not a compact swap call: 0x{bytes(data[:4]).hex()}")
+
+    num_inputs = reader.uint(1)
+    num_outputs = reader.uint(1)
+    reader.address()
+    reader.uint(3)
+    for i in range(num_inputs + num_outputs):
+        reader.address()
+        amount()
+        reader.address()
+    return offsets, num_inputs
+
+
+class CompactTemplate:
+    # swapCompact or swapMultiCompact calldata compiled once, with the offsets of its amounts, so
+    # a quote refresh patches the amounts in place instead of encoding the call again. An amount
+    # is rewritten in place while its byte length stays the same; only when the length byte
+    # changes is the rest of the calldata shifted and the later offsets moved
+
+    def __init__(self, data):
+        if isinstance(data, str):
+            data = bytes.fromhex(data[2:])
+        self.data = bytearray(data)
+        self.offsets, self.num_inputs = _amount_offsets(self.data)
+
+    def __bytes__(self):
+        return bytes(self.data)
+
+    def _patch(self, slot, amount):
+        data = self.data
+        offset = self.offsets[slot]
+        old_length = data[offset]
+        length = (amount.bit_length() + 7) // 8
+
+        if length == old_length:
+            data[offset + 1:offset + 1 + length] = amount.to_bytes(length, "big")
+            return
+
+        data[offset:offset + 1 + old_length] = bytes([length]) + amount.to_bytes(length, "big")
+        offsets = self.offsets
+        shift = length - old_length
+        for i in range(slot + 1, len(offsets)):
+            offsets[i] += shift
+
+    def set_input_amount(self, amount, i=0):
+        if not 0 <= i < self.num_inputs:
+            raise IndexError(f"Input {i} out of range")
+        self._patch(i, amount)
+
+    def set_output_quote(self, quote, i=0):
+        if not 0 <= i < len(self.offsets) - self.num_inputs:
+            raise IndexError(f"Output {i} out of range")
+        self._patch(self.num_inputs + i, quote)
+
+    def amounts(self):
+        # Current (input amounts, output quotes)
+        data = self.data
+        values = [
+            int.from_bytes(data[offset + 1:offset + 1 + data[offset]], "big")
+            for offset in self.offsets
+        ]
+        return values[:self.num_inputs], values[self.num_inputs:]
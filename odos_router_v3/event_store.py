@@ -0,0 +1,439 @@
+import bisect
+import json
+import os
+import shutil
+import sys
+from array import array
+
+from odos_router_v3 import events
+from odos_router_v3.rpc import batch_request
+
+
+DEFAULT_PARTITION_BLOCKS = 100_000
+DEFAULT_LOG_CHUNK_BLOCKS = 10_000
+DEFAULT_MAX_CHECKPOINTS = 128
+
+CURSOR_FILE = "cursor.json"
+PARTITIONS_DIRECTORY = "partitions"
+
+# Store layout:
+#   cursor.json                   chain, router, partition size, last block and recent block hashes
+#   partitions/<start>-<last>/    one version of the partition starting at block <start>,
+#                                 holding its events up to block <last>
+#     swap.<field>                one file per column, fixed width values back to back
+#     swap_multi.<field>
+#
+# The cursor is the commit point. Partition versions are written before the cursor moves past
+# them and replaced ones are deleted after, so after a crash at any point the current version of
+# a partition is the one with the highest <last> not past the cursor. Versions past the cursor
+# were never committed and are ignored.
+#
+# Column encodings: u64 as little endian uint64 (block numbers, log indexes, leg ends, referral
+# codes and fees), uint256 as 32 byte big endian, int256 as 32 byte two's complement, addresses as
+# their 20 bytes and hashes as their 32 bytes. Leg ends are local to the partition.
+SWAP_COLUMNS = {
+    "block_number": "u64",
+    "log_index": "u64",
+    "transaction_hash": "hash",
+    "sender": "address",
+    "input_amount": "uint256",
+    "input_token": "address",
+    "amount_out": "uint256",
+    "output_token": "address",
+    "slippage": "int256",
+    "referral_code": "u64",
+    "referral_fee": "u64",
+    "referral_fee_recipient": "address",
+}
+SWAP_MULTI_COLUMNS = {
+    "block_number": "u64",
+    "log_index": "u64",
+    "transaction_hash": "hash",
+    "sender": "address",
+    "referral_code": "u64",
+    "referral_fee": "u64",
+    "referral_fee_recipient": "address",
+    "inputs_end": "u64",
+    "outputs_end": "u64",
+    "tokens_in": "address",
+    "amounts_in": "uint256",
+    "tokens_out": "address",
+    "amounts_out": "uint256",
+    "slippage": "int256",
+}
+
+_REQUIRED_FIELDS = ("block_number", "inputs_end", "outputs_end")
+_WIDTHS = {"u64": 8, "uint256": 32, "int256": 32, "address": 20, "hash": 32}
+
+
+def encode_column(kind, values):
+    if kind == "u64":
+        column = array("Q", values)
+        if sys.byteorder == "big":
+            column.byteswap()
+        return column.tobytes()
+    if kind == "uint256":
+        return b"".join(value.to_bytes(32, "big") for value in values)
+    if kind == "int256":
+        return b"".join(value.to_bytes(32, "big", signed=True) for value in values)
+    return b"".join(bytes.fromhex(value[2:]) for value in values)
+
+
+def decode_column(kind, data):
+    if kind == "u64":
+        column = array("Q")
+        column.frombytes(data)
+        if sys.byteorder == "big":
+            column.byteswap()
+        return column.tolist()
+
+    width = _WIDTHS[kind]
+    words = [data[offset:offset + width] for offset in range(0, len(data), width)]
+    if kind == "uint256":
+        return [int.from_bytes(word, "big") for word in words]
+    if kind == "int256":
+        return [int.from_bytes(word, "big", signed=True) for word in words]
+    if kind == "address":
+        return [sys.intern("0x" + word.hex()) for word in words]
+    return ["0x" + word.hex() for word in words]
+
+
+def read_columns(path, fields=None):
+    # Columns stored in the directory at path. With fields, only those columns are read from disk,
+    # plus block numbers and leg ends which are needed to slice and join partitions
+    swaps = events.SwapColumns()
+    swap_multis = events.SwapMultiColumns()
+
+    for prefix, columns, schema in [
+        ("swap", swaps, SWAP_COLUMNS),
+        ("swap_multi", swap_multis, SWAP_MULTI_COLUMNS),
+    ]:
+        for field, kind in schema.items():
+            if fields is None or field in fields or field in _REQUIRED_FIELDS:
+                with open(os.path.join(path, f"{prefix}.{field}"), "rb") as f:
+                    setattr(columns, field, decode_column(kind, f.read()))
+
+    return swaps, swap_multis
+
+
+def write_columns(path, swaps, swap_multis):
+    # Writes every column into a fresh directory at path
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+    for prefix, columns, schema in [
+        ("swap", swaps, SWAP_COLUMNS),
+        ("swap_multi", swap_multis, SWAP_MULTI_COLUMNS),
+    ]:
+        for field, kind in schema.items():
+            with open(os.path.join(path, f"{prefix}.{field}"), "wb") as f:
+                f.write(encode_column(kind, getattr(columns, field)))
+
+
+def _version_name(start, last):
+    return f"{start:012d}-{last:012d}"
+
+
+def _parse_version_name(name):
+    start, last = name.split("-")
+    return int(start), int(last)
+
+
+class EventStore:
+    # Swap and SwapMulti logs of one router, stored by column and partitioned by block range.
+    # checkpoints are (block, hash) pairs of recently indexed blocks, used to find where the
+    # chain diverged after a reorg
+
+    def __init__(
+        self,
+        directory,
+        chain_id,
+        router_address,
+        partition_blocks=DEFAULT_PARTITION_BLOCKS,
+        last_block=-1,
+        checkpoints=(),
+        max_checkpoints=DEFAULT_MAX_CHECKPOINTS,
+    ):
+        self.directory = directory
+        self.chain_id = chain_id
+        self.router_address = router_address.lower()
+        self.partition_blocks = partition_blocks
+        self.last_block = last_block
+        self.checkpoints = [tuple(checkpoint) for checkpoint in checkpoints]
+        self.max_checkpoints = max_checkpoints
+
+    @classmethod
+    def open(
+        cls,
+        directory,
+        chain_id,
+        router_address,
+        deployment_block=0,
+        partition_blocks=DEFAULT_PARTITION_BLOCKS,
+    ):
+        # Loads the store in directory, or creates an empty one starting at deployment_block
+        path = os.path.join(directory, CURSOR_FILE)
+        if not os.path.exists(path):
+            os.makedirs(os.path.join(directory, PARTITIONS_DIRECTORY), exist_ok=True)
+            return cls(directory, chain_id, router_address, partition_blocks, deployment_block - 1)
+
+        with open(path, "r") as f:
+            cursor = json.load(f)
+        if cursor["chainId"] != chain_id or cursor["router"] != router_address.lower():
+            raise ValueError(
+                f"{directory} indexes router {cursor['router']} on chain {cursor['chainId']}"
+            )
+
+        return cls(
+            directory,
+            chain_id,
+            router_address,
+            cursor["partitionBlocks"],
+            cursor["lastBlock"],
+            cursor["checkpoints"],
+        )
+
+    def save_cursor(self):
+        # Write then rename so a crash never leaves a truncated cursor behind
+        path = os.path.join(self.directory, CURSOR_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "chainId": self.chain_id,
+                    "router": self.router_address,
+                    "partitionBlocks": self.partition_blocks,
+                    "lastBlock": self.last_block,
+                    "checkpoints": self.checkpoints,
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    def partition_start(self, block):
+        return block - block % self.partition_blocks
+
+    def _partitions_path(self, *names):
+        return os.path.join(self.directory, PARTITIONS_DIRECTORY, *names)
+
+    def _versions(self):
+        # {start: [last, ...]} of complete partition versions on disk
+        versions = {}
+        for name in os.listdir(self._partitions_path()):
+            if not name.endswith(".tmp"):
+                start, last = _parse_version_name(name)
+                versions.setdefault(start, []).append(last)
+        return versions
+
+    def partitions(self):
+        # Sorted (start, last) of the current version of every partition
+        partitions = []
+        for start, lasts in sorted(self._versions().items()):
+            committed = [last for last in lasts if last <= self.last_block]
+            if committed:
+                partitions.append((start, max(committed)))
+        return partitions
+
+    def read_partition(self, start, last, fields=None):
+        return read_columns(self._partitions_path(_version_name(start, last)), fields)
+
+    def write_partition(self, start, last, swaps, swap_multis):
+        name = _version_name(start, last)
+        tmp_path = self._partitions_path(f"{name}.tmp")
+        write_columns(tmp_path, swaps, swap_multis)
+
+        shutil.rmtree(self._partitions_path(name), ignore_errors=True)
+        os.rename(tmp_path, self._partitions_path(name))
+
+    def _current_rows(self, start, upto):
+        # Events of the partition at start up to block upto, or empty columns
+        versions = dict(self.partitions())
+        if start not in versions:
+            return events.SwapColumns(), events.SwapMultiColumns()
+
+        swaps, swap_multis = self.read_partition(start, versions[start])
+        return (
+            swaps.rows(0, bisect.bisect_right(swaps.block_number, upto)),
+            swap_multis.rows(0, bisect.bisect_right(swap_multis.block_number, upto)),
+        )
+
+    def _remove_stale_versions(self):
+        current = set(self.partitions())
+        for start, lasts in self._versions().items():
+            for last in lasts:
+                if (start, last) not in current:
+                    shutil.rmtree(self._partitions_path(_version_name(start, last)))
+
+    def append(self, swaps, swap_multis, to_block, checkpoints=()):
+        # Adds the events of blocks last_block + 1 through to_block, in block order, and commits.
+        # Only partitions overlapping the new blocks are rewritten
+        if (swaps.block_number and swaps.block_number[0] <= self.last_block) or (
+            swap_multis.block_number and swap_multis.block_number[0] <= self.last_block
+        ):
+            raise ValueError(f"Events must be newer than the last indexed block {self.last_block}")
+
+        # Versions left past the cursor by an interrupted run would otherwise become current once
+        # the cursor passes them
+        self._remove_stale_versions()
+
+        from_block = self.last_block + 1
+        for start in range(
+            self.partition_start(from_block), to_block + 1, self.partition_blocks
+        ):
+            last = min(start + self.partition_blocks - 1, to_block)
+            new_swaps = swaps.rows(
+                bisect.bisect_left(swaps.block_number, start),
+                bisect.bisect_right(swaps.block_number, last),
+            )
+            new_swap_multis = swap_multis.rows(
+                bisect.bisect_left(swap_multis.block_number, start),
+                bisect.bisect_right(swap_multis.block_number, last),
+            )
+            partition_swaps, partition_swap_multis = self._current_rows(start, self.last_block)
+
+            if len(partition_swaps) + len(partition_swap_multis) + len(new_swaps) + len(
+                new_swap_multis
+            ):
+                partition_swaps.extend(new_swaps)
+                partition_swap_multis.extend(new_swap_multis)
+                self.write_partition(start, last, partition_swaps, partition_swap_multis)
+
+        self.last_block = to_block
+        self.checkpoints = (self.checkpoints + list(checkpoints))[-self.max_checkpoints:]
+        self.save_cursor()
+        self._remove_stale_versions()
+
+    def rollback(self, block):
+        # Forgets every event after block. The partition holding block gets a truncated version
+        # before the cursor moves back, later partitions are simply no longer committed
+        if block >= self.last_block:
+            return
+
+        start = self.partition_start(block)
+        if dict(self.partitions()).get(start, block) > block:
+            swaps, swap_multis = self._current_rows(start, block)
+            if len(swaps) + len(swap_multis):
+                self.write_partition(start, block, swaps, swap_multis)
+
+        self.last_block = block
+        self.checkpoints = [checkpoint for checkpoint in self.checkpoints if checkpoint[0] <= block]
+        self.save_cursor()
+        self._remove_stale_versions()
+
+    def read(self, from_block=0, to_block=None, fields=None):
+        # Events in [from_block, to_block] as (SwapColumns, SwapMultiColumns), reading only the
+        # partitions in range
+        to_block = self.last_block if to_block is None else min(to_block, self.last_block)
+        swaps = events.SwapColumns()
+        swap_multis = events.SwapMultiColumns()
+
+        for start, last in self.partitions():
+            if start > to_block or start + self.partition_blocks <= from_block:
+                continue
+
+            partition_swaps, partition_swap_multis = self.read_partition(start, last, fields)
+            swaps.extend(
+                partition_swaps.rows(
+                    bisect.bisect_left(partition_swaps.block_number, from_block),
+                    bisect.bisect_right(partition_swaps.block_number, to_block),
+                )
+            )
+            swap_multis.extend(
+                partition_swap_multis.rows(
+                    bisect.bisect_left(partition_swap_multis.block_number, from_block),
+                    bisect.bisect_right(partition_swap_multis.block_number, to_block),
+                )
+            )
+
+        return swaps, swap_multis
+
+
+def fetch_router_logs(
+    endpoint_uri, router_address, from_block, to_block, chunk_blocks=DEFAULT_LOG_CHUNK_BLOCKS
+):
+    # Swap and SwapMulti logs in [from_block, to_block] plus the hash of the last block of every
+    # chunk, all in one batch. Returns (logs, [(block, hash), ...])
+    chunk_ends = [
+        min(start + chunk_blocks - 1, to_block)
+        for start in range(from_block, to_block + 1, chunk_blocks)
+    ]
+    calls = [
+        (
+            "eth_getLogs",
+            [
+                {
+                    "address": router_address,
+                    "topics": [[events.SWAP_TOPIC, events.SWAP_MULTI_TOPIC]],
+                    "fromBlock": hex(start),
+                    "toBlock": hex(end),
+                }
+            ],
+        )
+        for start, end in zip(range(from_block, to_block + 1, chunk_blocks), chunk_ends)
+    ] + [("eth_getBlockByNumber", [hex(end), False]) for end in chunk_ends]
+
+    results = batch_request(endpoint_uri, calls)
+    logs = [log for result in results[:len(chunk_ends)] for log in result]
+    logs.sort(key=lambda log: (int(log["blockNumber"], 16), int(log["logIndex"], 16)))
+
+    hashes = [block["hash"] for block in results[len(chunk_ends):]]
+
+    return logs, list(zip(chunk_ends, hashes))
+
+
+def find_reorg(endpoint_uri, checkpoints):
+    # Last checkpointed block still on the canonical chain, or None if the newest checkpoint is.
+    # Raises if the chain diverged before every checkpoint
+    if not checkpoints:
+        return None
+
+    blocks = batch_request(
+        endpoint_uri,
+        [("eth_getBlockByNumber", [hex(block), False]) for block, block_hash in checkpoints],
+    )
+    matches = [
+        block is not None and block["hash"] == block_hash
+        for block, (_, block_hash) in zip(blocks, checkpoints)
+    ]
+    if matches[-1]:
+        return None
+
+    for matched, (block, _) in zip(reversed(matches), reversed(checkpoints)):
+        if matched:
+            return block
+
+    raise ValueError(f"Chain reorganized before the oldest checkpoint at block {checkpoints[0][0]}")
+
+
+def sync_event_store(
+    endpoint_uri,
+    router_address,
+    directory,
+    deployment_block=0,
+    confirmations=0,
+    chunk_blocks=DEFAULT_LOG_CHUNK_BLOCKS,
+    partition_blocks=DEFAULT_PARTITION_BLOCKS,
+):
+    # Catches the store in directory up to head - confirmations, one partition at a time so that
+    # an interrupted backfill resumes where it stopped. Events after a reorg are dropped first
+    chain_id, head = [
+        int(result, 16)
+        for result in batch_request(endpoint_uri, [("eth_chainId", []), ("eth_blockNumber", [])])
+    ]
+    store = EventStore.open(directory, chain_id, router_address, deployment_block, partition_blocks)
+
+    fork_block = find_reorg(endpoint_uri, store.checkpoints)
+    if fork_block is not None:
+        store.rollback(fork_block)
+
+    to_block = head - confirmations
+    while store.last_block < to_block:
+        from_block = store.last_block + 1
+        last = min(store.partition_start(from_block) + store.partition_blocks - 1, to_block)
+
+        logs, checkpoints = fetch_router_logs(
+            endpoint_uri, router_address, from_block, last, chunk_blocks
+        )
+        store.append(*events.decode_router_logs(logs), last, checkpoints)
+
+    return store
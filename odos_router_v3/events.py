@@ -0,0 +1,230 @@
+from sys import intern
+
+
+# Addresses are decoded to interned lowercase hex, see the addresses module
+SWAP_TOPIC = "0x69db20ca9e32403e6c56e5193b3e3b2827ae5c430ccfdea392ba950d2d1ab2bc"
+SWAP_MULTI_TOPIC = "0x2c96555a96d94780f3a97aeb724514e80e331842f3143742d85da5aa68df9d30"
+
+SWAP_TYPES = [
+    "address", "uint256", "address", "uint256", "address", "int256", "uint64", "uint64", "address"
+]
+SWAP_MULTI_TYPES = [
+    "address",
+    "uint256[]",
+    "address[]",
+    "uint256[]",
+    "address[]",
+    "int256[]",
+    "uint64",
+    "uint64",
+    "address",
+]
+
+_INT256_SIGN = 1 << 255
+_INT256_MODULUS = 1 << 256
+
+
+def _int(value):
+    # Log fields are hex strings from JSON-RPC or already ints from web3
+    return int(value, 16) if isinstance(value, str) else value
+
+
+def _hex(value):
+    if isinstance(value, str):
+        return value
+    return "0x" + bytes(value).hex()
+
+
+def _signed(value):
+    return value - _INT256_MODULUS if value >= _INT256_SIGN else value
+
+
+class SwapColumns:
+    # Decoded Swap logs, one list per field
+    FIELDS = (
+        "block_number",
+        "log_index",
+        "transaction_hash",
+        "sender",
+        "input_amount",
+        "input_token",
+        "amount_out",
+        "output_token",
+        "slippage",
+        "referral_code",
+        "referral_fee",
+        "referral_fee_recipient",
+    )
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, [])
+
+    def __len__(self):
+        return len(self.block_number)
+
+    def rows(self, start, end):
+        # New columns holding rows start:end
+        columns = SwapColumns()
+        for field in self.FIELDS:
+            setattr(columns, field, getattr(self, field)[start:end])
+        return columns
+
+    def extend(self, other):
+        for field in self.FIELDS:
+            getattr(self, field).extend(getattr(other, field))
+
+    def append_log(self, log):
+        # Words are sliced straight out of the hex data, 64 characters each after the 0x
+        data = _hex(log["data"])
+
+        self.block_number.append(_int(log["blockNumber"]))
+        self.log_index.append(_int(log["logIndex"]))
+        self.transaction_hash.append(_hex(log["transactionHash"]))
+        self.sender.append(intern("0x" + data[26:66]))
+        self.input_amount.append(int(data[66:130], 16))
+        self.input_token.append(intern("0x" + data[154:194]))
+        self.amount_out.append(int(data[194:258], 16))
+        self.output_token.append(intern("0x" + data[282:322]))
+        self.slippage.append(_signed(int(data[322:386], 16)))
+        self.referral_code.append(int(data[386:450], 16))
+        self.referral_fee.append(int(data[450:514], 16))
+        self.referral_fee_recipient.append(intern("0x" + data[538:578]))
+
+
+class SwapMultiColumns:
+    # Decoded SwapMulti logs. Per log fields have one entry per log, the token legs of all logs
+    # are concatenated and log i owns legs inputs_end[i - 1]:inputs_end[i] (outputs likewise)
+    FIELDS = (
+        "block_number",
+        "log_index",
+        "transaction_hash",
+        "sender",
+        "referral_code",
+        "referral_fee",
+        "referral_fee_recipient",
+        "inputs_end",
+        "outputs_end",
+    )
+    INPUT_FIELDS = ("tokens_in", "amounts_in")
+    OUTPUT_FIELDS = ("tokens_out", "amounts_out", "slippage")
+
+    def __init__(self):
+        for field in self.FIELDS + self.INPUT_FIELDS + self.OUTPUT_FIELDS:
+            setattr(self, field, [])
+
+    def __len__(self):
+        return len(self.block_number)
+
+    def input_range(self, i):
+        return self.inputs_end[i - 1] if i else 0, self.inputs_end[i]
+
+    def output_range(self, i):
+        return self.outputs_end[i - 1] if i else 0, self.outputs_end[i]
+
+    def rows(self, start, end):
+        # New columns holding logs start:end and their legs, with leg ends rebased to zero
+        columns = SwapMultiColumns()
+        end = min(end, len(self))
+        start = min(start, end)
+        input_start = self.inputs_end[start - 1] if start else 0
+        input_end = self.inputs_end[end - 1] if end else 0
+        output_start = self.outputs_end[start - 1] if start else 0
+        output_end = self.outputs_end[end - 1] if end else 0
+
+        for field in self.FIELDS:
+            setattr(columns, field, getattr(self, field)[start:end])
+        for field in self.INPUT_FIELDS:
+            setattr(columns, field, getattr(self, field)[input_start:input_end])
+        for field in self.OUTPUT_FIELDS:
+            setattr(columns, field, getattr(self, field)[output_start:output_end])
+        columns.inputs_end = [i - input_start for i in columns.inputs_end]
+        columns.outputs_end = [i - output_start for i in columns.outputs_end]
+
+        return columns
+
+    def extend(self, other):
+        # Leg ends are shifted by the last end rather than the leg count, so this also works
+        # on columns loaded without their leg fields
+        input_shift = self.inputs_end[-1] if self.inputs_end else 0
+        output_shift = self.outputs_end[-1] if self.outputs_end else 0
+
+        for field in self.FIELDS + self.INPUT_FIELDS + self.OUTPUT_FIELDS:
+            if field not in ("inputs_end", "outputs_end"):
+                getattr(self, field).extend(getattr(other, field))
+        self.inputs_end += [i + input_shift for i in other.inputs_end]
+        self.outputs_end += [i + output_shift for i in other.outputs_end]
+
+    def append_log(self, log):
+        data = _hex(log["data"])
+
+        def word(offset):
+            # Offsets are in bytes from the start of the data, as in the ABI encoding
+            return int(data[2 + 2 * offset:66 + 2 * offset], 16)
+
+        def array_start(head_word):
+            offset = word(32 * head_word)
+            return word(offset), 2 + 2 * offset + 64
+
+        # Everything is decoded and checked before any column grows, so a malformed log leaves
+        # the columns as they were
+        block_number = _int(log["blockNumber"])
+        log_index = _int(log["logIndex"])
+        transaction_hash = _hex(log["transactionHash"])
+        sender = intern("0x" + data[26:66])
+        referral_code = word(192)
+        referral_fee = word(224)
+        referral_fee_recipient = intern("0x" + data[538:578])
+
+        length, start = array_start(1)
+        amounts_in = [int(data[p:p + 64], 16) for p in range(start, start + 64 * length, 64)]
+        length, start = array_start(2)
+        tokens_in = [
+            intern("0x" + data[p + 24:p + 64]) for p in range(start, start + 64 * length, 64)
+        ]
+        length, start = array_start(3)
+        amounts_out = [int(data[p:p + 64], 16) for p in range(start, start + 64 * length, 64)]
+        length, start = array_start(4)
+        tokens_out = [
+            intern("0x" + data[p + 24:p + 64]) for p in range(start, start + 64 * length, 64)
+        ]
+        length, start = array_start(5)
+        slippage = [
+            _signed(int(data[p:p + 64], 16)) for p in range(start, start + 64 * length, 64)
+        ]
+
+        if len(amounts_in) != len(tokens_in) or not (
+            len(amounts_out) == len(tokens_out) == len(slippage)
+        ):
+            raise ValueError(f"Mismatched SwapMulti array lengths in {transaction_hash}")
+
+        self.block_number.append(block_number)
+        self.log_index.append(log_index)
+        self.transaction_hash.append(transaction_hash)
+        self.sender.append(sender)
+        self.referral_code.append(referral_code)
+        self.referral_fee.append(referral_fee)
+        self.referral_fee_recipient.append(referral_fee_recipient)
+        self.amounts_in += amounts_in
+        self.tokens_in += tokens_in
+        self.inputs_end.append(len(self.tokens_in))
+        self.amounts_out += amounts_out
+        self.tokens_out += tokens_out
+        self.slippage += slippage
+        self.outputs_end.append(len(self.tokens_out))
+
+
+def decode_router_logs(logs, swaps=None, swap_multis=None):
+    # Sorts router logs into Swap and SwapMulti columns, other events are skipped.
+    # Pass existing columns to append to them
+    swaps = SwapColumns() if swaps is None else swaps
+    swap_multis = SwapMultiColumns() if swap_multis is None else swap_multis
+
+    for log in logs:
+        topic = _hex(log["topics"][0]) if log["topics"] else None
+        if topic == SWAP_TOPIC:
+            swaps.append_log(log)
+        elif topic == SWAP_MULTI_TOPIC:
+            swap_multis.append_log(log)
+
+    return swaps, swap_multis
@@ -0,0 +1,230 @@
+import json
+import math
+import os
+from typing import NamedTuple
+
+from odos_router_v3.access_list import access_list_gas
+from odos_router_v3.compact import (
+    NULL_ADDRESS,
+    SWAP_COMPACT_SELECTOR,
+    decode_compact_call,
+)
+
+
+TX_BASE_GAS = 21000
+CALLDATA_ZERO_BYTE_GAS = 4
+CALLDATA_NONZERO_BYTE_GAS = 16
+
+# Pivots below this are treated as a feature that does not vary in the calibration runs
+PIVOT_EPSILON = 1e-9
+
+
+class PayloadShape(NamedTuple):
+    # What the execution gas of a router call depends on, besides the executor path itself
+    function: str
+    inputs: int
+    outputs: int
+    erc20_inputs: int
+    erc20_outputs: int
+    fee_transfers: int
+    address_list_hits: int
+    path_words: int
+
+
+SHAPE_FEATURES = PayloadShape._fields[1:]
+
+
+class GasSample(NamedTuple):
+    shape: PayloadShape
+    intrinsic_gas: int
+    gas_used: int
+
+
+def calldata_gas(data):
+    if isinstance(data, str):
+        data = bytes.fromhex(data[2:])
+    zero_bytes = data.count(0)
+    return CALLDATA_ZERO_BYTE_GAS * zero_bytes + CALLDATA_NONZERO_BYTE_GAS * (len(data) - zero_bytes)
+
+
+def intrinsic_gas(data, access_list=()):
+    return TX_BASE_GAS + calldata_gas(data) + access_list_gas(access_list)
+
+
+def _fee_transfers(referral_fee, referral_fee_recipient, router_address, outputs):
+    if not referral_fee:
+        return 0
+    if router_address is not None and referral_fee_recipient.lower() == router_address.lower():
+        return 0
+    return outputs
+
+
+def payload_shape(
+    function,
+    input_tokens,
+    output_tokens,
+    path_definition=b"",
+    referral_fee=0,
+    referral_fee_recipient=NULL_ADDRESS,
+    router_address=None,
+    address_list_hits=0,
+):
+    # Shape of a call made with the ABI encoded entry points, path_definition as bytes or hex
+    if isinstance(path_definition, str):
+        path_definition = bytes.fromhex(path_definition[2:])
+
+    return PayloadShape(
+        function,
+        len(input_tokens),
+        len(output_tokens),
+        sum(token != NULL_ADDRESS for token in input_tokens),
+        sum(token != NULL_ADDRESS for token in output_tokens),
+        _fee_transfers(referral_fee, referral_fee_recipient, router_address, len(output_tokens)),
+        address_list_hits,
+        math.ceil(len(path_definition) / 32),
+    )
+
+
+def compact_payload_shape(data, router_address=None):
+    # Shape of swapCompact or swapMultiCompact call data, selector included. Cached addresses are
+    # never the null address, so the address list itself is not needed to tell ETH from ERC20
+    if isinstance(data, str):
+        data = bytes.fromhex(data[2:])
+    swap = decode_compact_call(data)
+
+    return PayloadShape(
+        "swapCompact" if data[:4] == SWAP_COMPACT_SELECTOR else "swapMultiCompact",
+        len(swap.inputs),
+        len(swap.outputs),
+        sum(token != NULL_ADDRESS for token, amount, receiver in swap.inputs),
+        sum(token != NULL_ADDRESS for token, quote, amount_min, receiver in swap.outputs),
+        _fee_transfers(
+            swap.referral_fee, swap.referral_fee_recipient, router_address, len(swap.outputs)
+        ),
+        len(swap.address_list_positions),
+        len(swap.path_definition) // 32,
+    )
+
+
+def _solve_least_squares(rows, targets):
+    # Normal equations solved by Gauss-Jordan elimination with partial pivoting. Columns that are
+    # constant or collinear with earlier ones in the calibration data get a zero coefficient
+    n = len(rows[0])
+    matrix = [
+        [sum(row[i] * row[j] for row in rows) for j in range(n)]
+        + [sum(row[i] * target for row, target in zip(rows, targets))]
+        for i in range(n)
+    ]
+
+    solution = [0.0] * n
+    pivots = {}
+    for column in range(n):
+        free_rows = [i for i in range(n) if i not in pivots.values()]
+        pivot = max(free_rows, key=lambda i: abs(matrix[i][column]))
+        if abs(matrix[pivot][column]) < PIVOT_EPSILON:
+            for row in matrix:
+                row[column] = 0.0
+            continue
+
+        pivots[column] = pivot
+        pivot_value = matrix[pivot][column]
+        matrix[pivot] = [value / pivot_value for value in matrix[pivot]]
+        for i in range(n):
+            if i != pivot and matrix[i][column]:
+                factor = matrix[i][column]
+                matrix[i] = [a - factor * b for a, b in zip(matrix[i], matrix[pivot])]
+
+    for column, pivot in pivots.items():
+        solution[column] = matrix[pivot][n]
+
+    return solution
+
+
+class GasModel:
+    # Linear model of the execution gas (gas used minus intrinsic gas) of router calls, with an
+    # intercept per entry point. max_under and max_over are the largest amounts by which the
+    # calibration runs used more and less gas than predicted
+
+    def __init__(self, intercepts, coefficients, max_under=0, max_over=0, samples=0):
+        self.intercepts = intercepts
+        self.coefficients = coefficients
+        self.max_under = max_under
+        self.max_over = max_over
+        self.samples = samples
+
+    def execution_gas(self, shape):
+        intercept = self.intercepts.get(shape.function)
+        if intercept is None:
+            raise ValueError(f"Gas model is not calibrated for {shape.function}")
+
+        gas = intercept
+        for coefficient, value in zip(self.coefficients, shape[1:]):
+            gas += coefficient * value
+        return gas
+
+    def predict(self, shape, data, access_list=()):
+        return round(intrinsic_gas(data, access_list) + self.execution_gas(shape))
+
+    def error_bounds(self):
+        return -self.max_over, self.max_under
+
+    def gas_limit(self, shape, data, access_list=()):
+        # Never below the gas any calibration run with the prediction used
+        return self.predict(shape, data, access_list) + math.ceil(self.max_under)
+
+    def to_json(self):
+        return {
+            "intercepts": self.intercepts,
+            "coefficients": dict(zip(SHAPE_FEATURES, self.coefficients)),
+            "maxUnder": self.max_under,
+            "maxOver": self.max_over,
+            "samples": self.samples,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            data["intercepts"],
+            [data["coefficients"][feature] for feature in SHAPE_FEATURES],
+            data["maxUnder"],
+            data["maxOver"],
+            data["samples"],
+        )
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_json(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls.from_json(json.load(f))
+
+
+def fit_gas_model(samples):
+    # Calibrates a GasModel from GasSamples, e.g. receipts of calls made on a local node
+    functions = sorted({sample.shape.function for sample in samples})
+
+    rows = [
+        [float(sample.shape.function == function) for function in functions]
+        + [float(value) for value in sample.shape[1:]]
+        for sample in samples
+    ]
+    targets = [sample.gas_used - sample.intrinsic_gas for sample in samples]
+    solution = _solve_least_squares(rows, targets)
+
+    model = GasModel(
+        dict(zip(functions, solution[:len(functions)])),
+        solution[len(functions):],
+        samples=len(samples),
+    )
+    residuals = [
+        sample.gas_used - sample.intrinsic_gas - model.execution_gas(sample.shape)
+        for sample in samples
+    ]
+    model.max_under = max(max(residuals), 0)
+    model.max_over = max(-min(residuals), 0)
+
+    return model
@@ -0,0 +1,346 @@
+import bisect
+import json
+import os
+from typing import NamedTuple
+
+from odos_router_v3 import settlement
+from odos_router_v3.abi import SELECTORS
+from odos_router_v3.addresses import canonical
+from odos_router_v3.compact import NULL_ADDRESS
+from odos_router_v3.event_store import DEFAULT_LOG_CHUNK_BLOCKS
+from odos_router_v3.rpc import batch_request, read_balances
+
+
+SECONDS_PER_DAY = 86_400
+
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+TRANSFER_ROUTER_FUNDS_SELECTOR = "0x" + SELECTORS["transferRouterFunds"].hex()
+ROUTER_FUNDS_SWAP_SELECTORS = (
+    "0x" + SELECTORS["swapRouterFunds"].hex(),
+    "0x" + SELECTORS["swapRouterFundsBatch"].hex(),
+    "0x88eb3833",  # swapRouterFundsCompact
+)
+
+
+class Withdrawal(NamedTuple):
+    block_number: int
+    token: str
+    amount: int  # 0 takes the full balance, as in transferRouterFunds
+
+
+class RouterTransfer(NamedTuple):
+    # ERC20 Transfer log sent from the router
+    block_number: int
+    transaction_hash: str
+    token: str
+    amount: int
+
+
+def _referral_key(code):
+    # The low 32 bits identify the referrer, the bits above only configure the split and slippage
+    return code & 0xFFFFFFFF
+
+
+class RevenueLedger:
+    # Running router revenue for one router: retained positive slippage plus the retained share of
+    # referral fees, totalled per token, per (referral code, token) and per (day, token). Every
+    # event is an O(1) update of the totals. balances tracks what the router should hold as a
+    # result, i.e. revenue less withdrawals, for reconciliation against the chain.
+    # Revenue is replayed from the logs with the settlement simulator. Logs only show the output
+    # after the fee is taken off, rounded down, so a fee paying swap may be undercounted by one unit
+
+    def __init__(
+        self,
+        router_address,
+        token_revenue=None,
+        referral_revenue=None,
+        daily_revenue=None,
+        withdrawals=None,
+        balances=None,
+        last_block=-1,
+    ):
+        self.router_address = router_address.lower()
+        self.token_revenue = token_revenue or {}
+        self.referral_revenue = referral_revenue or {}
+        self.daily_revenue = daily_revenue or {}
+        self.withdrawals = withdrawals or {}
+        self.balances = balances or {}
+        self.last_block = last_block
+
+    def add_revenue(self, token, amount, code, day):
+        if not amount:
+            return
+        referral_key = (_referral_key(code), token)
+        daily_key = (day, token)
+        self.token_revenue[token] = self.token_revenue.get(token, 0) + amount
+        self.referral_revenue[referral_key] = self.referral_revenue.get(referral_key, 0) + amount
+        self.daily_revenue[daily_key] = self.daily_revenue.get(daily_key, 0) + amount
+        self.balances[token] = self.balances.get(token, 0) + amount
+
+    def withdraw(self, token, amount=0):
+        # Funds leaving the router. Amount 0 takes the full tracked balance
+        token = token.lower()
+        amount = amount or self.balances.get(token, 0)
+        self.withdrawals[token] = self.withdrawals.get(token, 0) + amount
+        self.balances[token] = self.balances.get(token, 0) - amount
+
+    def apply(
+        self,
+        swaps,
+        swap_multis,
+        block_days,
+        to_block,
+        withdrawals=(),
+        router_funds_transactions=(),
+    ):
+        # Applies events of blocks last_block + 1 through to_block. block_days maps every block
+        # with events to its day number. The inputs of SwapMulti logs emitted by router fund swaps
+        # (transaction hashes in router_funds_transactions) are withdrawals, their outputs go to
+        # the caller. Withdrawals are applied before the events of their block, so the full
+        # balance taken by a transferRouterFunds call is exact unless it shares a block with swaps
+        router_funds_transactions = set(router_funds_transactions)
+        swap_settlements = settlement.settle_swaps(swaps, self.router_address)
+        swap_multi_settlements = settlement.settle_swap_multis(swap_multis, self.router_address)
+
+        swap_start = bisect.bisect_right(swaps.block_number, self.last_block)
+        multi_start = bisect.bisect_right(swap_multis.block_number, self.last_block)
+
+        def apply_until(block):
+            nonlocal swap_start, multi_start
+
+            swap_end = bisect.bisect_left(swaps.block_number, block, swap_start)
+            for i in range(swap_start, swap_end):
+                self.add_revenue(
+                    swaps.output_token[i],
+                    swap_settlements.router_revenue[i],
+                    swaps.referral_code[i],
+                    block_days[swaps.block_number[i]],
+                )
+            swap_start = swap_end
+
+            multi_end = bisect.bisect_left(swap_multis.block_number, block, multi_start)
+            for i in range(multi_start, multi_end):
+                input_start, input_end = swap_multis.input_range(i)
+                output_start, output_end = swap_multis.output_range(i)
+
+                if swap_multis.transaction_hash[i] in router_funds_transactions:
+                    for j in range(input_start, input_end):
+                        self.withdraw(swap_multis.tokens_in[j], swap_multis.amounts_in[j])
+                    continue
+
+                for j in range(output_start, output_end):
+                    self.add_revenue(
+                        swap_multis.tokens_out[j],
+                        swap_multi_settlements.router_revenue[j],
+                        swap_multis.referral_code[i],
+                        block_days[swap_multis.block_number[i]],
+                    )
+            multi_start = multi_end
+
+        for withdrawal in sorted(withdrawals):
+            if self.last_block < withdrawal.block_number <= to_block:
+                apply_until(withdrawal.block_number)
+                self.withdraw(withdrawal.token, withdrawal.amount)
+        apply_until(to_block + 1)
+
+        self.last_block = to_block
+
+    def reconcile(self, balances):
+        # Actual less expected balance for every token where they differ. A positive difference is
+        # income the ledger did not see (e.g. direct transfers), a negative one is an unseen outflow
+        differences = {}
+        for token in set(self.balances) | set(balances):
+            difference = balances.get(token, 0) - self.balances.get(token, 0)
+            if difference:
+                differences[token] = difference
+        return differences
+
+    def reconcile_on_chain(self, endpoint_uri, block=None, **kwargs):
+        # Reads the router balance of every tracked token in bulk and reconciles against it
+        block = self.last_block if block is None else block
+        tokens = sorted(self.balances)
+        actual = read_balances(endpoint_uri, self.router_address, tokens, hex(block), **kwargs)
+        return self.reconcile(dict(zip(tokens, actual)))
+
+    def to_json(self):
+        return {
+            "router": self.router_address,
+            "lastBlock": self.last_block,
+            "tokenRevenue": self.token_revenue,
+            "referralRevenue": [[*key, amount] for key, amount in self.referral_revenue.items()],
+            "dailyRevenue": [[*key, amount] for key, amount in self.daily_revenue.items()],
+            "withdrawals": self.withdrawals,
+            "balances": self.balances,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            data["router"],
+            data["tokenRevenue"],
+            {(code, token): amount for code, token, amount in data["referralRevenue"]},
+            {(day, token): amount for day, token, amount in data["dailyRevenue"]},
+            data["withdrawals"],
+            data["balances"],
+            data["lastBlock"],
+        )
+
+    def save(self, path):
+        # Write then rename so a crash never leaves a truncated ledger behind
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_json(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls.from_json(json.load(f))
+
+
+def fetch_block_days(endpoint_uri, block_numbers):
+    # {block: day number} for the given blocks, from their timestamps in one batch
+    block_numbers = sorted(set(block_numbers))
+    blocks = batch_request(
+        endpoint_uri,
+        [("eth_getBlockByNumber", [hex(block), False]) for block in block_numbers],
+    )
+    return {
+        block_number: int(block["timestamp"], 16) // SECONDS_PER_DAY
+        for block_number, block in zip(block_numbers, blocks)
+    }
+
+
+def fetch_router_transfers(
+    endpoint_uri, router_address, from_block, to_block, chunk_blocks=DEFAULT_LOG_CHUNK_BLOCKS
+):
+    # ERC20 transfers of any token out of the router in [from_block, to_block]. Unlike the
+    # transaction input, the logs show funds leaving the router whichever contract (e.g. a
+    # multisig owner) made the call
+    sender_topic = "0x" + router_address[2:].lower().rjust(64, "0")
+    calls = [
+        (
+            "eth_getLogs",
+            [
+                {
+                    "topics": [TRANSFER_TOPIC, sender_topic],
+                    "fromBlock": hex(start),
+                    "toBlock": hex(min(start + chunk_blocks - 1, to_block)),
+                }
+            ],
+        )
+        for start in range(from_block, to_block + 1, chunk_blocks)
+    ]
+    return [
+        RouterTransfer(
+            int(log["blockNumber"], 16),
+            log["transactionHash"],
+            canonical(log["address"]),
+            int(log["data"], 16),
+        )
+        for result in batch_request(endpoint_uri, calls)
+        for log in result
+        # ERC721 transfers share the topic but index the token id as well
+        if len(log["topics"]) == 3
+    ]
+
+
+def router_funds_transactions(swap_multis, transfers):
+    # Hashes of the SwapMulti logs emitted by router fund swaps, and of the candidates that cannot
+    # be told apart by their logs. Router fund swaps carry no referral info or slippage and the
+    # router itself sends out their ERC20 inputs, while user swaps take inputs from the user.
+    # Candidates with only native inputs leave no such transfer
+    sent = {(transfer.transaction_hash, transfer.token, transfer.amount) for transfer in transfers}
+    hashes = set()
+    native_only = set()
+    for i in range(len(swap_multis)):
+        if swap_multis.referral_code[i] or swap_multis.referral_fee[i]:
+            continue
+        tx_hash = swap_multis.transaction_hash[i]
+        inputs = [
+            (swap_multis.tokens_in[j], swap_multis.amounts_in[j])
+            for j in range(*swap_multis.input_range(i))
+            if swap_multis.tokens_in[j] != NULL_ADDRESS
+        ]
+        if not inputs:
+            native_only.add(tx_hash)
+        elif all((tx_hash, token, amount) in sent for token, amount in inputs):
+            hashes.add(tx_hash)
+
+    return hashes, native_only - hashes
+
+
+def fetch_router_funds_transactions(endpoint_uri, swap_multis, transfers):
+    # router_funds_transactions, with candidates holding only native inputs recognised by the
+    # selector of their transaction. Those are missed when made through another contract
+    hashes, native_only = router_funds_transactions(swap_multis, transfers)
+    candidates = sorted(native_only)
+    transactions = batch_request(
+        endpoint_uri, [("eth_getTransactionByHash", [tx_hash]) for tx_hash in candidates]
+    )
+    return hashes | {
+        transaction["hash"]
+        for transaction in transactions
+        if transaction["input"][:10] in ROUTER_FUNDS_SWAP_SELECTORS
+    }
+
+
+def transfer_withdrawals(transfers, swaps, swap_multis):
+    # ERC20 withdrawals are the router transfers of transactions without a router swap, whose
+    # transfers pay out swap outputs and referral fees instead
+    swap_transactions = set(swaps.transaction_hash) | set(swap_multis.transaction_hash)
+    return [
+        Withdrawal(transfer.block_number, transfer.token, transfer.amount)
+        for transfer in transfers
+        # Amount 0 would stand for the full balance
+        if transfer.amount and transfer.transaction_hash not in swap_transactions
+    ]
+
+
+def transfer_router_funds_withdrawals(transaction):
+    # Withdrawals made by a transferRouterFunds transaction, which emits no logs of its own.
+    # transaction is as returned by eth_getTransactionByHash, raw or through web3
+    from eth_abi import decode
+
+    data = transaction["input"]
+    data = data if isinstance(data, str) else "0x" + bytes(data).hex()
+    if data[:10] != TRANSFER_ROUTER_FUNDS_SELECTOR:
+        return []
+
+    tokens, amounts, dest = decode(["address[]", "uint256[]", "address"], bytes.fromhex(data[10:]))
+    block_number = transaction["blockNumber"]
+    if isinstance(block_number, str):
+        block_number = int(block_number, 16)
+
+    return [
+        Withdrawal(block_number, token.lower(), amount) for token, amount in zip(tokens, amounts)
+    ]
+
+
+def sync_revenue_ledger(endpoint_uri, store, ledger, native_withdrawals, deployment_block=0):
+    # Applies the events the store holds past the ledger's last block. ERC20 withdrawals are found
+    # from the router's Transfer logs. Native token withdrawals leave no log, so they have to be
+    # passed in, e.g. from transfer_router_funds_withdrawals for direct calls or from traces for
+    # calls made through another contract. Missed ones show up as negative differences in reconcile
+    if store.last_block <= ledger.last_block:
+        return ledger
+
+    swaps, swap_multis = store.read(ledger.last_block + 1)
+    transfers = fetch_router_transfers(
+        endpoint_uri,
+        ledger.router_address,
+        max(ledger.last_block + 1, deployment_block),
+        store.last_block,
+    )
+    block_days = fetch_block_days(endpoint_uri, swaps.block_number + swap_multis.block_number)
+    ledger.apply(
+        swaps,
+        swap_multis,
+        block_days,
+        store.last_block,
+        transfer_withdrawals(transfers, swaps, swap_multis) + list(native_withdrawals),
+        fetch_router_funds_transactions(endpoint_uri, swap_multis, transfers),
+    )
+
+    return ledger
@@ -0,0 +1,119 @@
+from typing import NamedTuple
+
+from odos_router_v3.rpc import ETH, read_balances
+
+
+# Rough gas costs used when no per-token estimate is given
+CALL_GAS = 21_000 + 10_000
+SWAP_GAS = 150_000
+ERC20_TRANSFER_GAS = 30_000
+ETH_TRANSFER_GAS = 10_000
+
+
+class LiquidationCandidate(NamedTuple):
+    token: str
+    amount: int
+    value: float  # value recovered, in units of the liquidation target
+    gas: int  # marginal gas to liquidate this token
+    transfer: bool  # moved with transferRouterFunds instead of swapped
+
+
+class LiquidationCall(NamedTuple):
+    function: str  # "swapRouterFunds" or "transferRouterFunds"
+    args: tuple
+    gas: int
+    value: float
+
+
+def liquidation_candidates(
+    tokens,
+    balances,
+    prices,
+    gas_cost,
+    swap_gas=None,
+    transfer_tokens=(),
+    dust_value=0,
+):
+    # Keeps tokens whose value net of their gas cost clears the dust threshold.
+    # prices[token] is the target value of one base unit and gas_cost is the target value of one unit of gas
+    swap_gas = swap_gas or {}
+    transfer_tokens = set(transfer_tokens)
+
+    candidates = []
+    for token, amount in zip(tokens, balances):
+        price = prices.get(token)
+        if not amount or price is None:
+            continue
+
+        transfer = token in transfer_tokens
+        if transfer:
+            gas = ETH_TRANSFER_GAS if token == ETH else ERC20_TRANSFER_GAS
+        else:
+            gas = swap_gas.get(token, SWAP_GAS) + CALL_GAS
+
+        value = amount * price
+        if value - gas * gas_cost < dust_value:
+            continue
+
+        candidates.append(LiquidationCandidate(token, amount, value, gas, transfer))
+
+    return candidates
+
+
+def plan_liquidation(candidates, dest, get_swap, max_gas=None):
+    # Orders calls by value recovered per unit of gas, so any prefix of the plan (e.g. one cut off
+    # by max_gas) recovers the most value for the gas spent. All transfers share a single
+    # transferRouterFunds call, and every call uses amount 0 so the full balance at execution is taken.
+    # get_swap(token, amount) returns (outputs, path_definition, executor) for a swapRouterFunds call
+    transfers = [c for c in candidates if c.transfer]
+    entries = [(c.value, c.gas, c) for c in candidates if not c.transfer]
+
+    if transfers:
+        entries.append(
+            (sum(c.value for c in transfers), CALL_GAS + sum(c.gas for c in transfers), None)
+        )
+    entries.sort(key=lambda entry: entry[0] / entry[1], reverse=True)
+
+    calls = []
+    total_gas = 0
+    for value, gas, c in entries:
+        total_gas += gas
+        if max_gas is not None and total_gas > max_gas:
+            break
+
+        # Only quote paths for swaps that make it into the plan
+        if c is None:
+            args = ([t.token for t in transfers], [0] * len(transfers), dest)
+            calls.append(LiquidationCall("transferRouterFunds", args, gas, value))
+        else:
+            outputs, path_definition, executor = get_swap(c.token, c.amount)
+            args = ([[c.token, 0, executor]], outputs, path_definition, executor)
+            calls.append(LiquidationCall("swapRouterFunds", args, gas, value))
+
+    return calls
+
+
+def plan_router_liquidation(
+    endpoint_uri,
+    router_address,
+    tokens,
+    prices,
+    gas_cost,
+    dest,
+    get_swap,
+    swap_gas=None,
+    transfer_tokens=(),
+    dust_value=0,
+    max_gas=None,
+):
+    # Reads the router balances in bulk and plans the liquidation of everything worth recovering
+    balances = read_balances(endpoint_uri, router_address, tokens)
+
+    return plan_liquidation(
+        liquidation_candidates(
+            tokens, balances, prices, gas_cost, swap_gas, transfer_tokens, dust_value
+        ),
+        dest,
+        get_swap,
+        max_gas,
+    )
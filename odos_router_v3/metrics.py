@@ -0,0 +1,177 @@
+from typing import NamedTuple
+
+from odos_router_v3.settlement import FEE_DENOM
+
+
+# (window length, bucket length) in seconds. Windows slide one bucket at a time
+DEFAULT_WINDOWS = {
+    "1m": (60, 1),
+    "1h": (3_600, 60),
+    "24h": (86_400, 900),
+}
+
+
+class WindowStats(NamedTuple):
+    volume: int
+    swaps: int
+    positive_slippage_swaps: int
+    referral_fees: int
+
+    @property
+    def positive_slippage_rate(self):
+        return self.positive_slippage_swaps / self.swaps if self.swaps else 0.0
+
+
+EMPTY_STATS = WindowStats(0, 0, 0, 0)
+
+
+class SlidingWindow:
+    # Per token [volume, swaps, positive slippage swaps, referral fees] over the last size buckets,
+    # kept in a ring of per bucket totals.
+    # Each event updates one bucket and the running totals, and is subtracted again once when its
+    # bucket expires, so updates are O(1) amortized and memory is bounded by the tokens seen within
+    # the window. Events older than the window are dropped
+
+    def __init__(self, seconds, bucket_seconds):
+        self.bucket_seconds = bucket_seconds
+        self.size = seconds // bucket_seconds
+        self.buckets = [{} for i in range(self.size)]
+        self.totals = {}
+        self.head = None
+
+    def advance(self, timestamp):
+        # Moves the newest bucket up to timestamp, expiring the buckets that leave the window
+        bucket = timestamp // self.bucket_seconds
+        if self.head is None:
+            self.head = bucket
+            return
+        if bucket <= self.head:
+            return
+
+        totals = self.totals
+        for expired_bucket in range(max(self.head + 1, bucket - self.size + 1), bucket + 1):
+            slot = expired_bucket % self.size
+            for token, stats in self.buckets[slot].items():
+                total = totals[token]
+                # Drop tokens without swaps left in the window so memory stays bounded
+                if total[1] == stats[1]:
+                    del totals[token]
+                else:
+                    total[0] -= stats[0]
+                    total[1] -= stats[1]
+                    total[2] -= stats[2]
+                    total[3] -= stats[3]
+            self.buckets[slot] = {}
+        self.head = bucket
+
+    def add(self, timestamp, token, volume, positive_slippage, referral_fee):
+        bucket = timestamp // self.bucket_seconds
+        if self.head is None or bucket > self.head:
+            self.advance(timestamp)
+        elif bucket <= self.head - self.size:
+            return
+
+        slot = self.buckets[bucket % self.size]
+        stats = slot.get(token)
+        if stats is None:
+            slot[token] = [volume, 1, positive_slippage, referral_fee]
+        else:
+            stats[0] += volume
+            stats[1] += 1
+            stats[2] += positive_slippage
+            stats[3] += referral_fee
+
+        total = self.totals.get(token)
+        if total is None:
+            self.totals[token] = [volume, 1, positive_slippage, referral_fee]
+        else:
+            total[0] += volume
+            total[1] += 1
+            total[2] += positive_slippage
+            total[3] += referral_fee
+
+    def stats(self, token):
+        total = self.totals.get(token)
+        return EMPTY_STATS if total is None else WindowStats(*total)
+
+
+def referral_fee_amount(amount_out, slippage, code, fee):
+    # Fee taken off the output of a logged swap. The output before the fee is recovered the same
+    # way as in settlement.settlement_inputs
+    if not fee:
+        return 0
+    net = amount_out + slippage if slippage > 0 and not (code >> 48) & 1 else amount_out
+    return -(-net * FEE_DENOM // (FEE_DENOM - fee)) - net
+
+
+class SwapMetrics:
+    # Live volume, swap count, positive slippage rate and referral fees per output token over
+    # several sliding windows. Timestamps are in seconds and are expected to be roughly increasing
+    # (e.g. block timestamps); late events still count if their bucket is within the window.
+    # Tokens are lowercase addresses, as decoded by events.decode_router_logs
+
+    def __init__(self, windows=None):
+        windows = DEFAULT_WINDOWS if windows is None else windows
+        self.windows = {
+            name: SlidingWindow(seconds, bucket_seconds)
+            for name, (seconds, bucket_seconds) in windows.items()
+        }
+        self._window_list = list(self.windows.values())
+
+    def add(self, timestamp, token, volume, positive_slippage=False, referral_fee=0):
+        positive_slippage = 1 if positive_slippage else 0
+        for window in self._window_list:
+            window.add(timestamp, token, volume, positive_slippage, referral_fee)
+
+    def add_swaps(self, swaps, block_timestamps):
+        # Feeds decoded Swap columns. block_timestamps maps block numbers to timestamps
+        windows = self._window_list
+        for block, token, amount_out, slippage, code, fee in zip(
+            swaps.block_number,
+            swaps.output_token,
+            swaps.amount_out,
+            swaps.slippage,
+            swaps.referral_code,
+            swaps.referral_fee,
+        ):
+            timestamp = block_timestamps[block]
+            positive_slippage = 1 if slippage > 0 else 0
+            referral_fee = referral_fee_amount(amount_out, slippage, code, fee) if fee else 0
+            for window in windows:
+                window.add(timestamp, token, amount_out, positive_slippage, referral_fee)
+
+    def add_swap_multis(self, swap_multis, block_timestamps):
+        # Feeds decoded SwapMulti columns, counting every output leg as a swap of its token
+        windows = self._window_list
+        start = 0
+        for i, end in enumerate(swap_multis.outputs_end):
+            timestamp = block_timestamps[swap_multis.block_number[i]]
+            code = swap_multis.referral_code[i]
+            fee = swap_multis.referral_fee[i]
+            for j in range(start, end):
+                slippage = swap_multis.slippage[j]
+                amount_out = swap_multis.amounts_out[j]
+                positive_slippage = 1 if slippage > 0 else 0
+                referral_fee = referral_fee_amount(amount_out, slippage, code, fee) if fee else 0
+                token = swap_multis.tokens_out[j]
+                for window in windows:
+                    window.add(timestamp, token, amount_out, positive_slippage, referral_fee)
+            start = end
+
+    def advance(self, timestamp):
+        # Expires old events without adding new ones, e.g. on a clock tick before querying
+        for window in self._window_list:
+            window.advance(timestamp)
+
+    def stats(self, window, token):
+        return self.windows[window].stats(token.lower())
+
+    def tokens(self, window):
+        # Tokens with swaps in the window
+        return list(self.windows[window].totals)
+
+    def top_tokens(self, window, n=10, key="volume"):
+        # The n tokens with the highest value of a WindowStats field, e.g. "swaps"
+        index = WindowStats._fields.index(key)
+        totals = self.windows[window].totals
+        return sorted(totals, key=lambda token: totals[token][index], reverse=True)[:n]
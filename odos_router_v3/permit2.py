@@ -0,0 +1,137 @@
+from odos_router_v3.addresses import to_bytes
+
+
+# Permit2 EIP-712 struct hashes and signatures built from raw 32 byte words, without web3.
+# keccak and eth_keys are only imported on first use. Type hashes are keccak of the type strings
+# in Permit2's PermitHash library
+PERMIT2_ADDRESS = "0x000000000022D473030F116dDEE9F6B43aC78BA3"
+
+DOMAIN_TYPEHASH = bytes.fromhex(
+    "8cad95687ba82c2ce50e74f7b754645e5117c3a5bec8151c0726d5857980a866"
+)
+PERMIT2_NAME_HASH = bytes.fromhex(
+    "9ac997416e8ff9d2ff6bebeb7149f65cdae5e32e2b90440b566bb3044041d36a"
+)
+TOKEN_PERMISSIONS_TYPEHASH = bytes.fromhex(
+    "618358ac3db8dc274f0cd8829da7e234bd48cd73c4a740aede1adec9846d06a1"
+)
+PERMIT_TRANSFER_FROM_TYPEHASH = bytes.fromhex(
+    "939c21a48a8dbe3a9a2404a1d46691e4d39f6583d6ec6b35714604c986d80106"
+)
+PERMIT_BATCH_TRANSFER_FROM_TYPEHASH = bytes.fromhex(
+    "fcf35f5ac6a2c28868dc44c302166470266239195f02b0ee408334829333b766"
+)
+PERMIT_DETAILS_TYPEHASH = bytes.fromhex(
+    "65626cad6cb96493bf6f5ebea28756c966f023ab9e8a83a7101849d5573b3678"
+)
+PERMIT_SINGLE_TYPEHASH = bytes.fromhex(
+    "f3841cd1ff0085026a6327b620b67997ce40f282c88a8e905a7a5626e310f3d0"
+)
+PERMIT_BATCH_TYPEHASH = bytes.fromhex(
+    "af1b0d30d2cab0380e68f0689007e3254993c596f2fdd0aaa7f4d04f79440863"
+)
+
+
+def keccak(data):
+    from eth_hash import auto
+
+    return auto.keccak(data)
+
+
+def _address_word(address):
+    return bytes(12) + to_bytes(address)
+
+
+def _uint_word(value):
+    return value.to_bytes(32, "big")
+
+
+def token_permissions_hash(token, amount):
+    return keccak(TOKEN_PERMISSIONS_TYPEHASH + _address_word(token) + _uint_word(amount))
+
+
+def permit_transfer_from_hash(token, amount, spender, nonce, deadline):
+    # Struct hash signed for permitTransferFrom, as used by swapPermit2
+    return keccak(
+        PERMIT_TRANSFER_FROM_TYPEHASH
+        + token_permissions_hash(token, amount)
+        + _address_word(spender)
+        + _uint_word(nonce)
+        + _uint_word(deadline)
+    )
+
+
+def permit_batch_transfer_from_hash(tokens, amounts, spender, nonce, deadline):
+    # Struct hash signed for the batch permitTransferFrom of swapMultiPermit2. The router only
+    # permits the ERC20 inputs, so ETH inputs are left out
+    permissions = b"".join(
+        [
+            token_permissions_hash(token, amount)
+            for token, amount in zip(tokens, amounts)
+            if to_bytes(token) != bytes(20)
+        ]
+    )
+    return keccak(
+        PERMIT_BATCH_TRANSFER_FROM_TYPEHASH
+        + keccak(permissions)
+        + _address_word(spender)
+        + _uint_word(nonce)
+        + _uint_word(deadline)
+    )
+
+
+def permit_details_hash(token, amount, expiration, nonce):
+    return keccak(
+        PERMIT_DETAILS_TYPEHASH
+        + _address_word(token)
+        + _uint_word(amount)
+        + _uint_word(expiration)
+        + _uint_word(nonce)
+    )
+
+
+def permit_single_hash(token, amount, expiration, nonce, spender, sig_deadline):
+    # Struct hash of a one-time allowance signature, after which swaps only need transferFrom
+    return keccak(
+        PERMIT_SINGLE_TYPEHASH
+        + permit_details_hash(token, amount, expiration, nonce)
+        + _address_word(spender)
+        + _uint_word(sig_deadline)
+    )
+
+
+def permit_batch_hash(tokens, amounts, expiration, nonces, spender, sig_deadline):
+    details = b"".join(
+        [
+            permit_details_hash(token, amount, expiration, nonce)
+            for token, amount, nonce in zip(tokens, amounts, nonces)
+        ]
+    )
+    return keccak(
+        PERMIT_BATCH_TYPEHASH + keccak(details) + _address_word(spender) + _uint_word(sig_deadline)
+    )
+
+
+def domain_separator(chain_id, permit2_address=PERMIT2_ADDRESS):
+    return keccak(
+        DOMAIN_TYPEHASH
+        + PERMIT2_NAME_HASH
+        + _uint_word(chain_id)
+        + _address_word(permit2_address)
+    )
+
+
+def signing_hash(domain_separator, struct_hash):
+    return keccak(b"\x19\x01" + domain_separator + struct_hash)
+
+
+def sign(private_key, domain_separator, struct_hash):
+    # 65 byte r || s || v signature with v in {27, 28}, as Permit2's SignatureVerification expects
+    from eth_keys import keys
+
+    if isinstance(private_key, str):
+        private_key = bytes.fromhex(private_key[2:])
+    signature = keys.PrivateKey(private_key).sign_msg_hash(
+        signing_hash(domain_separator, struct_hash)
+    )
+    return _uint_word(signature.r) + _uint_word(signature.s) + bytes([signature.v + 27])
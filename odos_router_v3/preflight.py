@@ -0,0 +1,217 @@
+from odos_router_v3 import abi
+from odos_router_v3.compact import NULL_ADDRESS, SWAP_COMPACT_SELECTOR, decode_compact_call
+from odos_router_v3.settlement import DEFAULT_SPLIT_BPS, MAX_FEE, SPLIT_DENOM
+
+
+# Pre-flight checks mirroring the requires of OdosRouterV3._swapApproval / _swap and
+# _swapMultiApproval / _swapMulti. Every check returns the revert message the router would fail
+# with, in the order the router evaluates its requires, or None. Requires that depend on the
+# executor output ("Slippage Limit Exceeded") or on token balances cannot be checked up front, nor
+# can the Permit2 signatures and allowances the Permit2 variants transfer with.
+# Arguments follow the abi module: structs as tuples in field order, addresses as hex strings
+_ETH = NULL_ADDRESS
+_MAX_UINT160 = 2**160 - 1
+# No require message, this is what brownie reports for value sent to a non-payable function
+_NOT_PAYABLE = "Cannot send ether to nonpayable function"
+
+
+def _referral_error(fee, fee_recipient):
+    # The fee requires of _swap and _swapMulti, evaluated after the executor ran
+    if fee_recipient.lower() == _ETH:
+        return "Null fee recipient"
+    if fee > MAX_FEE:
+        return "Fee too high"
+    return None
+
+
+def _split_bps(code):
+    return (code >> 32) & 65535 or DEFAULT_SPLIT_BPS
+
+
+def _swap_error(token_info, referral_info):
+    # The requires of _swap, shared by every single token entry point once the input moved
+    input_token, _, _, output_token, quote, output_min, _ = token_info
+    code, fee, fee_recipient = referral_info
+    if output_min > quote:
+        return "Minimum greater than quote"
+    if not output_min:
+        return "Minimum output is zero"
+    if input_token.lower() == output_token.lower():
+        return "Arbitrage not supported"
+    if fee:
+        error = _referral_error(fee, fee_recipient)
+        if error is not None:
+            return error
+        if _split_bps(code) > SPLIT_DENOM:
+            return "Invalid Ref Code"
+    return None
+
+
+def check_swap(token_info, referral_info, value=0):
+    # swap, swapWithHook and swapCompact
+    input_token, input_amount = token_info[:2]
+
+    # _swapApproval, an ETH input amount of 0 is replaced by msg.value
+    if input_token.lower() == _ETH:
+        if input_amount and value != input_amount:
+            return "Wrong msg.value"
+    elif value:
+        return "Wrong msg.value"
+    return _swap_error(token_info, referral_info)
+
+
+def _swap_multi_value_error(inputs, value):
+    # _swapMultiApproval and the Permit2 variants, the last ETH input sets the expected msg.value
+    expected_value = 0
+    for token, amount, _ in inputs:
+        if token.lower() == _ETH:
+            expected_value = amount or value
+    if value != expected_value:
+        return "Wrong msg.value"
+    return None
+
+
+def _swap_multi_error(inputs, outputs, referral_info):
+    # The requires of _swapMulti. Duplicates are found through sets in one pass instead of the
+    # router's pairwise loops, reporting the same first failure
+    code, fee, fee_recipient = referral_info
+
+    # Each input is checked against the earlier inputs and then every output
+    output_tokens = {output[0].lower() for output in outputs}
+    input_tokens = set()
+    for token, _, _ in inputs:
+        token = token.lower()
+        if token in input_tokens:
+            return "Duplicate source tokens"
+        if token in output_tokens:
+            return "Arbitrage not supported"
+        input_tokens.add(token)
+
+    output_tokens = set()
+    for token, quote, amount_min, _ in outputs:
+        token = token.lower()
+        if amount_min > quote:
+            return "Minimum greater than quote"
+        if not amount_min:
+            return "Minimum output is zero"
+        if token in output_tokens:
+            return "Duplicate destination tokens"
+        output_tokens.add(token)
+
+    # After the executor ran, the split is checked even without a fee, the fee only per output
+    if _split_bps(code) > SPLIT_DENOM:
+        return "Invalid Ref Code"
+    if fee and outputs:
+        return _referral_error(fee, fee_recipient)
+    return None
+
+
+def check_swap_multi(inputs, outputs, referral_info, value=0):
+    # swapMulti, swapMultiWithHook and swapMultiCompact
+    error = _swap_multi_value_error(inputs, value)
+    if error is not None:
+        return error
+    return _swap_multi_error(inputs, outputs, referral_info)
+
+
+def check_compact_call(data, value=0, address_list=None):
+    # swapCompact or swapMultiCompact calldata, decoded as the router would. Cached addresses need
+    # address_list to be checked, unresolved ones raise a ValueError
+    swap = decode_compact_call(data, address_list)
+    if None in [token for token, _, _ in swap.inputs] + [output[0] for output in swap.outputs]:
+        raise ValueError("Compact call uses the address list, pass address_list to check it")
+
+    referral_info = (swap.referral_code, swap.referral_fee, swap.referral_fee_recipient)
+    if isinstance(data, str):
+        data = bytes.fromhex(data[2:])
+    if data[:4] == SWAP_COMPACT_SELECTOR:
+        (input_token, input_amount, input_receiver), = swap.inputs
+        (output_token, quote, output_min, receiver), = swap.outputs
+        return check_swap(
+            (input_token, input_amount, input_receiver, output_token, quote, output_min, receiver),
+            referral_info,
+            value,
+        )
+    return check_swap_multi(swap.inputs, swap.outputs, referral_info, value)
+
+
+def _check_swap_call(token_info, path_definition, executor, referral_info, *hook, value=0):
+    return check_swap(token_info, referral_info, value)
+
+
+def _check_swap_multi_call(
+    inputs, outputs, path_definition, executor, referral_info, *hook, value=0
+):
+    return check_swap_multi(inputs, outputs, referral_info, value)
+
+
+def _check_swap_permit2_call(
+    permit2, token_info, path_definition, executor, referral_info, *hook, value=0
+):
+    # swapPermit2 and swapPermit2WithHook, not payable
+    if value:
+        return _NOT_PAYABLE
+    return _swap_error(token_info, referral_info)
+
+
+def _check_swap_permit2_allowance_call(
+    permit2, token_info, path_definition, executor, referral_info, value=0
+):
+    # _swapPermit2Allowance, an input amount of 0 is replaced by the balance, which always fits
+    if value:
+        return _NOT_PAYABLE
+    if token_info[1] > _MAX_UINT160:
+        return "Amount too large"
+    return _swap_error(token_info, referral_info)
+
+
+def _check_swap_multi_permit2_call(
+    permit2, inputs, outputs, path_definition, executor, referral_info, *hook, value=0
+):
+    return check_swap_multi(inputs, outputs, referral_info, value)
+
+
+def _check_swap_multi_permit2_allowance_call(
+    permit2, inputs, outputs, path_definition, executor, referral_info, value=0
+):
+    # _swapMultiPermit2Allowance checks the amounts inside the loop that ends with the msg.value
+    # require
+    for token, amount, _ in inputs:
+        if token.lower() != _ETH and amount > _MAX_UINT160:
+            return "Amount too large"
+    return check_swap_multi(inputs, outputs, referral_info, value)
+
+
+# Checks for the abi module entry points, taking the same arguments as their encoders
+CHECKS = {
+    "swap": _check_swap_call,
+    "swapWithHook": _check_swap_call,
+    "swapPermit2": _check_swap_permit2_call,
+    "swapPermit2WithHook": _check_swap_permit2_call,
+    "swapPermit2Allowance": _check_swap_permit2_allowance_call,
+    "swapMulti": _check_swap_multi_call,
+    "swapMultiWithHook": _check_swap_multi_call,
+    "swapMultiPermit2": _check_swap_multi_permit2_call,
+    "swapMultiPermit2WithHook": _check_swap_multi_permit2_call,
+    "swapMultiPermit2Allowance": _check_swap_multi_permit2_allowance_call,
+}
+
+
+def check_call(function, *args, value=0):
+    if function not in CHECKS:
+        raise ValueError(f"No pre-flight check for {function}")
+    return CHECKS[function](*args, value=value)
+
+
+def check_calls(calls):
+    # Bulk check of (function, args, value) triples, returning one revert message or None each
+    return [check_call(function, *args, value=value) for function, args, value in calls]
+
+
+def encode_checked_call(function, *args, value=0):
+    # abi.encode_call behind the pre-flight check, so a call the router would reject is never
+    # encoded or sent
+    error = check_call(function, *args, value=value)
+    if error is not None:
+        raise ValueError(f"{function} would revert: {error}")
+    return abi.encode_call(function, *args)
@@ -0,0 +1,254 @@
+# requests and asyncio are only imported once a call goes out, so the codec modules that reach rpc
+# for its constants and batch_request import in milliseconds
+ETH = "0x0000000000000000000000000000000000000000"
+
+BALANCE_OF_SELECTOR = "0x70a08231"
+ADDRESS_LIST_SELECTOR = "0xb810fb43"
+AGGREGATE3_SELECTOR = "0x82ad56cb"
+
+# Multicall3 is deployed at the same address on most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class RPCError(ValueError):
+    # Error response from the node, as opposed to a transport failure on the way to or from it
+    pass
+
+
+def _batch_payload(calls):
+    return [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+
+
+def _batch_results(calls, response, allow_errors):
+    results = [None] * len(calls)
+    for item in response:
+        if "error" in item:
+            if not allow_errors:
+                raise RPCError(f"RPC error for {calls[item['id']]}: {item['error']}")
+            continue
+        results[item["id"]] = item["result"]
+
+    return results
+
+
+def batch_request(endpoint_uri, calls, session=None, timeout=600, allow_errors=False):
+    # Sends a list of (method, params) pairs as a single JSON-RPC batch and returns results in order.
+    # With allow_errors, failed calls (e.g. reverts) come back as None instead of raising
+    if not calls:
+        return []
+
+    if session is None:
+        import requests
+
+        session = requests
+    response = session.post(
+        endpoint_uri, json=_batch_payload(calls), timeout=timeout
+    )
+    response.raise_for_status()
+
+    return _batch_results(calls, response.json(), allow_errors)
+
+
+async def async_batch_request(session, endpoint_uri, calls, allow_errors=False):
+    # session is an aiohttp.ClientSession, whose connection pool is shared by concurrent batches
+    if not calls:
+        return []
+
+    async with session.post(endpoint_uri, json=_batch_payload(calls)) as response:
+        response.raise_for_status()
+
+        return _batch_results(calls, await response.json(content_type=None), allow_errors)
+
+
+def eth_call(to, data, block="latest"):
+    return "eth_call", [{"to": to, "data": data}, block]
+
+
+def balance_call(token, holder, block="latest"):
+    if token == ETH:
+        return "eth_getBalance", [holder, block]
+    return eth_call(token, BALANCE_OF_SELECTOR + holder[2:].lower().rjust(64, "0"), block)
+
+
+def address_list_call(router_address, index, block="latest"):
+    return eth_call(router_address, ADDRESS_LIST_SELECTOR + format(index, "064x"), block)
+
+
+def decode_uint(result):
+    # Failed calls read with allow_errors stay None rather than decoding as zero
+    if result is None:
+        return None
+    return int(result, 16) if result and result != "0x" else 0
+
+
+def decode_address(result):
+    return None if result is None else "0x" + result[-40:]
+
+
+def encode_aggregate3(calls):
+    # Packs (target, data) eth_calls into one Multicall3 aggregate3 call that allows failures
+    from eth_abi import encode
+
+    return AGGREGATE3_SELECTOR + encode(
+        ["(address,bool,bytes)[]"],
+        [[(target, True, bytes.fromhex(data[2:])) for target, data in calls]],
+    ).hex()
+
+
+def decode_aggregate3(result):
+    from eth_abi import decode
+
+    return [
+        "0x" + data.hex() if success else None
+        for success, data in decode(["(bool,bytes)[]"], bytes.fromhex(result[2:]))[0]
+    ]
+
+
+def _chunks(calls, chunk_size):
+    return [calls[start:start + chunk_size] for start in range(0, len(calls), chunk_size)]
+
+
+def _aggregate_calls(calls, chunk_size, multicall_address):
+    # Each chunk of eth_calls becomes a single aggregate eth_call at the block of the first call
+    aggregate_calls = []
+    for chunk in _chunks(calls, chunk_size):
+        targets = [(params[0]["to"], params[0]["data"]) for _, params in chunk]
+        aggregate_calls.append(
+            eth_call(multicall_address, encode_aggregate3(targets), chunk[0][1][1])
+        )
+
+    return aggregate_calls
+
+
+def bulk_request(
+    endpoint_uri,
+    calls,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    multicall_address=None,
+    allow_errors=False,
+    session=None,
+):
+    # Runs calls in JSON-RPC batches of chunk_size, or as aggregate eth_calls of chunk_size through
+    # multicall_address when given (only eth_calls can be aggregated)
+    if session is None:
+        import requests
+
+        session = requests.Session()
+
+    if multicall_address is None:
+        results = []
+        for chunk in _chunks(calls, chunk_size):
+            results += batch_request(endpoint_uri, chunk, session, allow_errors=allow_errors)
+        return results
+
+    results = []
+    for chunk in _chunks(_aggregate_calls(calls, chunk_size, multicall_address), chunk_size):
+        for result in batch_request(endpoint_uri, chunk, session):
+            results += decode_aggregate3(result)
+
+    if not allow_errors and None in results:
+        raise ValueError(f"Call {results.index(None)} failed in multicall")
+
+    return results
+
+
+async def async_bulk_request(
+    session,
+    endpoint_uri,
+    calls,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    multicall_address=None,
+    allow_errors=False,
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+):
+    # Same as bulk_request, but with up to max_concurrency requests in flight on an aiohttp session
+    import asyncio
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(chunk):
+        async with semaphore:
+            return await async_batch_request(session, endpoint_uri, chunk, allow_errors)
+
+    if multicall_address is None:
+        chunk_results = await asyncio.gather(*[run(chunk) for chunk in _chunks(calls, chunk_size)])
+        return [result for chunk in chunk_results for result in chunk]
+
+    chunk_results = await asyncio.gather(
+        *[run([call]) for call in _aggregate_calls(calls, chunk_size, multicall_address)]
+    )
+    results = [result for chunk in chunk_results for result in decode_aggregate3(chunk[0])]
+
+    if not allow_errors and None in results:
+        raise ValueError(f"Call {results.index(None)} failed in multicall")
+
+    return results
+
+
+def read_balances(endpoint_uri, holder, tokens, block="latest", **kwargs):
+    # Reads the native or ERC20 balance of holder for every token.
+    # Native balances cannot go through a multicall, so they are read with a plain batch
+    calls = [balance_call(token, holder, block) for token in tokens]
+
+    if kwargs.get("multicall_address") is None:
+        return [decode_uint(result) for result in bulk_request(endpoint_uri, calls, **kwargs)]
+
+    erc20 = [i for i, token in enumerate(tokens) if token != ETH]
+    native = [i for i, token in enumerate(tokens) if token == ETH]
+
+    balances = [0] * len(tokens)
+    for i, result in zip(erc20, bulk_request(endpoint_uri, [calls[i] for i in erc20], **kwargs)):
+        balances[i] = decode_uint(result)
+    for i, result in zip(native, batch_request(endpoint_uri, [calls[i] for i in native])):
+        balances[i] = decode_uint(result)
+
+    return balances
+
+
+async def async_read_balances(session, endpoint_uri, holder, tokens, block="latest", **kwargs):
+    import asyncio
+
+    calls = [balance_call(token, holder, block) for token in tokens]
+
+    if kwargs.get("multicall_address") is None:
+        return [
+            decode_uint(result)
+            for result in await async_bulk_request(session, endpoint_uri, calls, **kwargs)
+        ]
+
+    erc20 = [i for i, token in enumerate(tokens) if token != ETH]
+    native = [i for i, token in enumerate(tokens) if token == ETH]
+
+    erc20_results, native_results = await asyncio.gather(
+        async_bulk_request(session, endpoint_uri, [calls[i] for i in erc20], **kwargs),
+        async_batch_request(session, endpoint_uri, [calls[i] for i in native]),
+    )
+    balances = [0] * len(tokens)
+    for i, result in zip(erc20 + native, erc20_results + native_results):
+        balances[i] = decode_uint(result)
+
+    return balances
+
+
+def read_address_list(endpoint_uri, router_address, start, count, block="latest", **kwargs):
+    # Reads addressList(start) through addressList(start + count - 1)
+    calls = [address_list_call(router_address, i, block) for i in range(start, start + count)]
+
+    return [decode_address(result) for result in bulk_request(endpoint_uri, calls, **kwargs)]
+
+
+async def async_read_address_list(
+    session, endpoint_uri, router_address, start, count, block="latest", **kwargs
+):
+    calls = [address_list_call(router_address, i, block) for i in range(start, start + count)]
+
+    return [
+        decode_address(result)
+        for result in await async_bulk_request(session, endpoint_uri, calls, **kwargs)
+    ]
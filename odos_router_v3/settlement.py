@@ -0,0 +1,200 @@
+from odos_router_v3.compact import NULL_ADDRESS
+
+
+# Mirrors the output settlement at the end of OdosRouterV3._swap and _swapMulti: referral fee split,
+# fee deduction, positive slippage cap and minimum output check, with the same integer rounding,
+# overflow checks and revert messages. test_settle_matches_router compares it with router.swap
+FEE_DENOM = 10**18
+MAX_FEE = FEE_DENOM // 50
+DEFAULT_SPLIT_BPS = 8000
+SPLIT_DENOM = 10000
+
+_UINT256_LIMIT = 1 << 256
+_INT256_LIMIT = 1 << 255
+
+# Pre-swap checks, which in _swapMulti run for every output before any output is settled
+_MINIMUM_ERRORS = ("Minimum greater than quote", "Minimum output is zero")
+
+
+def _int256(value):
+    # int256(uint256) conversions wrap rather than revert
+    return value - _UINT256_LIMIT if value >= _INT256_LIMIT else value
+
+
+class Settlements:
+    # Outcome of every settled output, one list per field. Reverted outputs have an error and
+    # zero payouts. router_revenue is what stays in the router: the fee share not sent to the
+    # referrer plus any capped positive slippage
+    FIELDS = ("user_payout", "referrer_payout", "router_revenue", "slippage", "error")
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, [])
+
+    def __len__(self):
+        return len(self.user_payout)
+
+
+def settle(
+    amounts_out,
+    quotes,
+    amounts_min,
+    codes,
+    fees,
+    fee_recipients,
+    router_address,
+    multi=False,
+    settlements=None,
+):
+    # Settles the executor output amounts_out[i] against the quote, minimum and referral info of
+    # row i. amounts_min may be None to skip the minimum checks, e.g. when replaying logs which do
+    # not record it. With multi, an invalid split reverts even without a fee, as in _swapMulti.
+    # Rows are independent, see settle_swap_multis for the all or nothing semantics of one swap
+    settlements = Settlements() if settlements is None else settlements
+    router_address = router_address.lower()
+    fee_denom = FEE_DENOM
+    split_denom = FEE_DENOM * SPLIT_DENOM
+
+    user_payouts = settlements.user_payout.append
+    referrer_payouts = settlements.referrer_payout.append
+    router_revenues = settlements.router_revenue.append
+    slippages = settlements.slippage.append
+    errors = settlements.error.append
+
+    if amounts_min is None:
+        amounts_min = [None] * len(amounts_out)
+
+    for amount_out, quote, amount_min, code, fee, fee_recipient in zip(
+        amounts_out, quotes, amounts_min, codes, fees, fee_recipients
+    ):
+        error = None
+        referrer_payout = 0
+        net = amount_out
+        split = (code >> 32) & 65535 or DEFAULT_SPLIT_BPS
+
+        if amount_min is not None and amount_min > quote:
+            error = "Minimum greater than quote"
+        elif amount_min == 0:
+            error = "Minimum output is zero"
+        elif multi and split > SPLIT_DENOM:
+            error = "Invalid Ref Code"
+        elif fee:
+            if fee_recipient == NULL_ADDRESS:
+                error = "Null fee recipient"
+            elif fee > MAX_FEE:
+                error = "Fee too high"
+            elif split > SPLIT_DENOM:
+                error = "Invalid Ref Code"
+            else:
+                # The referrer amount is only computed, and so can only overflow, when it is sent
+                if fee_recipient.lower() != router_address:
+                    referrer_payout = amount_out * fee * split
+                    if referrer_payout >= _UINT256_LIMIT:
+                        error = "Arithmetic overflow"
+                    referrer_payout //= split_denom
+                net = amount_out * (fee_denom - fee)
+                if net >= _UINT256_LIMIT:
+                    error = error or "Arithmetic overflow"
+                net //= fee_denom
+
+        if error is None:
+            slippage = _int256(net) - _int256(quote)
+            if not -_INT256_LIMIT <= slippage < _INT256_LIMIT:
+                error = "Arithmetic overflow"
+            else:
+                user_payout = quote if slippage > 0 and not (code >> 48) & 1 else net
+                if amount_min is not None and user_payout < amount_min:
+                    error = "Slippage Limit Exceeded"
+
+        if error is None:
+            user_payouts(user_payout)
+            referrer_payouts(referrer_payout)
+            router_revenues(amount_out - user_payout - referrer_payout)
+            slippages(slippage)
+        else:
+            user_payouts(0)
+            referrer_payouts(0)
+            router_revenues(0)
+            slippages(0)
+        errors(error)
+
+    return settlements
+
+
+def settlement_inputs(amounts_out, slippages, codes, fees):
+    # Recovers (executor outputs, quotes) from the amountOut and slippage of Swap logs.
+    # The quote follows from whether the output was capped. The fee deduction rounds down, so the
+    # executor output is the smallest one that settles to the logged amount
+    gross_amounts = []
+    quotes = []
+    for amount_out, slippage, code, fee in zip(amounts_out, slippages, codes, fees):
+        if slippage > 0 and not (code >> 48) & 1:
+            quote = amount_out
+        else:
+            quote = amount_out - slippage
+        net = quote + slippage
+
+        gross_amounts.append(-(-net * FEE_DENOM // (FEE_DENOM - fee)) if fee else net)
+        quotes.append(quote)
+
+    return gross_amounts, quotes
+
+
+def settle_swaps(swaps, router_address, codes=None, fees=None, fee_recipients=None):
+    # Replays decoded Swap logs, under their own referral info or under the given columns
+    gross_amounts, quotes = settlement_inputs(
+        swaps.amount_out, swaps.slippage, swaps.referral_code, swaps.referral_fee
+    )
+    return settle(
+        gross_amounts,
+        quotes,
+        None,
+        swaps.referral_code if codes is None else codes,
+        swaps.referral_fee if fees is None else fees,
+        swaps.referral_fee_recipient if fee_recipients is None else fee_recipients,
+        router_address,
+    )
+
+
+def settle_swap_multis(swap_multis, router_address, codes=None, fees=None, fee_recipients=None):
+    # Replays decoded SwapMulti logs, returning settlements per output leg. A failing leg reverts
+    # its whole swap, so every leg of that swap gets the error the contract would revert with
+    leg_counts = [
+        end - start
+        for start, end in zip([0] + swap_multis.outputs_end[:-1], swap_multis.outputs_end)
+    ]
+
+    def per_leg(column):
+        return [value for value, count in zip(column, leg_counts) for i in range(count)]
+
+    leg_codes = per_leg(swap_multis.referral_code)
+    leg_fees = per_leg(swap_multis.referral_fee)
+    gross_amounts, quotes = settlement_inputs(
+        swap_multis.amounts_out, swap_multis.slippage, leg_codes, leg_fees
+    )
+    settlements = settle(
+        gross_amounts,
+        quotes,
+        None,
+        leg_codes if codes is None else per_leg(codes),
+        leg_fees if fees is None else per_leg(fees),
+        per_leg(swap_multis.referral_fee_recipient if fee_recipients is None else fee_recipients),
+        router_address,
+        multi=True,
+    )
+
+    start = 0
+    for end in swap_multis.outputs_end:
+        leg_errors = [error for error in settlements.error[start:end] if error is not None]
+        if leg_errors:
+            minimum_errors = [error for error in leg_errors if error in _MINIMUM_ERRORS]
+            error = (minimum_errors or leg_errors)[0]
+            for i in range(start, end):
+                settlements.user_payout[i] = 0
+                settlements.referrer_payout[i] = 0
+                settlements.router_revenue[i] = 0
+                settlements.slippage[i] = 0
+                settlements.error[i] = error
+        start = end
+
+    return settlements
@@ -0,0 +1,154 @@
+import glob
+import mmap
+import os
+import struct
+
+from odos_router_v3.addresses import canonical, to_bytes
+
+# Snapshot layout, all integers little endian:
+#   header (64 bytes)  magic, chain id, router, list length, last block, index slots
+#   address table      list length * 20 byte addresses, in list order
+#   hash index         index slots * uint32, each 0 for empty or list position + 1
+# Addresses are keccak derived, so their leading bytes are used directly as the hash.
+# Addresses may be given as hex, bytes or ints and are handed out as canonical hex, see addresses
+MAGIC = b"ODOSAL01"
+HEADER = struct.Struct("<8sQ20sQqQ4x")
+SLOT = struct.Struct("<I")
+
+
+def _index_slots(length):
+    # Power of two with a load factor of at most one half
+    slots = 1
+    while slots < 2 * length:
+        slots <<= 1
+    return slots
+
+
+def _slot(address_bytes, mask):
+    return int.from_bytes(address_bytes[:8], "little") & mask
+
+
+def _snapshot_prefix(directory, chain_id, router_address):
+    return os.path.join(directory, f"address_list_{chain_id}_{canonical(router_address)}_")
+
+
+def snapshot_path(directory, chain_id, router_address, length):
+    return f"{_snapshot_prefix(directory, chain_id, router_address)}{length}.bin"
+
+
+def write_snapshot(path, chain_id, router_address, addresses, last_block=-1):
+    addresses = [to_bytes(address) for address in addresses]
+    slots = _index_slots(len(addresses))
+    mask = slots - 1
+
+    index = [0] * slots
+    for position, address in enumerate(addresses):
+        slot = _slot(address, mask)
+        while index[slot]:
+            # Keep the first position of addresses that were appended more than once
+            if addresses[index[slot] - 1] == address:
+                break
+            slot = (slot + 1) & mask
+        else:
+            index[slot] = position + 1
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                chain_id,
+                to_bytes(router_address),
+                len(addresses),
+                last_block,
+                slots,
+            )
+        )
+        f.write(b"".join(addresses))
+        f.write(struct.pack(f"<{slots}I", *index))
+    os.replace(tmp_path, path)
+
+
+def write_codebook_snapshot(directory, codebook):
+    # Snapshots are versioned by the on-chain list length they cover
+    path = snapshot_path(directory, codebook.chain_id, codebook.router_address, len(codebook))
+    write_snapshot(
+        path, codebook.chain_id, codebook.router_address, codebook.addresses, codebook.last_block
+    )
+    return path
+
+
+class MappedCodebook:
+    # Read-only view of a snapshot. Pages are mapped from the file, so nothing is parsed on load
+    # and every worker process mapping the same file shares one copy in the page cache.
+    # Supports `in`, index() and [] like the plain address lists the compact codec takes
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.chain_id, router, self.length, self.last_block, slots = HEADER.unpack_from(
+            self.buffer
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an address list snapshot")
+
+        self.router_address = canonical(router)
+        self.mask = slots - 1
+        self.table_offset = HEADER.size
+        self.index_offset = self.table_offset + 20 * self.length
+
+    def close(self):
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.length
+
+    def address_bytes(self, position):
+        if not 0 <= position < self.length:
+            raise IndexError("address list index out of range")
+        offset = self.table_offset + 20 * position
+        return self.buffer[offset:offset + 20]
+
+    def __getitem__(self, position):
+        return canonical(self.address_bytes(position))
+
+    def find(self, address):
+        # Position of address in the list, or None if it is not cached
+        address_bytes = to_bytes(address)
+        slot = _slot(address_bytes, self.mask)
+
+        while True:
+            position = SLOT.unpack_from(self.buffer, self.index_offset + 4 * slot)[0]
+            if not position:
+                return None
+            offset = self.table_offset + 20 * (position - 1)
+            if self.buffer[offset:offset + 20] == address_bytes:
+                return position - 1
+            slot = (slot + 1) & self.mask
+
+    def index(self, address):
+        position = self.find(address)
+        if position is None:
+            raise ValueError(f"{address} is not in the address list")
+        return position
+
+    def __contains__(self, address):
+        return self.find(address) is not None
+
+
+def load_latest_snapshot(directory, chain_id, router_address, min_length=0):
+    # Maps the snapshot covering the longest list, if it covers at least min_length entries
+    prefix = _snapshot_prefix(directory, chain_id, router_address)
+    lengths = [int(path[len(prefix):-len(".bin")]) for path in glob.glob(f"{prefix}*.bin")]
+
+    if not lengths or max(lengths) < min_length:
+        return None
+
+    return MappedCodebook(snapshot_path(directory, chain_id, router_address, max(lengths)))
@@ -0,0 +1,220 @@
+from odos_router_v3 import abi, compact
+
+
+# Slotted versions of the router's structs that cache their encodings. Every field keeps its ABI
+# words and compact encoding once computed, setting a field drops only that field's entries (and
+# the joined ABI encoding), so refreshing an amount re-encodes one word.
+# The structs iterate in field order, so they can be passed anywhere a tuple is taken, and the
+# abi encoders use the cached encoding directly
+
+
+def _uint64(value):
+    if value >> 64:
+        raise ValueError("Referral code and fee must fit in uint64")
+    return abi._uint(value)
+
+
+def _signature(signature):
+    # The only dynamic member of permit2Info, at a fixed offset of four words
+    return abi._uint(128) + abi._bytes(signature)
+
+
+def _compact_address(address, address_list):
+    return compact.encode_address(address, address_list)
+
+
+def _compact_amount(amount, address_list):
+    return compact.encode_amount(amount)
+
+
+class _Struct:
+    __slots__ = ("_abi_words", "_abi_encoding", "_compact_words", "_address_list")
+
+    FIELDS = ()
+    # Per field: value -> ABI words, and (value, address_list) -> compact encoding or None for
+    # fields that compact calldata does not carry
+    ABI_ENCODERS = ()
+    COMPACT_ENCODERS = ()
+
+    def __init_subclass__(cls):
+        cls._INDEX = {field: i for i, field in enumerate(cls.FIELDS)}
+
+    def __init__(self, *values):
+        if len(values) != len(self.FIELDS):
+            raise ValueError(f"{type(self).__name__} takes {len(self.FIELDS)} fields")
+        for field, value in zip(self.FIELDS, values):
+            object.__setattr__(self, field, value)
+        # The caches are only allocated once something is encoded
+        object.__setattr__(self, "_abi_words", None)
+        object.__setattr__(self, "_abi_encoding", None)
+        object.__setattr__(self, "_compact_words", None)
+        object.__setattr__(self, "_address_list", None)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        index = self._INDEX.get(name)
+        if index is None:
+            return
+        if self._abi_words is not None:
+            self._abi_words[index] = None
+            object.__setattr__(self, "_abi_encoding", None)
+        if self._compact_words is not None:
+            self._compact_words[index] = None
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            yield getattr(self, field)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+    @property
+    def abi_encoding(self):
+        # The struct's ABI encoding as abi._swap_token_info etc. return it
+        encoding = self._abi_encoding
+        if encoding is None:
+            words = self._abi_words
+            if words is None:
+                words = [None] * len(self.FIELDS)
+                object.__setattr__(self, "_abi_words", words)
+            for i, encode in enumerate(self.ABI_ENCODERS):
+                if words[i] is None:
+                    words[i] = encode(getattr(self, self.FIELDS[i]))
+            encoding = b"".join(words)
+            object.__setattr__(self, "_abi_encoding", encoding)
+        return encoding
+
+    def compact_field(self, field, address_list=None):
+        # Compact encoding of one field. Address encodings depend on the address list, so the
+        # cache only holds encodings made against the last address_list object passed
+        words = self._compact_words
+        if words is None or address_list is not self._address_list:
+            words = [None] * len(self.FIELDS)
+            object.__setattr__(self, "_compact_words", words)
+            object.__setattr__(self, "_address_list", address_list)
+        i = self._INDEX[field]
+        word = words[i]
+        if word is None:
+            word = words[i] = self.COMPACT_ENCODERS[i](getattr(self, field), address_list)
+        return word
+
+    def compact(self, address_list=None):
+        # The struct as it appears in swapMultiCompact calldata
+        return b"".join(
+            [
+                self.compact_field(field, address_list)
+                for field, encode in zip(self.FIELDS, self.COMPACT_ENCODERS)
+                if encode is not None
+            ]
+        )
+
+
+class SwapTokenInfo(_Struct):
+    __slots__ = FIELDS = (
+        "input_token",
+        "input_amount",
+        "input_receiver",
+        "output_token",
+        "output_quote",
+        "output_min",
+        "output_receiver",
+    )
+    ABI_ENCODERS = (
+        abi._address, abi._uint, abi._address, abi._address, abi._uint, abi._uint, abi._address
+    )
+    # swapCompact carries a slippage tolerance instead of the minimum, see encode_swap_compact
+    COMPACT_ENCODERS = (
+        _compact_address,
+        _compact_amount,
+        _compact_address,
+        _compact_address,
+        _compact_amount,
+        None,
+        _compact_address,
+    )
+
+
+class InputTokenInfo(_Struct):
+    __slots__ = FIELDS = ("token_address", "amount_in", "receiver")
+    ABI_ENCODERS = (abi._address, abi._uint, abi._address)
+    COMPACT_ENCODERS = (_compact_address, _compact_amount, _compact_address)
+
+
+class OutputTokenInfo(_Struct):
+    __slots__ = FIELDS = ("token_address", "amount_quote", "amount_min", "receiver")
+    ABI_ENCODERS = (abi._address, abi._uint, abi._uint, abi._address)
+    COMPACT_ENCODERS = (_compact_address, _compact_amount, None, _compact_address)
+
+
+class SwapReferralInfo(_Struct):
+    __slots__ = FIELDS = ("code", "fee", "fee_recipient")
+    ABI_ENCODERS = (_uint64, _uint64, abi._address)
+    COMPACT_ENCODERS = (None, None, None)
+
+    def compact(self, address_list=None):
+        # The fee recipient is only present with a fee, so the referral is encoded as a whole and
+        # cached under every field
+        words = self._compact_words
+        if words is None or None in words:
+            words = [compact.encode_referral(self.code, self.fee, self.fee_recipient)] * 3
+            object.__setattr__(self, "_compact_words", words)
+        return words[0]
+
+
+class Permit2Info(_Struct):
+    __slots__ = FIELDS = ("contract_address", "nonce", "deadline", "signature")
+    ABI_ENCODERS = (abi._address, abi._uint, abi._uint, _signature)
+    COMPACT_ENCODERS = (None, None, None, None)
+
+
+def encode_swap_compact(
+    token_info, executor, slippage_tolerance, referral_info, path_definition, address_list=None
+):
+    # Full swapCompact calldata. An input receiver equal to the executor is sent as the null
+    # address, which the router reads as the executor
+    field = token_info.compact_field
+    input_receiver = (
+        b"\x00\x00"
+        if token_info.input_receiver.lower() == executor.lower()
+        else field("input_receiver", address_list)
+    )
+    return b"".join(
+        [
+            compact.SWAP_COMPACT_SELECTOR,
+            field("input_token", address_list),
+            field("output_token", address_list),
+            field("input_amount", address_list),
+            field("output_quote", address_list),
+            slippage_tolerance.to_bytes(3, "big"),
+            compact.encode_address(executor, address_list),
+            input_receiver,
+            field("output_receiver", address_list),
+            referral_info.compact(),
+            compact.encode_path_definition(path_definition),
+        ]
+    )
+
+
+def encode_swap_multi_compact(
+    inputs, outputs, executor, slippage_tolerance, referral_info, path_definition, address_list=None
+):
+    # Full swapMultiCompact calldata, see encode_swap_compact
+    return b"".join(
+        [
+            compact.SWAP_MULTI_COMPACT_SELECTOR,
+            bytes([len(inputs), len(outputs)]),
+            compact.encode_address(executor, address_list),
+            slippage_tolerance.to_bytes(3, "big"),
+        ]
+        + [token_info.compact(address_list) for token_info in inputs]
+        + [token_info.compact(address_list) for token_info in outputs]
+        + [referral_info.compact(), compact.encode_path_definition(path_definition)]
+    )
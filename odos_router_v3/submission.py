@@ -0,0 +1,305 @@
+import asyncio
+import collections
+import contextlib
+import heapq
+import logging
+
+from odos_router_v3.rpc import DEFAULT_CHUNK_SIZE, RPCError, _chunks, async_batch_request
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_MAX_IN_FLIGHT = 256
+DEFAULT_POLL_INTERVAL = 0.1
+
+# Seconds without a receipt after which a transaction is taken to be dropped or replaced
+DEFAULT_RECEIPT_TIMEOUT = 600
+
+# Attempts at sending a transaction when the node reports that the local nonce fell behind
+SEND_ATTEMPTS = 2
+
+# Failed receipt polls back off exponentially up to MAX_POLL_BACKOFF seconds. After
+# MAX_POLL_FAILURES in a row the poller gives up and fails every pending transaction
+MAX_POLL_BACKOFF = 5.0
+MAX_POLL_FAILURES = 10
+
+
+def pooled_session(max_connections=DEFAULT_MAX_CONNECTIONS):
+    # aiohttp session whose keep-alive connections are shared by sends and receipt polls
+    import aiohttp
+
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=max_connections))
+
+
+class AsyncNonceManager:
+    # Allocates nonces per sender without a round trip per transaction. Nonces that were handed
+    # out but never reached the node are released and handed out again first, so later
+    # transactions do not wait behind a gap
+
+    def __init__(self, session, endpoint_uri):
+        self.session = session
+        self.endpoint_uri = endpoint_uri
+        self.next_nonces = {}
+        self.released = {}
+        self.locks = {}
+
+    def _lock(self, sender):
+        return self.locks.setdefault(sender, asyncio.Lock())
+
+    async def transaction_count(self, sender, block="pending"):
+        (result,) = await async_batch_request(
+            self.session, self.endpoint_uri, [("eth_getTransactionCount", [sender, block])]
+        )
+        return int(result, 16)
+
+    def set(self, sender, nonce):
+        self.next_nonces[sender.lower()] = nonce
+
+    async def allocate(self, sender):
+        sender = sender.lower()
+        async with self._lock(sender):
+            if self.released.get(sender):
+                return heapq.heappop(self.released[sender])
+
+            if sender not in self.next_nonces:
+                self.next_nonces[sender] = await self.transaction_count(sender)
+            nonce = self.next_nonces[sender]
+            self.next_nonces[sender] = nonce + 1
+            return nonce
+
+    def release(self, sender, nonce):
+        heapq.heappush(self.released.setdefault(sender.lower(), []), nonce)
+
+    def claim(self, sender, nonce):
+        # Takes a released nonce back out, e.g. to fill the gap it left with another transaction
+        released = self.released.get(sender.lower(), [])
+        if nonce in released:
+            released.remove(nonce)
+            heapq.heapify(released)
+
+    async def resync(self, sender):
+        # Moves past nonces the node has already seen, e.g. after transactions sent elsewhere
+        sender = sender.lower()
+        async with self._lock(sender):
+            count = await self.transaction_count(sender)
+            self.next_nonces[sender] = max(count, self.next_nonces.get(sender, 0))
+
+            released = [nonce for nonce in self.released.get(sender, []) if nonce >= count]
+            heapq.heapify(released)
+            self.released[sender] = released
+
+
+class SubmissionPipeline:
+    # Sends signed router transactions concurrently and resolves their receipts. A single poller
+    # task fetches the receipts of every transaction in flight in JSON-RPC batches. Receipts
+    # nobody waited for are only kept for the last max_in_flight transactions
+
+    def __init__(
+        self,
+        session,
+        endpoint_uri,
+        nonce_manager=None,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+        poll_interval=DEFAULT_POLL_INTERVAL,
+        receipt_timeout=DEFAULT_RECEIPT_TIMEOUT,
+    ):
+        self.session = session
+        self.endpoint_uri = endpoint_uri
+        self.nonces = nonce_manager or AsyncNonceManager(session, endpoint_uri)
+        self.poll_interval = poll_interval
+        self.receipt_timeout = receipt_timeout
+        self.max_resolved = max_in_flight
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.pending = {}
+        self.receipts = {}
+        self.resolved = collections.OrderedDict()
+        self.in_flight = {}
+        self.poller = None
+
+    async def send(self, sender, sign, nonce=None):
+        # sign(nonce) returns a SignedTransaction, e.g. a TransactionAssembler call with that
+        # nonce. Returns the transaction hash once the node accepted the transaction
+        sender = sender.lower()
+        in_flight = self.in_flight.setdefault(sender, set())
+        await self.slots.acquire()
+        try:
+            for attempt in range(SEND_ATTEMPTS):
+                allocated = nonce if nonce is not None else await self.nonces.allocate(sender)
+                # Counted as in flight from allocation, so detect_gaps does not report a nonce
+                # that is still being signed or sent
+                in_flight.add(allocated)
+                try:
+                    signed = sign(allocated)
+                except BaseException:
+                    self._release(sender, allocated, nonce is None)
+                    raise
+
+                try:
+                    await async_batch_request(
+                        self.session,
+                        self.endpoint_uri,
+                        [("eth_sendRawTransaction", ["0x" + signed.raw_transaction.hex()])],
+                    )
+                    break
+                except RPCError as e:
+                    # The node rejected the transaction, so the nonce was not used. A caller
+                    # supplied nonce that is too low is not swapped for a fresh one
+                    self._release(sender, allocated, nonce is None)
+                    if (
+                        "nonce too low" not in str(e).lower()
+                        or nonce is not None
+                        or attempt + 1 == SEND_ATTEMPTS
+                    ):
+                        raise
+                    await self.nonces.resync(sender)
+                except BaseException as e:
+                    # After a timeout, dropped connection or cancellation the node may still have
+                    # the transaction, so the nonce stays reserved. If it never arrived,
+                    # detect_gaps reports it once it is no longer in flight
+                    in_flight.discard(allocated)
+                    if not isinstance(e, asyncio.CancelledError):
+                        with contextlib.suppress(Exception):
+                            await self.nonces.resync(sender)
+                    raise
+        except BaseException:
+            self.slots.release()
+            raise
+
+        tx_hash = "0x" + signed.hash.hex()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.receipt_timeout
+        self.pending[tx_hash] = (sender, allocated, nonce is None, deadline)
+        self.receipts[tx_hash] = loop.create_future()
+
+        if self.poller is None:
+            self.poller = asyncio.create_task(self._poll())
+
+        return tx_hash
+
+    def _release(self, sender, nonce, allocated):
+        # Only nonces the manager handed out go back to it, a caller supplied nonce is the caller's
+        self.in_flight[sender].discard(nonce)
+        if allocated:
+            self.nonces.release(sender, nonce)
+
+    async def wait(self, tx_hash, timeout=None):
+        # Receipt of a transaction sent through the pipeline, can be awaited once per transaction
+        receipt = self.receipts.get(tx_hash, self.resolved.get(tx_hash))
+        if receipt is None:
+            raise KeyError(f"{tx_hash} is not pending or recently resolved in this pipeline")
+        result = await asyncio.wait_for(asyncio.shield(receipt), timeout)
+        self.resolved.pop(tx_hash, None)
+        return result
+
+    async def submit(self, sender, sign, timeout=None):
+        # Sends and resolves to the receipt once mined
+        tx_hash = await self.send(sender, sign)
+        return await self.wait(tx_hash, timeout)
+
+    async def _fetch_receipts(self, hashes):
+        chunk_results = await asyncio.gather(
+            *[
+                async_batch_request(
+                    self.session,
+                    self.endpoint_uri,
+                    [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in chunk],
+                    allow_errors=True,
+                )
+                for chunk in _chunks(hashes, DEFAULT_CHUNK_SIZE)
+            ]
+        )
+        return [receipt for chunk in chunk_results for receipt in chunk]
+
+    async def _poll(self):
+        try:
+            failures = 0
+            while self.pending:
+                hashes = list(self.pending)
+                try:
+                    receipts = await self._fetch_receipts(hashes)
+                except Exception as error:
+                    failures += 1
+                    if failures == MAX_POLL_FAILURES:
+                        raise
+                    backoff = min(self.poll_interval * 2**failures, MAX_POLL_BACKOFF)
+                    logger.warning(
+                        "Receipt poll failed (%d in a row), retrying in %.2fs: %r",
+                        failures,
+                        backoff,
+                        error,
+                    )
+                    await asyncio.sleep(backoff)
+                    continue
+                failures = 0
+
+                now = asyncio.get_running_loop().time()
+                for tx_hash, receipt in zip(hashes, receipts):
+                    if receipt is not None:
+                        self._resolve(tx_hash).set_result(receipt)
+                        continue
+                    sender, nonce, allocated, deadline = self.pending[tx_hash]
+                    if deadline <= now:
+                        # Dropped or replaced. The nonce goes back unless the caller chose it, as
+                        # an unused one leaves a gap and a replaced one is pruned by resync
+                        self._resolve(tx_hash).set_exception(
+                            TimeoutError(
+                                f"No receipt for {tx_hash} after {self.receipt_timeout}s, "
+                                "dropped or replaced"
+                            )
+                        )
+                        if allocated:
+                            self.nonces.release(sender, nonce)
+
+                if self.pending:
+                    await asyncio.sleep(self.poll_interval)
+        except asyncio.CancelledError:
+            for tx_hash in list(self.pending):
+                self._resolve(tx_hash).cancel()
+            raise
+        except Exception as error:
+            # Waiters would otherwise hang and their slots would never be released
+            logger.error("Receipt poller stopped: %r", error)
+            for tx_hash in list(self.pending):
+                self._resolve(tx_hash).set_exception(error)
+        finally:
+            self.poller = None
+
+    def _resolve(self, tx_hash):
+        # Stops tracking a sent transaction and returns the future its receipt goes to, which
+        # stays available to wait() until max_resolved later transactions are resolved
+        sender, nonce, _, _ = self.pending.pop(tx_hash)
+        self.in_flight[sender].discard(nonce)
+        self.slots.release()
+
+        receipt = self.receipts.pop(tx_hash)
+        self.resolved[tx_hash] = receipt
+        if len(self.resolved) > self.max_resolved:
+            self.resolved.popitem(last=False)
+        return receipt
+
+    async def detect_gaps(self, sender):
+        # Nonces below the highest allocated one that the node has not seen and that are not in
+        # flight here. Later transactions of the sender are stuck until these are filled
+        sender = sender.lower()
+        count = await self.nonces.transaction_count(sender)
+        in_flight = self.in_flight.get(sender, set())
+
+        return [
+            nonce
+            for nonce in range(count, self.nonces.next_nonces.get(sender, count))
+            if nonce not in in_flight
+        ]
+
+    async def refill_gaps(self, sender, sign):
+        # Sends sign(nonce) for every gap, e.g. a zero value transfer to the sender itself
+        tx_hashes = []
+        for nonce in await self.detect_gaps(sender):
+            self.nonces.claim(sender, nonce)
+            tx_hashes.append(await self.send(sender, sign, nonce))
+        return tx_hashes
+
+    async def close(self):
+        if self.poller is not None:
+            self.poller.cancel()
+            self.poller = None
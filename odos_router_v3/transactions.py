@@ -0,0 +1,194 @@
+from typing import NamedTuple
+
+from odos_router_v3.compact import SWAP_COMPACT_SELECTOR, SWAP_MULTI_COMPACT_SELECTOR
+from odos_router_v3.rpc import batch_request
+
+
+# EIP-2718 type byte of EIP-1559 transactions
+DYNAMIC_FEE_TX_TYPE = b"\x02"
+
+
+def _rlp_length_prefix(length, offset):
+    if length < 56:
+        return bytes([offset + length])
+    length_bytes = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([offset + 55 + len(length_bytes)]) + length_bytes
+
+
+def rlp_encode(item):
+    # Ints are encoded as minimal big endian byte strings, lists and tuples as RLP lists
+    if isinstance(item, int):
+        item = item.to_bytes((item.bit_length() + 7) // 8, "big")
+    if isinstance(item, (bytes, bytearray)):
+        if len(item) == 1 and item[0] < 0x80:
+            return bytes(item)
+        return _rlp_length_prefix(len(item), 0x80) + bytes(item)
+
+    payload = b"".join([rlp_encode(element) for element in item])
+    return _rlp_length_prefix(len(payload), 0xC0) + payload
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:])
+    return bytes(value)
+
+
+def _access_list_items(access_list):
+    return [
+        [_to_bytes(entry["address"]), [_to_bytes(key) for key in entry["storageKeys"]]]
+        for entry in access_list
+    ]
+
+
+class NonceTracker:
+    # Hands out nonces per sender without a round trip per transaction. Only the first nonce of
+    # a sender, or the next one after reset(), is read from the node
+
+    def __init__(self, endpoint_uri=None):
+        self.endpoint_uri = endpoint_uri
+        self.nonces = {}
+
+    def set(self, sender, nonce):
+        self.nonces[sender.lower()] = nonce
+
+    def reset(self, sender):
+        self.nonces.pop(sender.lower(), None)
+
+    def next(self, sender):
+        sender = sender.lower()
+        if sender not in self.nonces:
+            if self.endpoint_uri is None:
+                raise ValueError(f"No nonce known for {sender}")
+            (result,) = batch_request(
+                self.endpoint_uri, [("eth_getTransactionCount", [sender, "pending"])]
+            )
+            self.nonces[sender] = int(result, 16)
+
+        nonce = self.nonces[sender]
+        self.nonces[sender] = nonce + 1
+        return nonce
+
+
+class SignedTransaction(NamedTuple):
+    raw_transaction: bytes
+    hash: bytes
+    nonce: int
+    gas: int
+
+
+class TransactionAssembler:
+    # Builds and signs EIP-1559 router transactions locally. The chain id is fixed at construction,
+    # nonces come from a NonceTracker and gas limits from a GasModel unless given explicitly
+
+    def __init__(
+        self,
+        private_key,
+        chain_id,
+        router_address,
+        max_fee_per_gas,
+        max_priority_fee_per_gas,
+        nonce_tracker=None,
+        gas_model=None,
+    ):
+        from eth_hash.auto import keccak
+        from eth_keys import keys
+
+        self.keccak = keccak
+        self.private_key = keys.PrivateKey(_to_bytes(private_key))
+        self.sender = self.private_key.public_key.to_checksum_address()
+        self.chain_id = chain_id
+        self.router_address = router_address
+        self.router_bytes = _to_bytes(router_address)
+        self.max_fee_per_gas = max_fee_per_gas
+        self.max_priority_fee_per_gas = max_priority_fee_per_gas
+        self.nonce_tracker = nonce_tracker or NonceTracker()
+        self.gas_model = gas_model
+
+    @classmethod
+    def from_node(
+        cls,
+        endpoint_uri,
+        private_key,
+        router_address,
+        max_fee_per_gas,
+        max_priority_fee_per_gas,
+        gas_model=None,
+    ):
+        # Reads the chain id and starting nonce in a single batch, nothing else touches the node
+        from eth_keys import keys
+
+        sender = keys.PrivateKey(_to_bytes(private_key)).public_key.to_checksum_address()
+        chain_id, nonce = [
+            int(result, 16)
+            for result in batch_request(
+                endpoint_uri,
+                [("eth_chainId", []), ("eth_getTransactionCount", [sender, "pending"])],
+            )
+        ]
+        nonce_tracker = NonceTracker(endpoint_uri)
+        nonce_tracker.set(sender, nonce)
+
+        return cls(
+            private_key,
+            chain_id,
+            router_address,
+            max_fee_per_gas,
+            max_priority_fee_per_gas,
+            nonce_tracker,
+            gas_model,
+        )
+
+    def sign(self, to, data, value=0, gas=None, access_list=(), nonce=None):
+        data = _to_bytes(data)
+        if gas is None:
+            if self.gas_model is None:
+                raise ValueError("No gas limit given and no gas model to predict it")
+            from odos_router_v3.gas import compact_payload_shape
+
+            gas = self.gas_model.gas_limit(
+                compact_payload_shape(data, self.router_address), data, access_list
+            )
+        if nonce is None:
+            nonce = self.nonce_tracker.next(self.sender)
+
+        fields = [
+            self.chain_id,
+            nonce,
+            self.max_priority_fee_per_gas,
+            self.max_fee_per_gas,
+            gas,
+            _to_bytes(to),
+            value,
+            data,
+            _access_list_items(access_list),
+        ]
+        signature = self.private_key.sign_msg_hash(
+            self.keccak(DYNAMIC_FEE_TX_TYPE + rlp_encode(fields))
+        )
+        raw_transaction = DYNAMIC_FEE_TX_TYPE + rlp_encode(
+            fields + [signature.v, signature.r, signature.s]
+        )
+
+        return SignedTransaction(raw_transaction, self.keccak(raw_transaction), nonce, gas)
+
+    def swap_compact(self, payload, value=0, gas=None, access_list=(), nonce=None):
+        # payload is the compact encoding following the selector, as bytes or hex
+        return self.sign(
+            self.router_bytes,
+            SWAP_COMPACT_SELECTOR + _to_bytes(payload),
+            value,
+            gas,
+            access_list,
+            nonce,
+        )
+
+    def swap_multi_compact(self, payload, value=0, gas=None, access_list=(), nonce=None):
+        return self.sign(
+            self.router_bytes,
+            SWAP_MULTI_COMPACT_SELECTOR + _to_bytes(payload),
+            value,
+            gas,
+            access_list,
+            nonce,
+        )
@@ -0,0 +1,57 @@
+import random
+import timeit
+
+from eth_abi import encode
+from odos_router_v3 import abi
+
+
+# Encodes the same arguments for every entry point with eth_abi and with the specialized encoders.
+# Runs without a node, e.g. `python scripts/benchmark_abi_encoder.py`
+ITERATIONS = 5_000
+MULTI_TOKENS = 3
+
+
+def address():
+    return "0x" + random.randbytes(20).hex()
+
+
+def arguments(function):
+    token_info = (address(), 10**18, address(), address(), 3 * 10**9, 3 * 10**9 - 1, address())
+    inputs = [(address(), 10**18, address()) for i in range(MULTI_TOKENS)]
+    outputs = [(address(), 10**18, 10**18 - 1, address()) for i in range(MULTI_TOKENS)]
+    values = {
+        "address": address,
+        "bytes": lambda: random.randbytes(320),
+        abi.SWAP_TOKEN_INFO: lambda: token_info,
+        abi.SWAP_REFERRAL_INFO: lambda: (1, 10**15, address()),
+        abi.PERMIT2_INFO: lambda: (address(), 3, 2**48 - 1, random.randbytes(65)),
+        abi.INPUT_TOKEN_INFO_ARRAY: lambda: inputs,
+        abi.OUTPUT_TOKEN_INFO_ARRAY: lambda: outputs,
+        abi.ROUTER_FUNDS_SWAP_INFO_ARRAY: lambda: [
+            (inputs, outputs, random.randbytes(320), address()) for i in range(MULTI_TOKENS)
+        ],
+        "address[]": lambda: [address() for i in range(MULTI_TOKENS)],
+        "uint256[]": lambda: [10**18] * MULTI_TOKENS,
+    }
+    return [values[argument_type]() for argument_type in abi.ARGUMENT_TYPES[function]]
+
+
+def main():
+    random.seed(0)
+    print(f"{'function':<28}{'eth_abi/s':>12}{'fast/s':>12}{'speedup':>9}")
+
+    for function, types in abi.ARGUMENT_TYPES.items():
+        args = arguments(function)
+        selector = abi.SELECTORS[function]
+        assert abi.encode_call(function, *args) == selector + encode(types, args)
+
+        generic = timeit.timeit(lambda: selector + encode(types, args), number=ITERATIONS)
+        fast = timeit.timeit(lambda: abi.encode_call(function, *args), number=ITERATIONS)
+        print(
+            f"{function:<28}{ITERATIONS / generic:>12.0f}{ITERATIONS / fast:>12.0f}"
+            f"{generic / fast:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
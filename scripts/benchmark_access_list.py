@@ -0,0 +1,126 @@
+import sys
+
+from brownie import OdosRouterV3, OdosWETHExecutor, WETH9, accounts, web3
+from eth_account import Account
+from odos_router_v3 import access_list
+
+sys.path.append("tests")
+from test_lib import encode_compact, utils  # noqa: E402
+
+
+# Run with `brownie run benchmark_access_list` against a local development node.
+# Every payload shape is sent once to warm up balances, then without and with its access list
+INPUT_AMOUNT = 10**15
+NULL_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def send(private_key, to, data, value=0, tx_access_list=None):
+    txn = {
+        "to": to,
+        "data": data,
+        "value": value,
+        "gas": 10_000_000,
+        "gasPrice": 0,
+        "chainId": web3.eth.chain_id,
+        "nonce": web3.eth.get_transaction_count(Account.from_key(private_key).address),
+    }
+    if tx_access_list is not None:
+        txn["accessList"] = tx_access_list
+
+    signed_txn = Account.sign_transaction(txn, private_key)
+    receipt = web3.eth.wait_for_transaction_receipt(
+        web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+    )
+    assert receipt.status == 1
+    return receipt.gasUsed
+
+
+def main():
+    router = OdosRouterV3.deploy(accounts[0].address, {"from": accounts[0]})
+    weth = WETH9.deploy({"from": accounts[0]})
+    executor = OdosWETHExecutor.deploy(weth.address, {"from": accounts[0]})
+
+    address_list = [weth.address, executor.address]
+    router.writeAddressList(address_list, {"from": accounts[0]})
+
+    private_key = utils.random_private_key()
+    sender = Account.from_key(private_key).address
+    accounts[0].transfer(sender, "10 ether")
+
+    # The sender holds WETH and has approved the router for the unwrapping shapes
+    send(private_key, weth.address, weth.deposit.signature, 10**18)
+    send(
+        private_key,
+        weth.address,
+        weth.approve.signature + router.address[2:].lower().rjust(64, "0") + "f" * 64,
+    )
+    layouts = {weth.address: access_list.WETH9_LAYOUT}
+    executor_balance = {
+        weth.address: {
+            access_list.erc20_balance_slot(executor.address, access_list.WETH9_LAYOUT.balance_slot)
+        }
+    }
+
+    def single(path, input_token, output_token, cached, fee_recipient=NULL_ADDRESS):
+        return router.swapCompact.signature + encode_compact.construct_compact_swap_data(
+            path,
+            input_token,
+            output_token,
+            INPUT_AMOUNT,
+            INPUT_AMOUNT,
+            0.01,
+            executor.address,
+            executor.address,
+            "msg.sender",
+            address_list if cached else [],
+            0,
+            10**15 if fee_recipient != NULL_ADDRESS else 0,
+            fee_recipient,
+        )[2:]
+
+    def multi(path, input_token, output_token, cached):
+        return router.swapMultiCompact.signature + encode_compact.construct_compact_swap_multi_data(
+            path,
+            [input_token],
+            [output_token],
+            [INPUT_AMOUNT],
+            [INPUT_AMOUNT],
+            0.01,
+            executor.address,
+            [executor.address],
+            ["msg.sender"],
+            address_list if cached else [],
+            0,
+            0,
+            NULL_ADDRESS,
+        )[2:]
+
+    shapes = [
+        ("wrap inline", single("0x01", NULL_ADDRESS, weth.address, False), INPUT_AMOUNT),
+        ("wrap cached", single("0x01", NULL_ADDRESS, weth.address, True), INPUT_AMOUNT),
+        (
+            "wrap referral fee",
+            single("0x01", NULL_ADDRESS, weth.address, True, accounts[2].address),
+            INPUT_AMOUNT,
+        ),
+        ("unwrap inline", single("0x00", weth.address, NULL_ADDRESS, False), 0),
+        ("unwrap cached", single("0x00", weth.address, NULL_ADDRESS, True), 0),
+        ("multi wrap cached", multi("0x01", NULL_ADDRESS, weth.address, True), INPUT_AMOUNT),
+        ("multi unwrap cached", multi("0x00", weth.address, NULL_ADDRESS, True), 0),
+    ]
+
+    print(f"{'shape':<22}{'entries':>8}{'keys':>6}{'without':>10}{'with':>10}{'saved':>8}")
+    for name, data, value in shapes:
+        tx_access_list = access_list.compact_access_list(
+            data, router.address, sender, address_list, layouts, executor_balance
+        )
+        send(private_key, router.address, data, value)
+        without_gas = send(private_key, router.address, data, value)
+        with_gas = send(private_key, router.address, data, value, tx_access_list)
+
+        print(
+            f"{name:<22}{len(tx_access_list):>8}"
+            f"{sum(len(entry['storageKeys']) for entry in tx_access_list):>6}"
+            f"{without_gas:>10}{with_gas:>10}{without_gas - with_gas:>8}"
+        )
+
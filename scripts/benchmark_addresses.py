@@ -0,0 +1,114 @@
+import random
+import time
+import tracemalloc
+
+from odos_router_v3 import events
+from odos_router_v3.address_list import AddressListCodebook
+from odos_router_v3.addresses import _checksum, to_checksum
+
+
+# Decodes a million synthetic Swap logs and compares the memory held by the decoded address
+# columns, interned against one string per row, and the lookup rates over them: grouping by
+# token, codebook lookups of mixed-case addresses and cached against uncached checksums.
+# Runs without a node, e.g. `python scripts/benchmark_addresses.py`
+LOGS = 1_000_000
+TOKENS = 1_000
+SENDERS = 100_000
+WORD = "0" * 24
+
+
+def address():
+    return "0x" + random.randbytes(20).hex()
+
+
+def synthetic_logs(tokens, senders):
+    # Swap logs with only the address words filled in, as decoding never looks at the rest
+    zero = "0" * 64
+    for i in range(LOGS):
+        words = [
+            WORD + random.choice(senders)[2:],
+            zero,
+            WORD + random.choice(tokens)[2:],
+            zero,
+            WORD + random.choice(tokens)[2:],
+            zero,
+            zero,
+            zero,
+            WORD + tokens[0][2:],
+        ]
+        yield {
+            "data": "0x" + "".join(words),
+            "blockNumber": i // 100,
+            "logIndex": i % 100,
+            "transactionHash": "0x" + zero,
+        }
+
+
+def column_memory(build):
+    tracemalloc.start()
+    columns = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return columns, size
+
+
+def rate(count, run):
+    start = time.perf_counter()
+    run()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    random.seed(0)
+    tokens = [address() for i in range(TOKENS)]
+    senders = [address() for i in range(SENDERS)]
+    logs = list(synthetic_logs(tokens, senders))
+
+    start = time.perf_counter()
+    swaps = events.SwapColumns()
+    for log in logs:
+        swaps.append_log(log)
+    print(f"decoded {LOGS} logs in {time.perf_counter() - start:.2f}s")
+    del logs
+
+    fields = ["sender", "input_token", "output_token", "referral_fee_recipient"]
+    _, interned = column_memory(lambda: [list(getattr(swaps, field)) for field in fields])
+    _, unshared = column_memory(
+        lambda: [[(a + " ")[:-1] for a in getattr(swaps, field)] for field in fields]
+    )
+    print(f"\n{'address columns':<24}{'MiB':>8}")
+    print(f"{'interned':<24}{interned / 2**20:>8.1f}")
+    print(f"{'string per row':<24}{unshared / 2**20:>8.1f}")
+
+    def group_by_token():
+        volume = {}
+        for token, amount in zip(swaps.input_token, swaps.input_amount):
+            volume[token] = volume.get(token, 0) + amount
+
+    codebook = AddressListCodebook(1, tokens[0], tokens)
+    mixed_case = [to_checksum(random.choice(tokens)) for i in range(100_000)]
+    lowercase = [token.lower() for token in mixed_case]
+
+    def find(queries):
+        for query in queries:
+            codebook.find(query)
+
+    def checksums(cached):
+        for token in swaps.output_token[:100_000]:
+            if not cached:
+                _checksum.cache_clear()
+            to_checksum(token)
+
+    print(f"\n{'lookup':<28}{'per second':>12}")
+    for name, count, run in [
+        ("group by input token", LOGS, group_by_token),
+        ("codebook find, lowercase", len(lowercase), lambda: find(lowercase)),
+        ("codebook find, checksummed", len(mixed_case), lambda: find(mixed_case)),
+        ("checksum, uncached", 100_000, lambda: checksums(False)),
+        ("checksum, cached", 100_000, lambda: checksums(True)),
+    ]:
+        print(f"{name:<28}{rate(count, run):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import tempfile
+import time
+
+from brownie import OdosRouterV3, OdosWETHExecutor, WETH9, accounts, chain, web3
+from odos_router_v3 import backfill
+
+
+# Run with `brownie run benchmark_backfill` against a local development node.
+# Builds a synthetic swap history, then backfills it from scratch with 1, 2, 4 and 8 workers
+NUM_SWAPS = 2_000
+EMPTY_BLOCKS = 20_000
+WORKER_COUNTS = [1, 2, 4, 8]
+CHUNK_BLOCKS = 500
+PARTITION_BLOCKS = 1_000
+NULL_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def main():
+    router = OdosRouterV3.deploy(accounts[0].address, {"from": accounts[0]})
+    weth = WETH9.deploy({"from": accounts[0]})
+    weth_executor = OdosWETHExecutor.deploy(weth.address, {"from": accounts[0]})
+
+    # Swaps interleaved with empty stretches, so shards hold a mix of full and empty ranges
+    for i in range(NUM_SWAPS):
+        input_amount = 10**15 + i
+        router.swap(
+            [
+                NULL_ADDRESS,
+                input_amount,
+                weth_executor,
+                weth,
+                input_amount,
+                input_amount,
+                NULL_ADDRESS,
+            ],
+            "0x01",
+            weth_executor,
+            [i, 0, NULL_ADDRESS],
+            {"from": accounts[0], "value": input_amount, "silent": True},
+        )
+        if i % 100 == 0:
+            chain.mine(EMPTY_BLOCKS // (NUM_SWAPS // 100))
+
+    endpoint_uri = web3.provider.endpoint_uri
+    blocks = chain.height - router.tx.block_number + 1
+    print(f"{blocks} blocks, {NUM_SWAPS} swaps")
+
+    baseline = None
+    expected = None
+    for workers in WORKER_COUNTS:
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            store = backfill.backfill_event_store(
+                endpoint_uri,
+                router.address,
+                directory,
+                deployment_block=router.tx.block_number,
+                workers=workers,
+                chunk_blocks=CHUNK_BLOCKS,
+                partition_blocks=PARTITION_BLOCKS,
+            )
+            elapsed = time.perf_counter() - start
+
+            swaps = store.read()[0]
+            # Every worker count has to produce the same store
+            result = (store.partitions(), swaps.transaction_hash, swaps.amount_out)
+            expected = expected or result
+            assert result == expected and len(swaps) == NUM_SWAPS
+
+        baseline = baseline or elapsed
+        print(
+            f"workers={workers:<3} {elapsed:8.3f}s {blocks / elapsed:10.0f} blocks/s "
+            f"{baseline / elapsed:6.2f}x"
+        )
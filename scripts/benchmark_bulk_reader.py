@@ -0,0 +1,71 @@
+import asyncio
+import random
+import time
+
+import aiohttp
+from brownie import OdosRouterV3, WETH9, accounts, web3
+from odos_router_v3 import rpc
+
+
+# Run with `brownie run benchmark_bulk_reader` against a local development node
+READ_COUNTS = [10, 1_000, 10_000]
+WRITE_CHUNK_SIZE = 500
+
+
+def timed(label, n, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} n={n:<6} {elapsed:8.3f}s {n / elapsed:10.0f} reads/s")
+    return result
+
+
+async def async_read_all(endpoint_uri, router_address, weth_address, n):
+    async with aiohttp.ClientSession() as session:
+        return await asyncio.gather(
+            rpc.async_read_address_list(session, endpoint_uri, router_address, 0, n),
+            rpc.async_read_balances(session, endpoint_uri, router_address, [weth_address] * n),
+        )
+
+
+def main():
+    endpoint_uri = web3.provider.endpoint_uri
+
+    router = OdosRouterV3.deploy(accounts[0].address, {"from": accounts[0]})
+    weth = WETH9.deploy({"from": accounts[0]})
+
+    address_list = ["0x" + random.randbytes(20).hex() for i in range(max(READ_COUNTS))]
+    for start in range(0, len(address_list), WRITE_CHUNK_SIZE):
+        router.writeAddressList(
+            address_list[start:start + WRITE_CHUNK_SIZE], {"from": accounts[0], "silent": True}
+        )
+
+    for n in READ_COUNTS:
+        print()
+        sequential = timed(
+            "addressList sequential",
+            n,
+            lambda: [router.addressList(i) for i in range(n)],
+        )
+        batched = timed(
+            "addressList batched",
+            n,
+            lambda: rpc.read_address_list(endpoint_uri, router.address, 0, n),
+        )
+        assert [a.lower() for a in sequential] == batched == address_list[:n]
+
+        timed(
+            "balanceOf sequential",
+            n,
+            lambda: [weth.balanceOf(router.address) for i in range(n)],
+        )
+        timed(
+            "balanceOf batched",
+            n,
+            lambda: rpc.read_balances(endpoint_uri, router.address, [weth.address] * n),
+        )
+        timed(
+            "both async",
+            2 * n,
+            lambda: asyncio.run(async_read_all(endpoint_uri, router.address, weth.address, n)),
+        )
@@ -0,0 +1,50 @@
+import os
+import random
+import tempfile
+import time
+
+from odos_router_v3 import address_list, snapshot
+
+
+# Run with `brownie run benchmark_codebook_startup` or directly with python
+LIST_LENGTHS = [1_000, 100_000, 1_000_000]
+LOOKUPS = 100_000
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<24} {time.perf_counter() - start:10.4f}s")
+    return result
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    router_address = "0x" + random.randbytes(20).hex()
+
+    for length in LIST_LENGTHS:
+        print(f"\naddress list length {length}")
+
+        addresses = ["0x" + random.randbytes(20).hex() for i in range(length)]
+        codebook = address_list.AddressListCodebook(1, router_address, addresses)
+
+        json_path = address_list.codebook_path(directory, 1, router_address)
+        codebook.save(json_path)
+        snapshot_path = snapshot.write_codebook_snapshot(directory, codebook)
+
+        print(f"{'json size':<24} {os.path.getsize(json_path):10d}B")
+        print(f"{'snapshot size':<24} {os.path.getsize(snapshot_path):10d}B")
+
+        loaded = timed("json load", lambda: address_list.AddressListCodebook.load(json_path))
+        mapped = timed("snapshot map", lambda: snapshot.MappedCodebook(snapshot_path))
+
+        queries = random.choices(addresses, k=LOOKUPS)
+        timed(f"json {LOOKUPS} lookups", lambda: [loaded.find(a) for a in queries])
+        timed(f"snapshot {LOOKUPS} lookups", lambda: [mapped.find(a) for a in queries])
+
+        mapped.close()
+        os.remove(snapshot_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import random
+import sys
+import timeit
+
+from odos_router_v3 import compact, structs
+from odos_router_v3.compact_template import CompactTemplate
+
+sys.path.append("tests")
+from test_lib import encode_compact  # noqa: E402
+
+
+# Refreshes the amounts of a swapCompact call every iteration, by encoding the whole call again
+# and by patching a compiled template.
+# Runs without a node, e.g. `python scripts/benchmark_compact_template.py`
+ITERATIONS = 50_000
+
+
+def address():
+    return "0x" + random.randbytes(20).hex()
+
+
+def main():
+    random.seed(0)
+    executor = address()
+    input_token, output_token, fee_recipient = address(), address(), address()
+    path_definition = random.randbytes(320)
+    # Amounts near 10**18 keep their byte length, the wide ones change it on most refreshes
+    same_length = [(10**18 + i, 3 * 10**18 + i) for i in range(ITERATIONS)]
+    changing_length = [
+        (random.getrandbits(random.randint(1, 256)), random.getrandbits(random.randint(1, 256)))
+        for i in range(ITERATIONS)
+    ]
+
+    def test_lib_encode(amounts):
+        for input_amount, quote in amounts:
+            encode_compact.construct_compact_swap_data(
+                "0x" + path_definition.hex(),
+                input_token,
+                output_token,
+                input_amount,
+                quote,
+                0.001,
+                executor,
+                executor,
+                "msg.sender",
+                [],
+                1,
+                10**15,
+                fee_recipient,
+            )
+
+    def encode(amounts):
+        for input_amount, quote in amounts:
+            structs.encode_swap_compact(
+                structs.SwapTokenInfo(
+                    input_token,
+                    input_amount,
+                    executor,
+                    output_token,
+                    quote,
+                    1,
+                    compact.NULL_ADDRESS,
+                ),
+                executor,
+                16_777,
+                structs.SwapReferralInfo(1, 10**15, fee_recipient),
+                path_definition,
+            )
+
+    template = CompactTemplate(
+        structs.encode_swap_compact(
+            structs.SwapTokenInfo(
+                input_token, 10**18, executor, output_token, 3 * 10**18, 1, compact.NULL_ADDRESS
+            ),
+            executor,
+            16_777,
+            structs.SwapReferralInfo(1, 10**15, fee_recipient),
+            path_definition,
+        )
+    )
+
+    def patch(amounts):
+        for input_amount, quote in amounts:
+            template.set_input_amount(input_amount)
+            template.set_output_quote(quote)
+            bytes(template)
+
+    print(f"{'refresh':<24}{'same length/s':>15}{'length changes/s':>18}")
+    for name, refresh in [
+        ("test_lib re-encode", test_lib_encode),
+        ("full re-encode", encode),
+        ("template patch", patch),
+    ]:
+        rates = [
+            ITERATIONS / timeit.timeit(lambda: refresh(amounts), number=1)
+            for amounts in [same_length, changing_length]
+        ]
+        print(f"{name:<24}{rates[0]:>15.0f}{rates[1]:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import random
+import time
+
+from eth_abi import decode, encode
+from odos_router_v3 import events
+
+
+# Decodes synthetic Swap and SwapMulti logs with eth_abi and with the columnar decoder.
+# Runs without a node, e.g. `python scripts/benchmark_event_decoder.py`
+LOG_COUNT = 20_000
+MULTI_TOKENS = 3
+
+
+def address():
+    return "0x" + random.randbytes(20).hex()
+
+
+def synthetic_logs(topic, types, values):
+    return [
+        {
+            "topics": [topic],
+            "data": "0x" + encode(types, values()).hex(),
+            "blockNumber": hex(i),
+            "logIndex": "0x0",
+            "transactionHash": "0x" + random.randbytes(32).hex(),
+        }
+        for i in range(LOG_COUNT)
+    ]
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.3f}s {LOG_COUNT / elapsed:10.0f} logs/s")
+    return elapsed
+
+
+def main():
+    random.seed(0)
+    swap_logs = synthetic_logs(
+        events.SWAP_TOPIC,
+        events.SWAP_TYPES,
+        lambda: [
+            address(),
+            10**18,
+            address(),
+            3 * 10**9,
+            address(),
+            -12345,
+            2**33,
+            10**15,
+            address(),
+        ],
+    )
+    swap_multi_logs = synthetic_logs(
+        events.SWAP_MULTI_TOPIC,
+        events.SWAP_MULTI_TYPES,
+        lambda: [
+            address(),
+            [10**18] * MULTI_TOKENS,
+            [address() for i in range(MULTI_TOKENS)],
+            [3 * 10**9] * MULTI_TOKENS,
+            [address() for i in range(MULTI_TOKENS)],
+            [-12345] * MULTI_TOKENS,
+            2**33,
+            10**15,
+            address(),
+        ],
+    )
+
+    for name, logs, types in [
+        ("Swap", swap_logs, events.SWAP_TYPES),
+        (f"SwapMulti ({MULTI_TOKENS}x{MULTI_TOKENS})", swap_multi_logs, events.SWAP_MULTI_TYPES),
+    ]:
+        print()
+        generic = timed(
+            f"{name} eth_abi",
+            lambda: [decode(types, bytes.fromhex(log["data"][2:])) for log in logs],
+        )
+        fast = timed(f"{name} columnar", lambda: events.decode_router_logs(logs))
+        print(f"{'speedup':<28} {generic / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
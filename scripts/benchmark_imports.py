@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+
+
+# Import time of each module in a fresh interpreter, best of RUNS, and which of the heavy
+# dependencies it pulls in. web3 and eth_account are listed for reference.
+# Runs without a node, e.g. `python scripts/benchmark_imports.py`
+RUNS = 5
+MODULES = [
+    "odos_router_v3.addresses",
+    "odos_router_v3.compact",
+    "odos_router_v3.compact_template",
+    "odos_router_v3.abi",
+    "odos_router_v3.structs",
+    "odos_router_v3.permit2",
+    "odos_router_v3.events",
+    "odos_router_v3.event_store",
+    "odos_router_v3.address_list",
+    "odos_router_v3.preflight",
+    "odos_router_v3.transactions",
+    "odos_router_v3.submission",
+    "test_lib.encode_compact",
+    "test_lib.permit2",
+    "eth_abi",
+    "eth_account",
+    "web3",
+]
+HEAVY_MODULES = ["web3", "eth_account", "eth_abi", "eth_utils", "requests", "aiohttp", "asyncio"]
+
+MEASURE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def import_time(module):
+    # The interpreter itself is already started, so only the import is timed
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([os.getcwd(), "tests"])}
+    times = []
+    for i in range(RUNS):
+        output = subprocess.run(
+            [sys.executable, "-c", MEASURE.format(module=module, heavy=HEAVY_MODULES)],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        times.append(float(output[0]))
+    return min(times), output[1] if len(output) > 1 else ""
+
+
+def main():
+    print(f"{'module':<36}{'ms':>8}  heavy dependencies loaded")
+    for module in MODULES:
+        elapsed, heavy = import_time(module)
+        print(f"{module:<36}{elapsed * 1000:>8.1f}  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import random
+import sys
+import time
+
+from odos_router_v3 import events, metrics
+
+
+# Streams synthetic Swap events through the default 1m/1h/24h windows, 100k events per block of one
+# second, and reports throughput and the memory held by the windows, which stays flat once the
+# longest window is full. Runs without a node, e.g. `python scripts/benchmark_metrics.py`
+EVENTS_PER_BLOCK = 100_000
+BLOCKS = 10
+TOKENS = 1000
+# Seconds between batches, so the windows keep expiring buckets
+BATCH_GAP = 14_400
+
+
+def synthetic_swaps(rng, tokens, first_block):
+    n = EVENTS_PER_BLOCK * BLOCKS
+    swaps = events.SwapColumns()
+    swaps.block_number = [first_block + i // EVENTS_PER_BLOCK for i in range(n)]
+    swaps.output_token = [rng.choice(tokens) for i in range(n)]
+    swaps.amount_out = [rng.randint(1, 10**21) for i in range(n)]
+    swaps.slippage = [rng.randint(-(10**15), 10**15) for i in range(n)]
+    swaps.referral_code = [rng.choice([0, 1 << 48]) for i in range(n)]
+    swaps.referral_fee = [rng.choice([0, 0, 0, 10**15]) for i in range(n)]
+    return swaps
+
+
+def window_size(window):
+    # Bytes held by a window's buckets and totals, ignoring the shared token strings
+    size = sys.getsizeof(window.buckets) + sys.getsizeof(window.totals)
+    for table in window.buckets + [window.totals]:
+        size += sys.getsizeof(table)
+        for stats in table.values():
+            size += sys.getsizeof(stats) + sum(sys.getsizeof(value) for value in stats)
+    return size
+
+
+def main():
+    rng = random.Random(0)
+    tokens = ["0x" + rng.randbytes(20).hex() for i in range(TOKENS)]
+    swap_metrics = metrics.SwapMetrics()
+
+    for batch in range(8):
+        # Block numbers double as timestamps
+        swaps = synthetic_swaps(rng, tokens, batch * BATCH_GAP)
+        block_timestamps = {block: block for block in set(swaps.block_number)}
+
+        start = time.perf_counter()
+        swap_metrics.add_swaps(swaps, block_timestamps)
+        elapsed = time.perf_counter() - start
+
+        memory = sum(window_size(window) for window in swap_metrics.windows.values())
+        print(
+            f"{len(swaps)} events in {elapsed:.3f}s, {len(swaps) / elapsed:,.0f} events/s, "
+            f"windows hold {memory / 2**20:.1f} MiB"
+        )
+
+    for name in metrics.DEFAULT_WINDOWS:
+        token = swap_metrics.top_tokens(name, 1)[0]
+        print(name, token, swap_metrics.stats(name, token))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import random
+import time
+
+from odos_router_v3 import settlement
+
+
+# Settles synthetic swap outputs in one pass over the columns.
+# Runs without a node, e.g. `python scripts/benchmark_settlement.py`
+ROWS = 1_000_000
+
+
+def main():
+    rng = random.Random(0)
+    router_address = "0x" + rng.randbytes(20).hex()
+    recipients = ["0x" + rng.randbytes(20).hex() for i in range(100)] + [router_address]
+
+    amounts_out = [rng.randint(1, 10**24) for i in range(ROWS)]
+    quotes = [amount * rng.randint(9_900, 10_100) // 10_000 for amount in amounts_out]
+    codes = [rng.getrandbits(32) + (rng.choice([0, 5000, 10000]) << 32) for i in range(ROWS)]
+    fees = [rng.choice([0, 10**14, 10**15]) for i in range(ROWS)]
+    fee_recipients = [rng.choice(recipients) for i in range(ROWS)]
+
+    start = time.perf_counter()
+    result = settlement.settle(
+        amounts_out, quotes, None, codes, fees, fee_recipients, router_address
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"{ROWS} swaps in {elapsed:.3f}s, {ROWS / elapsed:,.0f} swaps/s")
+    print(f"router revenue {sum(result.router_revenue)}, referrers {sum(result.referrer_payout)}")
+
+
+if __name__ == "__main__":
+    main()
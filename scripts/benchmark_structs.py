@@ -0,0 +1,89 @@
+import random
+import timeit
+import tracemalloc
+
+from odos_router_v3 import abi, structs
+
+
+# Memory of slotted structs against dicts and lists holding the same swapTokenInfo fields, and the
+# rate of re-encoding swap calldata after a quote refresh, where the structs re-encode one word.
+# Runs without a node, e.g. `python scripts/benchmark_structs.py`
+OBJECTS = 100_000
+ITERATIONS = 50_000
+
+
+def address():
+    return "0x" + random.randbytes(20).hex()
+
+
+def token_info_values():
+    return [address(), 10**18, address(), address(), 3 * 10**9, 3 * 10**9 - 1, address()]
+
+
+def measure(build):
+    # Bytes allocated by OBJECTS objects, not counting the shared field values
+    values = [token_info_values() for i in range(OBJECTS)]
+    tracemalloc.start()
+    objects = [build(value) for value in values]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size / OBJECTS
+
+
+def main():
+    random.seed(0)
+
+    print(f"{'representation':<16}{'bytes/object':>14}")
+    for name, build in [
+        ("list", list),
+        ("tuple", tuple),
+        ("dict", lambda value: dict(zip(structs.SwapTokenInfo.FIELDS, value))),
+        ("slotted", lambda value: structs.SwapTokenInfo(*value)),
+    ]:
+        print(f"{name:<16}{measure(build):>14.0f}")
+
+    values = token_info_values()
+    executor = address()
+    referral = [1, 10**15, address()]
+    path_definition = random.randbytes(320)
+    quotes = [3 * 10**9 + i for i in range(ITERATIONS)]
+
+    as_list = list(values)
+    as_dict = dict(zip(structs.SwapTokenInfo.FIELDS, values))
+    token_info = structs.SwapTokenInfo(*values)
+    referral_info = structs.SwapReferralInfo(*referral)
+
+    def refresh_list():
+        for quote in quotes:
+            as_list[4] = quote
+            abi.encode_swap(as_list, path_definition, executor, referral)
+
+    def refresh_dict():
+        for quote in quotes:
+            as_dict["output_quote"] = quote
+            abi.encode_swap(tuple(as_dict.values()), path_definition, executor, referral)
+
+    def refresh_struct():
+        for quote in quotes:
+            token_info.output_quote = quote
+            abi.encode_swap(token_info, path_definition, executor, referral_info)
+
+    def refresh_struct_compact():
+        for quote in quotes:
+            token_info.output_quote = quote
+            structs.encode_swap_compact(token_info, executor, 1000, referral_info, path_definition)
+
+    print(f"\n{'quote refresh':<24}{'encodes/s':>12}")
+    for name, refresh in [
+        ("swap, list", refresh_list),
+        ("swap, dict", refresh_dict),
+        ("swap, slotted", refresh_struct),
+        ("swapCompact, slotted", refresh_struct_compact),
+    ]:
+        elapsed = timeit.timeit(refresh, number=1)
+        print(f"{name:<24}{ITERATIONS / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
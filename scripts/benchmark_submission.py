@@ -0,0 +1,100 @@
+import asyncio
+import sys
+import time
+
+from brownie import OdosRouterV3, OdosWETHExecutor, WETH9, accounts, web3
+from odos_router_v3 import submission, transactions
+
+sys.path.append("tests")
+from test_lib import encode_compact, utils  # noqa: E402
+
+
+# Run with `brownie run benchmark_submission` against a local development node (ganache or anvil).
+# Every sender swaps TRANSACTIONS_PER_SENDER times, first one transaction at a time through web3
+# and then all at once through the submission pipeline
+SENDER_COUNTS = [1, 4, 16]
+TRANSACTIONS_PER_SENDER = 50
+INPUT_AMOUNT = 10**12
+NULL_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def timed(label, n, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} n={n:<6} {elapsed:8.3f}s {n / elapsed:8.0f} tx/s")
+
+
+def main():
+    router = OdosRouterV3.deploy(accounts[0].address, {"from": accounts[0]})
+    weth = WETH9.deploy({"from": accounts[0]})
+    executor = OdosWETHExecutor.deploy(weth.address, {"from": accounts[0]})
+
+    payload = bytes.fromhex(
+        encode_compact.construct_compact_swap_data(
+            "0x01",
+            NULL_ADDRESS,
+            weth.address,
+            INPUT_AMOUNT,
+            INPUT_AMOUNT,
+            0.01,
+            executor.address,
+            executor.address,
+            "msg.sender",
+            [],
+            0,
+            0,
+            NULL_ADDRESS,
+        )[2:]
+    )
+    endpoint_uri = web3.provider.endpoint_uri
+    chain_id = web3.eth.chain_id
+    max_fee_per_gas = 2 * web3.eth.get_block("latest").get("baseFeePerGas", 0) + 10**9
+
+    def assemblers(count):
+        result = []
+        for i in range(count):
+            assembler = transactions.TransactionAssembler(
+                utils.random_private_key(), chain_id, router.address, max_fee_per_gas, 10**9
+            )
+            accounts[0].transfer(assembler.sender, "1 ether", silent=True)
+            result.append(assembler)
+        return result
+
+    def sequential(senders):
+        for assembler in senders:
+            for i in range(TRANSACTIONS_PER_SENDER):
+                nonce = web3.eth.get_transaction_count(assembler.sender)
+                signed = assembler.swap_compact(payload, INPUT_AMOUNT, 200_000, nonce=nonce)
+                web3.eth.wait_for_transaction_receipt(
+                    web3.eth.send_raw_transaction(signed.raw_transaction)
+                )
+
+    async def pipelined(senders):
+        async with submission.pooled_session() as session:
+            pipeline = submission.SubmissionPipeline(session, endpoint_uri, poll_interval=0.01)
+
+            def submit(assembler):
+                def sign(nonce):
+                    return assembler.swap_compact(payload, INPUT_AMOUNT, 200_000, nonce=nonce)
+
+                return pipeline.submit(assembler.sender, sign)
+
+            receipts = await asyncio.gather(
+                *[
+                    submit(assembler)
+                    for assembler in senders
+                    for i in range(TRANSACTIONS_PER_SENDER)
+                ]
+            )
+            await pipeline.close()
+
+        assert all(int(receipt["status"], 16) == 1 for receipt in receipts)
+
+    for count in SENDER_COUNTS:
+        n = count * TRANSACTIONS_PER_SENDER
+        print()
+        senders = assemblers(count)
+        timed(f"web3 sequential, {count} senders", n, lambda: sequential(senders))
+        senders = assemblers(count)
+        timed(f"pipeline, {count} senders", n, lambda: asyncio.run(pipelined(senders)))
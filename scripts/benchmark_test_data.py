@@ -0,0 +1,60 @@
+import random
+import sys
+import timeit
+
+sys.path.append("tests")
+from test_lib import utils  # noqa: E402
+from test_lib.generate import Generator  # noqa: E402
+
+
+# Rate of generating test addresses and private keys with the original character at a time helper,
+# the current utils helpers and the bulk generator, plus the rest of the generator's corpora.
+# Runs without a node, e.g. `python scripts/benchmark_test_data.py`
+COUNT = 100_000
+
+
+def char_by_char_hex_string(num_bytes):
+    # utils.random_hex_string as it used to be written
+    hex_string = "0x"
+    for i in range(num_bytes * 2):
+        hex_string += random.choice(
+            ["0", "1", "2", "3", "4", "5", "6", "7", "8", "9", "a", "b", "c", "d", "e", "f"]
+        )
+    return hex_string
+
+
+def rate(run):
+    return COUNT / min(timeit.repeat(run, number=1, repeat=5))
+
+
+def main():
+    random.seed(0)
+    generator = Generator(0)
+    tokens = generator.token_set(1000)
+
+    # Speedups are against the character at a time helper for the same number of bytes
+    print(f"{'generator':<32}{'items/s':>12}{'speedup':>10}")
+    for num_bytes, name, helper, bulk in [
+        (20, "addresses", utils.random_address, generator.addresses),
+        (32, "private keys", utils.random_private_key, generator.private_keys),
+    ]:
+        baseline = rate(lambda: [char_by_char_hex_string(num_bytes) for i in range(COUNT)])
+        print(f"{'char by char ' + name:<32}{baseline:>12.0f}{1:>9.0f}x")
+        for row, run in [
+            (f"utils {name}", lambda: [helper() for i in range(COUNT)]),
+            (f"Generator {name}", lambda: bulk(COUNT)),
+        ]:
+            row_rate = rate(run)
+            print(f"{row:<32}{row_rate:>12.0f}{row_rate / baseline:>9.0f}x")
+
+    for name, run in [
+        ("Generator amounts", lambda: generator.amounts(COUNT)),
+        ("Generator edge amounts", lambda: generator.edge_amounts(COUNT)),
+        ("Generator popular tokens", lambda: generator.popular_tokens(tokens, COUNT)),
+        ("Generator path definitions", lambda: generator.path_definitions(COUNT)),
+    ]:
+        print(f"{name:<32}{rate(run):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
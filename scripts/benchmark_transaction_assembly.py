@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+
+from brownie import OdosRouterV3, OdosWETHExecutor, WETH9, accounts, web3
+from eth_account import Account
+from odos_router_v3 import gas, transactions
+
+sys.path.append("tests")
+from test_lib import encode_compact, utils  # noqa: E402
+
+
+# Run with `brownie run benchmark_transaction_assembly` against a local development node.
+# Signing is done by eth_keys in both paths, installing coincurve speeds up both alike
+TRANSACTION_COUNT = 200
+GAS_MODEL_PATH = "build/gas_model.json"
+NULL_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed:8.3f}s {TRANSACTION_COUNT / elapsed:10.0f} signed tx/s")
+
+
+def main():
+    router = OdosRouterV3.deploy(accounts[0].address, {"from": accounts[0]})
+    weth = WETH9.deploy({"from": accounts[0]})
+    executor = OdosWETHExecutor.deploy(weth.address, {"from": accounts[0]})
+
+    private_key = utils.random_private_key()
+    sender = Account.from_key(private_key).address
+    accounts[0].transfer(sender, "1 ether")
+
+    payload = encode_compact.construct_compact_swap_data(
+        "0x01",
+        NULL_ADDRESS,
+        weth.address,
+        10**15,
+        10**15,
+        0.01,
+        executor.address,
+        executor.address,
+        "msg.sender",
+        [],
+        0,
+        0,
+        NULL_ADDRESS,
+    )
+    max_priority_fee_per_gas = 10**9
+    base_fee_per_gas = web3.eth.get_block("latest").get("baseFeePerGas", 0)
+    max_fee_per_gas = 2 * base_fee_per_gas + max_priority_fee_per_gas
+
+    contract = web3.eth.contract(abi=router.abi, address=router.address)
+
+    def web3_path():
+        for i in range(TRANSACTION_COUNT):
+            txn = contract.functions.swapCompact().build_transaction(
+                {
+                    "from": sender,
+                    "gas": 200_000,
+                    "value": 10**15,
+                    "maxFeePerGas": max_fee_per_gas,
+                    "maxPriorityFeePerGas": max_priority_fee_per_gas,
+                    "nonce": web3.eth.get_transaction_count(sender) + i,
+                }
+            )
+            txn["data"] += payload[2:]
+            web3.eth.account.sign_transaction(txn, private_key)
+
+    gas_model = gas.GasModel.load(GAS_MODEL_PATH) if os.path.exists(GAS_MODEL_PATH) else None
+    assembler = transactions.TransactionAssembler.from_node(
+        web3.provider.endpoint_uri,
+        private_key,
+        router.address,
+        max_fee_per_gas,
+        max_priority_fee_per_gas,
+        gas_model,
+    )
+    payload_bytes = bytes.fromhex(payload[2:])
+    gas_limit = None if gas_model else 200_000
+
+    def local_path():
+        for i in range(TRANSACTION_COUNT):
+            assembler.swap_compact(payload_bytes, 10**15, gas_limit)
+
+    timed("web3 build_transaction + sign", web3_path)
+    timed(
+        "local assembler" + (" + gas model" if gas_model else " (fixed gas)"),
+        local_path,
+    )
+
+    # The locally built transactions are valid on the node
+    signed = assembler.swap_compact(
+        payload_bytes, 10**15, gas_limit, nonce=web3.eth.get_transaction_count(sender)
+    )
+    receipt = web3.eth.wait_for_transaction_receipt(
+        web3.eth.send_raw_transaction(signed.raw_transaction)
+    )
+    assert receipt.status == 1
@@ -0,0 +1,151 @@
+import sys
+import timeit
+
+from brownie import OdosRouterV3, OdosWETHExecutor, WETH9, accounts
+from odos_router_v3 import gas
+
+sys.path.append("tests")
+from test_lib import encode_compact  # noqa: E402
+
+
+# Run with `brownie run calibrate_gas_model` against a local development node. Every payload shape
+# is swapped once to warm up balances and then measured, the fitted model is written to MODEL_PATH
+MODEL_PATH = "build/gas_model.json"
+INPUT_AMOUNT = 10**15
+NULL_ADDRESS = "0x0000000000000000000000000000000000000000"
+PATH_WORDS = [1, 2, 4, 8]
+
+
+def main():
+    router = OdosRouterV3.deploy(accounts[0].address, {"from": accounts[0]})
+    weth = WETH9.deploy({"from": accounts[0]})
+    executor = OdosWETHExecutor.deploy(weth.address, {"from": accounts[0]})
+
+    address_list = [weth.address, executor.address]
+    router.writeAddressList(address_list, {"from": accounts[0]})
+
+    weth.deposit({"from": accounts[0], "value": 10**18})
+    weth.approve(router.address, 2**256 - 1, {"from": accounts[0]})
+
+    def tokens(wrap):
+        return (NULL_ADDRESS, weth.address) if wrap else (weth.address, NULL_ADDRESS)
+
+    def path(wrap, words):
+        return "0x" + ("01" if wrap else "00") + "00" * (32 * words - 1)
+
+    def compact_call(wrap, words, cached, fee):
+        input_token, output_token = tokens(wrap)
+        return router.swapCompact.signature + encode_compact.construct_compact_swap_data(
+            path(wrap, words),
+            input_token,
+            output_token,
+            INPUT_AMOUNT,
+            INPUT_AMOUNT,
+            0.01,
+            executor.address,
+            executor.address,
+            "msg.sender",
+            address_list if cached else [],
+            0,
+            10**15 if fee else 0,
+            accounts[2].address,
+        )[2:]
+
+    def compact_multi_call(wrap, words, cached, fee):
+        input_token, output_token = tokens(wrap)
+        return router.swapMultiCompact.signature + encode_compact.construct_compact_swap_multi_data(
+            path(wrap, words),
+            [input_token],
+            [output_token],
+            [INPUT_AMOUNT],
+            [INPUT_AMOUNT],
+            0.01,
+            executor.address,
+            [executor.address],
+            ["msg.sender"],
+            address_list if cached else [],
+            0,
+            10**15 if fee else 0,
+            accounts[2].address,
+        )[2:]
+
+    def swap_call(wrap, words, fee):
+        input_token, output_token = tokens(wrap)
+        return router.swap.encode_input(
+            [
+                input_token,
+                INPUT_AMOUNT,
+                executor.address,
+                output_token,
+                INPUT_AMOUNT,
+                INPUT_AMOUNT // 2,
+                NULL_ADDRESS,
+            ],
+            path(wrap, words),
+            executor.address,
+            [0, 10**15 if fee else 0, accounts[2].address if fee else NULL_ADDRESS],
+        )
+
+    def swap_multi_call(wrap, words, fee):
+        input_token, output_token = tokens(wrap)
+        return router.swapMulti.encode_input(
+            [[input_token, INPUT_AMOUNT, executor.address]],
+            [[output_token, INPUT_AMOUNT, INPUT_AMOUNT // 2, NULL_ADDRESS]],
+            path(wrap, words),
+            executor.address,
+            [0, 10**15 if fee else 0, accounts[2].address if fee else NULL_ADDRESS],
+        )
+
+    calls = []
+    for wrap in [True, False]:
+        for words in PATH_WORDS:
+            for fee in [False, True]:
+                for cached in [False, True]:
+                    for build in [compact_call, compact_multi_call]:
+                        data = build(wrap, words, cached, fee)
+                        calls.append((gas.compact_payload_shape(data, router.address), data, wrap))
+
+                input_token, output_token = tokens(wrap)
+                for function, build in [("swap", swap_call), ("swapMulti", swap_multi_call)]:
+                    data = build(wrap, words, fee)
+                    shape = gas.payload_shape(
+                        function,
+                        [input_token],
+                        [output_token],
+                        path(wrap, words),
+                        10**15 if fee else 0,
+                        accounts[2].address,
+                        router.address,
+                    )
+                    calls.append((shape, data, wrap))
+
+    samples = []
+    for shape, data, wrap in calls:
+        value = INPUT_AMOUNT if wrap else 0
+        accounts[0].transfer(router.address, value, data=data, silent=True)
+        tx = accounts[0].transfer(router.address, value, data=data, silent=True)
+        samples.append(gas.GasSample(shape, gas.intrinsic_gas(data), tx.gas_used))
+
+    model = gas.fit_gas_model(samples)
+    model.save(MODEL_PATH)
+
+    print(f"{'function':<18}{'intercept':>10}")
+    for function, intercept in model.intercepts.items():
+        print(f"{function:<18}{intercept:>10.0f}")
+    for feature, coefficient in zip(gas.SHAPE_FEATURES, model.coefficients):
+        print(f"{feature:<18}{coefficient:>10.1f}")
+
+    low, high = model.error_bounds()
+    worst = max(
+        abs(sample.gas_used - model.predict(sample.shape, data)) / sample.gas_used
+        for sample, (shape, data, wrap) in zip(samples, calls)
+    )
+    print(f"\n{len(samples)} samples, error bounds {low:+.0f} / {high:+.0f} gas, worst {worst:.3%}")
+
+    shape, data, wrap = calls[0]
+    n = 100_000
+    elapsed = timeit.timeit(lambda: model.predict(gas.compact_payload_shape(data), data), number=n)
+    print(f"predict from compact call data: {elapsed / n * 1e6:.2f}us")
+    elapsed = timeit.timeit(lambda: model.execution_gas(shape), number=n)
+    print(f"predict from shape:             {elapsed / n * 1e6:.2f}us")
+    print(f"\nModel written to {MODEL_PATH}")
@@ -0,0 +1,53 @@
+import brownie
+import pytest
+from brownie import accounts
+
+
+# Contracts are deployed once per module. Every test using them starts from the module's
+# deployments and has its own transactions reverted after it
+CHAIN_FIXTURES = {"router", "weth", "weth_executor", "permit2_contract"}
+
+
+@pytest.fixture(scope="module")
+def router(module_isolation):
+    return brownie.OdosRouterV3.deploy(
+        accounts[0].address,
+        {
+            "from": accounts[0],
+        },
+    )
+
+
+@pytest.fixture(scope="module")
+def weth(module_isolation):
+    return brownie.WETH9.deploy(
+        {
+            "from": accounts[0],
+        }
+    )
+
+
+@pytest.fixture(scope="module")
+def weth_executor(weth):
+    return brownie.OdosWETHExecutor.deploy(
+        weth.address,
+        {
+            "from": accounts[0],
+        },
+    )
+
+
+@pytest.fixture(scope="module")
+def permit2_contract(module_isolation):
+    return brownie.Permit2.deploy(
+        {
+            "from": accounts[0],
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def isolation(request):
+    # Tests that never touch the chain run without a node
+    if CHAIN_FIXTURES & set(request.fixturenames):
+        request.getfixturevalue("fn_isolation")
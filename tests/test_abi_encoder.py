@@ -0,0 +1,125 @@
+import random
+
+import brownie
+import pytest
+from brownie import accounts
+from eth_abi import encode
+from eth_utils import function_signature_to_4byte_selector
+from odos_router_v3 import abi
+from test_lib import utils
+
+
+def random_uint():
+    return random.choice([0, 1, random.getrandbits(64), random.getrandbits(256)])
+
+
+def random_bytes():
+    return bytes.fromhex(utils.random_hex_string(random.choice([0, 1, 31, 32, 33, 65, 200]))[2:])
+
+
+def random_arguments(types):
+    generators = {
+        "address": utils.random_address,
+        "bytes": random_bytes,
+        abi.SWAP_TOKEN_INFO: lambda: (
+            utils.random_address(),
+            random_uint(),
+            utils.random_address(),
+            utils.random_address(),
+            random_uint(),
+            random_uint(),
+            utils.random_address(),
+        ),
+        abi.SWAP_REFERRAL_INFO: lambda: (
+            random.getrandbits(64),
+            random.getrandbits(64),
+            utils.random_address(),
+        ),
+        abi.PERMIT2_INFO: lambda: (
+            utils.random_address(),
+            random_uint(),
+            random_uint(),
+            random_bytes(),
+        ),
+        abi.INPUT_TOKEN_INFO_ARRAY: lambda: [
+            (utils.random_address(), random_uint(), utils.random_address())
+            for i in range(random.randint(0, 4))
+        ],
+        abi.OUTPUT_TOKEN_INFO_ARRAY: lambda: [
+            (utils.random_address(), random_uint(), random_uint(), utils.random_address())
+            for i in range(random.randint(0, 4))
+        ],
+        "address[]": lambda: [utils.random_address() for i in range(random.randint(0, 4))],
+        "uint256[]": lambda: [random_uint() for i in range(random.randint(0, 4))],
+    }
+    generators[abi.ROUTER_FUNDS_SWAP_INFO_ARRAY] = lambda: [
+        tuple(
+            generators[field_type]()
+            for field_type in [
+                abi.INPUT_TOKEN_INFO_ARRAY, abi.OUTPUT_TOKEN_INFO_ARRAY, "bytes", "address"
+            ]
+        )
+        for i in range(random.randint(0, 3))
+    ]
+    return [generators[argument_type]() for argument_type in types]
+
+
+def test_selectors():
+    for function, types in abi.ARGUMENT_TYPES.items():
+        signature = f"{function}({','.join(types)})"
+        assert abi.SELECTORS[function] == function_signature_to_4byte_selector(signature)
+
+
+def test_encoders_match_eth_abi():
+    random.seed(0)
+    for function, types in abi.ARGUMENT_TYPES.items():
+        for i in range(50):
+            arguments = random_arguments(types)
+            assert abi.encode_call(function, *arguments) == abi.SELECTORS[function] + encode(
+                types, arguments
+            )
+
+
+def test_hex_arguments():
+    arguments = random_arguments(abi.ARGUMENT_TYPES["swapWithHook"])
+    arguments[1] = "0x" + arguments[1].hex()
+    arguments[5] = "0x" + arguments[5].hex()
+
+    assert abi.encode_swap_with_hook(*arguments) == abi.SELECTORS["swapWithHook"] + encode(
+        abi.ARGUMENT_TYPES["swapWithHook"],
+        [bytes.fromhex(a[2:]) if i in (1, 5) else a for i, a in enumerate(arguments)],
+    )
+
+    with pytest.raises(ValueError):
+        abi.encode_swap(arguments[0], arguments[1], "0x1234", arguments[3])
+    with pytest.raises(ValueError):
+        abi.encode_swap(arguments[0], arguments[1], arguments[2], (2**64, 0, arguments[2]))
+
+
+def test_encoded_swap(router, weth_executor):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e18)
+
+    WETH = brownie.interface.IWETH(weth_address)
+    balance_before = WETH.balanceOf(accounts[0].address)
+
+    data = abi.encode_swap(
+        (
+            "0x0000000000000000000000000000000000000000",
+            input_amount,
+            weth_executor.address,
+            weth_address,
+            input_amount,
+            input_amount,
+            "0x0000000000000000000000000000000000000000",
+        ),
+        "0x01",
+        weth_executor.address,
+        (0, 0, "0x0000000000000000000000000000000000000000"),
+    )
+    accounts[0].transfer(
+        router.address,
+        input_amount,
+        data="0x" + data.hex(),
+    )
+    assert WETH.balanceOf(accounts[0].address) - balance_before == input_amount
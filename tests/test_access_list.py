@@ -0,0 +1,221 @@
+import brownie
+import pytest
+from brownie import accounts
+from eth_account import Account
+from odos_router_v3 import access_list, compact
+from test_lib import encode_compact, utils
+from web3 import Web3
+
+
+def send_compact(w3, private_key, router, data, value, tx_access_list=None):
+    txn = {
+        "to": router.address,
+        "data": data,
+        "value": value,
+        "gas": 10_000_000,
+        "gasPrice": 0,
+        "chainId": w3.eth.chain_id,
+        "nonce": w3.eth.get_transaction_count(Account.from_key(private_key).address),
+    }
+    if tx_access_list is not None:
+        txn["accessList"] = tx_access_list
+
+    signed_txn = w3.eth.account.sign_transaction(txn, private_key)
+    tx_hash = w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+
+    return w3.eth.wait_for_transaction_receipt(tx_hash)
+
+
+def test_decode_compact_round_trip():
+    address_list = [utils.random_address() for i in range(3)]
+    executor = address_list[1]
+
+    compact_router_data = encode_compact.construct_compact_swap_data(
+        "0x01",
+        address_list[0],
+        "0x0000000000000000000000000000000000000000",
+        0,
+        10**18,
+        0.01,
+        executor,
+        executor,
+        "msg.sender",
+        address_list,
+        7,
+        10**15,
+        address_list[2],
+    )
+    swap = compact.decode_compact_call("0x83bd37f9" + compact_router_data[2:], address_list)
+
+    assert swap.inputs == [(address_list[0], 0, executor)]
+    assert swap.outputs[0].token == "0x0000000000000000000000000000000000000000"
+    assert swap.outputs[0].quote == 10**18
+    assert swap.outputs[0].receiver == "0x0000000000000000000000000000000000000000"
+    assert swap.executor == executor
+    assert (swap.referral_code, swap.referral_fee) == (7, 10**15)
+    assert swap.referral_fee_recipient == address_list[2]
+    assert swap.path_definition == bytes([1]) + bytes(31)
+    # The fee recipient is always inline, so only the token and the executor come from storage
+    assert swap.address_list_positions == [0, 1]
+
+    input_tokens = [utils.random_address(), utils.random_address()]
+    output_receiver = utils.random_address()
+
+    compact_router_data = encode_compact.construct_compact_swap_multi_data(
+        "0x01",
+        input_tokens,
+        [address_list[0]],
+        [5, 0],
+        [10**6],
+        0.5,
+        executor,
+        [executor, output_receiver],
+        [output_receiver],
+        address_list,
+        0,
+        0,
+        "0x0000000000000000000000000000000000000000",
+    )
+    swap = compact.decode_compact_call("0x84a7f3dd" + compact_router_data[2:], address_list)
+
+    assert swap.inputs == [(input_tokens[0], 5, executor), (input_tokens[1], 0, output_receiver)]
+    assert swap.outputs == [(address_list[0], 10**6, 10**6 * 0x800000 // 0xFFFFFF, output_receiver)]
+    assert swap.address_list_positions == [1, 0]
+
+    with pytest.raises(ValueError):
+        compact.decode_compact_call("0x12345678" + compact_router_data[2:])
+
+
+def test_access_list_saving():
+    router_address = utils.random_address()
+    warm = {router_address}
+
+    # Cold addresses are worth listing on their own, each slot adds the same saving again
+    assert access_list.access_list_saving(utils.random_address(), set(), warm) == 100
+    assert access_list.access_list_saving(utils.random_address(), {1, 2}, warm) == 300
+
+    # The router is already warm, so its entry only pays off past 24 address list slots
+    assert access_list.access_list_saving(router_address, set(range(24)), warm) == 0
+    assert access_list.access_list_saving(router_address, set(range(25)), warm) == 100
+
+    entries = access_list.build_access_list(
+        {router_address: set(range(24)), "0x" + "11" * 20: {1}},
+        warm,
+    )
+    assert entries == [
+        {
+            "address": "0x1111111111111111111111111111111111111111",
+            "storageKeys": ["0x" + "0" * 63 + "1"],
+        }
+    ]
+    assert access_list.access_list_gas(entries) == 2400 + 1900
+
+
+def test_access_list_slots(router, weth_executor):
+    weth_address = weth_executor.WETH()
+    address_list = [weth_address, weth_executor.address]
+
+    router.writeAddressList(
+        address_list,
+        {
+            "from": accounts[0],
+        },
+    )
+    WETH = brownie.interface.IWETH(weth_address)
+    WETH.deposit(
+        {
+            "value": 12345,
+            "from": accounts[0],
+        }
+    )
+    WETH.approve(
+        router.address,
+        678,
+        {
+            "from": accounts[0],
+        },
+    )
+    w3 = brownie.web3
+
+    for position, address in enumerate(address_list):
+        slot = access_list.address_list_slot(position)
+        assert int(w3.eth.get_storage_at(router.address, slot).hex(), 16) == int(address, 16)
+
+    slot = access_list.erc20_balance_slot(accounts[0].address, access_list.WETH9_LAYOUT.balance_slot)
+    assert int(w3.eth.get_storage_at(weth_address, slot).hex(), 16) == 12345
+
+    slot = access_list.erc20_allowance_slot(
+        accounts[0].address, router.address, access_list.WETH9_LAYOUT.allowance_slot
+    )
+    assert int(w3.eth.get_storage_at(weth_address, slot).hex(), 16) == 678
+
+
+def test_swap_compact_access_list(router, weth_executor):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e18)
+
+    w3 = Web3(Web3.HTTPProvider("http://localhost:8545", request_kwargs={"timeout": 600}))
+
+    private_key = utils.random_private_key()
+    test_account = Account.from_key(private_key)
+
+    accounts[0].transfer(
+        test_account.address,
+        4 * input_amount,
+    )
+    address_list = [weth_address, weth_executor.address]
+    router.writeAddressList(
+        address_list,
+        {
+            "from": accounts[0],
+        },
+    )
+    compact_router_data = encode_compact.construct_compact_swap_data(
+        "0x01",
+        "0x0000000000000000000000000000000000000000",
+        weth_address,
+        input_amount,
+        input_amount,
+        0.01,
+        weth_executor.address,
+        weth_executor.address,
+        "msg.sender",
+        address_list,
+        0,
+        0,
+        "0x0000000000000000000000000000000000000000"
+    )
+    data = router.swapCompact.signature + compact_router_data[2:]
+
+    tx_access_list = access_list.compact_access_list(
+        data,
+        router.address,
+        test_account.address,
+        address_list,
+        {weth_address: access_list.WETH9_LAYOUT},
+        # The executor wraps into its own WETH balance before paying the router
+        {
+            weth_address: {
+                access_list.erc20_balance_slot(
+                    weth_executor.address, access_list.WETH9_LAYOUT.balance_slot
+                )
+            }
+        },
+    )
+    # Two address list slots are not enough to list the router itself
+    assert router.address not in [entry["address"] for entry in tx_access_list]
+    assert {entry["address"] for entry in tx_access_list} == {
+        Web3.to_checksum_address(weth_address),
+        Web3.to_checksum_address(weth_executor.address),
+    }
+
+    # Swap once first so both measured swaps write to slots that already hold a balance
+    send_compact(w3, private_key, router, data, input_amount)
+    without_receipt = send_compact(w3, private_key, router, data, input_amount)
+    with_receipt = send_compact(w3, private_key, router, data, input_amount, tx_access_list)
+
+    assert with_receipt.status == 1
+    assert with_receipt.gasUsed < without_receipt.gasUsed
+
+    WETH = brownie.interface.IWETH(weth_address)
+    assert WETH.balanceOf(test_account.address) == 3 * input_amount
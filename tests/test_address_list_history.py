@@ -0,0 +1,156 @@
+import os
+import random
+import re
+
+import pytest
+from eth_abi import encode
+from eth_utils import keccak
+from odos_router_v3 import address_list
+from test_lib import encode_compact, utils
+
+
+def synthetic_history(seed, num_appends=200):
+    # Random writeAddressList history as (block, addresses) appends, several of which may share a block
+    rng = random.Random(seed)
+
+    block = rng.randint(0, 1000)
+    appends = []
+    for i in range(num_appends):
+        block += rng.choice([0, 1, 1, 5, 100])
+        appends.append((block, [utils.random_address() for j in range(rng.randint(1, 5))]))
+
+    return appends
+
+
+def build_codebook(appends):
+    codebook = address_list.AddressListCodebook(1, utils.random_address())
+    for block, addresses in appends:
+        codebook.append(len(codebook), addresses, block)
+    return codebook
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_length_at_block(seed):
+    appends = synthetic_history(seed)
+    codebook = build_codebook(appends)
+
+    first_block = appends[0][0]
+    last_block = appends[-1][0]
+
+    for block in range(first_block - 10, last_block + 10):
+        expected_length = sum(len(addresses) for b, addresses in appends if b <= block)
+        assert codebook.length_at(block) == expected_length
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_resolve_at_block(seed):
+    appends = synthetic_history(seed)
+    codebook = build_codebook(appends)
+
+    rng = random.Random(seed)
+    for i in range(200):
+        block = rng.randint(appends[0][0] - 1, appends[-1][0])
+        version = codebook.at_block(block)
+
+        for position in rng.sample(range(len(codebook)), 10):
+            if position < codebook.length_at(block):
+                assert version[position] == codebook[position]
+                assert codebook[position] in version
+            else:
+                with pytest.raises(IndexError):
+                    version[position]
+                # Only a later duplicate could make the address resolvable at this block
+                assert (codebook[position] in version) == (
+                    codebook.index(codebook[position]) < len(version)
+                )
+
+
+def test_decode_old_compact_payload():
+    appends = synthetic_history(0)
+    codebook = build_codebook(appends)
+
+    # A payload encoded against the list as it was at the first append
+    block = appends[0][0]
+    old_list = appends[0][1]
+    later_address = appends[-1][1][0]
+
+    compact_router_data = encode_compact.construct_compact_swap_data(
+        "0x01",
+        "0x0000000000000000000000000000000000000000",
+        old_list[0],
+        0,
+        int(1e18),
+        0.01,
+        later_address,
+        later_address,
+        "msg.sender",
+        old_list,
+        0,
+        0,
+        "0x0000000000000000000000000000000000000000"
+    )
+    assert utils.decode_address(6, compact_router_data, codebook.at_block(block))[0] == old_list[0]
+
+    # An index that only became valid later cannot appear in a payload mined at this block
+    compact_router_data = encode_compact.construct_compact_swap_data(
+        "0x01",
+        "0x0000000000000000000000000000000000000000",
+        later_address,
+        0,
+        int(1e18),
+        0.01,
+        old_list[0],
+        old_list[0],
+        "msg.sender",
+        codebook,
+        0,
+        0,
+        "0x0000000000000000000000000000000000000000"
+    )
+    with pytest.raises(IndexError):
+        utils.decode_address(6, compact_router_data, codebook.at_block(block))
+
+    assert utils.decode_address(6, compact_router_data, codebook)[0] == later_address
+
+
+def test_history_persisted(tmp_path):
+    appends = synthetic_history(1, num_appends=20)
+    codebook = build_codebook(appends)
+
+    path = tmp_path / "codebook.json"
+    codebook.save(path)
+    loaded = address_list.AddressListCodebook.load(path)
+
+    for block, addresses in appends:
+        assert loaded.length_at(block) == codebook.length_at(block)
+        assert loaded.length_at(block - 1) == codebook.length_at(block - 1)
+
+
+def test_history_rejects_older_blocks():
+    codebook = address_list.AddressListCodebook(1, utils.random_address())
+    codebook.append(0, [utils.random_address()], 10)
+
+    with pytest.raises(ValueError):
+        codebook.append(1, [utils.random_address()], 9)
+
+
+def test_address_list_appended_layout():
+    # The sync relies on the topic and data layout of the event as declared for the router
+    path = os.path.join(os.path.dirname(__file__), "..", "interfaces", "IOdosRouterV3.sol")
+    with open(path, "r") as f:
+        declaration = re.search(r"event AddressListAppended\(([^)]*)\);", f.read()).group(1)
+    params = [param.split() for param in declaration.split(",")]
+
+    # Nothing indexed, so both fields are in the data
+    assert [len(param) for param in params] == [2, 2]
+    types = [param[0] for param in params]
+    assert address_list.ADDRESS_LIST_APPENDED_TOPIC == "0x" + keccak(
+        text=f"AddressListAppended({','.join(types)})"
+    ).hex()
+
+    addresses = [utils.random_address() for i in range(3)]
+    start_index, decoded = address_list.decode_address_list_appended(
+        {"data": "0x" + encode(types, [7, addresses]).hex()}
+    )
+    assert start_index == 7
+    assert [address.lower() for address in decoded] == addresses
@@ -0,0 +1,83 @@
+import brownie
+import pytest
+from brownie import accounts
+from odos_router_v3 import address_list
+from test_lib import utils
+
+
+def test_sync_address_list(router, tmp_path):
+    endpoint_uri = brownie.web3.provider.endpoint_uri
+
+    addresses_to_write = [utils.random_address() for i in range(5)]
+    first_tx = router.writeAddressList(
+        addresses_to_write[:2],
+        {
+            "from": accounts[0],
+        },
+    )
+    second_tx = router.writeAddressList(
+        addresses_to_write[2:],
+        {
+            "from": accounts[0],
+        },
+    )
+    codebook = address_list.sync_address_list(
+        endpoint_uri, router.address, tmp_path, deployment_block=router.tx.block_number
+    )
+    assert codebook.addresses == addresses_to_write
+    assert codebook.length_at(first_tx.block_number - 1) == 0
+    assert codebook.length_at(first_tx.block_number) == 2
+    assert codebook.length_at(second_tx.block_number) == 5
+    assert len(codebook) == router.addressListLength()
+    assert codebook.index(addresses_to_write[3].upper().replace("0X", "0x")) == 3
+    assert codebook.last_block == brownie.chain.height
+
+    # A restart picks up the persisted codebook and only reads logs from newer blocks
+    new_addresses = [utils.random_address() for i in range(3)]
+    tx = router.writeAddressList(
+        new_addresses,
+        {
+            "from": accounts[0],
+        },
+    )
+    assert address_list.AddressListCodebook.load(
+        address_list.codebook_path(tmp_path, brownie.chain.id, router.address)
+    ).addresses == addresses_to_write
+
+    logs = address_list.fetch_address_list_logs(
+        endpoint_uri, router.address, codebook.last_block + 1, tx.block_number
+    )
+    assert [address_list.decode_address_list_appended(log)[0] for log in logs] == [5]
+
+    codebook = address_list.sync_address_list(endpoint_uri, router.address, tmp_path)
+    assert codebook.addresses == addresses_to_write + new_addresses
+    assert len(codebook) == router.addressListLength()
+
+
+def test_sync_address_list_confirmations(router, tmp_path):
+    endpoint_uri = brownie.web3.provider.endpoint_uri
+
+    router.writeAddressList(
+        [utils.random_address()],
+        {
+            "from": accounts[0],
+        },
+    )
+    # The latest block is not yet confirmed, so the append is not synced
+    codebook = address_list.sync_address_list(
+        endpoint_uri,
+        router.address,
+        tmp_path,
+        deployment_block=router.tx.block_number,
+        confirmations=1,
+    )
+    assert len(codebook) == 0
+    assert codebook.last_block == brownie.chain.height - 1
+
+
+def test_codebook_rejects_gaps():
+    codebook = address_list.AddressListCodebook(1, utils.random_address())
+    codebook.append(0, [utils.random_address()])
+
+    with pytest.raises(ValueError):
+        codebook.append(2, [utils.random_address()])
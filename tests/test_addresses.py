@@ -0,0 +1,82 @@
+import random
+
+import pytest
+from eth_abi import encode
+from eth_utils import to_checksum_address
+from odos_router_v3 import compact, event_store, events
+from odos_router_v3.address_list import AddressListCodebook
+from odos_router_v3.addresses import canonical, to_bytes, to_checksum
+from test_lib import utils
+
+
+def test_canonical_forms():
+    address = utils.random_address()
+    raw = bytes.fromhex(address[2:])
+
+    for form in [address, address.upper().replace("0X", "0x"), raw, int.from_bytes(raw, "big")]:
+        assert canonical(form) is canonical(address.lower())
+        assert to_bytes(form) == raw
+    assert canonical(0) == compact.NULL_ADDRESS
+
+    for invalid in ["0x1234", address[2:] + "00", b"\x01" * 19, 1 << 160, -1]:
+        with pytest.raises(ValueError):
+            canonical(invalid)
+
+
+def test_to_checksum():
+    random.seed(0)
+    for i in range(100):
+        address = "0x" + random.randbytes(20).hex()
+        assert to_checksum(address) == to_checksum_address(address)
+        assert to_checksum(bytes.fromhex(address[2:])) == to_checksum_address(address)
+
+
+def test_decoded_addresses_are_shared():
+    random.seed(1)
+    tokens = [utils.random_address() for i in range(3)]
+    swaps = events.SwapColumns()
+    for i in range(50):
+        values = [
+            utils.random_address(),
+            1,
+            random.choice(tokens),
+            2,
+            random.choice(tokens),
+            0,
+            0,
+            0,
+            compact.NULL_ADDRESS,
+        ]
+        swaps.append_log(
+            {
+                "topics": [events.SWAP_TOPIC],
+                "data": "0x" + encode(events.SWAP_TYPES, values).hex(),
+                "blockNumber": hex(i),
+                "logIndex": "0x0",
+                "transactionHash": utils.random_hex_string(32),
+            }
+        )
+
+    decoded = swaps.input_token + swaps.output_token
+    assert len({id(token) for token in decoded}) == len(set(decoded)) <= 3
+    assert all(token is canonical(token) for token in decoded)
+
+    stored = event_store.decode_column(
+        "address", event_store.encode_column("address", swaps.input_token)
+    )
+    assert stored == swaps.input_token
+    assert all(a is b for a, b in zip(stored, swaps.input_token))
+
+
+def test_mixed_case_address_list():
+    address = utils.random_address().lower()
+    checksummed = to_checksum(address)
+    codebook = AddressListCodebook(1, compact.NULL_ADDRESS, [utils.random_address(), checksummed])
+
+    for address_list in [[utils.random_address(), checksummed], codebook]:
+        for form in [address, checksummed, bytes.fromhex(address[2:])]:
+            assert compact.encode_address(form, address_list) == (3).to_bytes(2, "big")
+    assert codebook.find(int(address, 16)) == 1
+    assert compact.encode_address(address.upper().replace("0X", "0x")) == (
+        b"\x00\x01" + bytes.fromhex(address[2:])
+    )
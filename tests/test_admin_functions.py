@@ -1,34 +1,8 @@
 import brownie
-import pytest
-from test_lib import utils
+from test_lib import encode_compact, utils
 from brownie import accounts
 
 
-@pytest.fixture
-def router():
-    return brownie.OdosRouterV3.deploy(
-        accounts[0].address,
-        {
-            "from": accounts[0],
-        },
-    )
-
-
-@pytest.fixture
-def weth_executor():
-    WETH = brownie.WETH9.deploy(
-        {
-            "from": accounts[0],
-        }
-    )
-    return brownie.OdosWETHExecutor.deploy(
-        WETH.address,
-        {
-            "from": accounts[0],
-        },
-    )
-
-
 def test_swap_protected(router, weth_executor):
     weth_address = weth_executor.WETH()
     input_amount = int(1e18)
@@ -171,6 +145,205 @@ def test_swap_router_funds_max(router, weth_executor):
     assert WETH.balanceOf(accounts[1]) - balance_before == input_amount
 
 
+def test_swap_router_funds_batch_protected(router, weth_executor):
+    with brownie.reverts("Address not allowed"):
+        router.swapRouterFundsBatch(
+            [],
+            {
+                "from": accounts[1],
+            },
+        )
+    with brownie.reverts("Address not allowed"):
+        accounts[1].transfer(
+            router.address,
+            0,
+            data=router.swapRouterFundsCompact.signature + "00",
+        )
+
+
+def test_swap_router_funds_batch(router, weth_executor):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e18)
+
+    WETH = brownie.interface.IWETH(weth_address)
+
+    # Hold both ETH and WETH in the router
+    accounts[0].transfer(
+        router.address,
+        input_amount,
+    )
+    WETH.deposit(
+        {
+            "value": input_amount,
+            "from": accounts[0],
+        }
+    )
+    WETH.transfer(
+        router.address,
+        input_amount,
+        {
+            "from": accounts[0],
+        },
+    )
+    weth_balance_before = WETH.balanceOf(accounts[1])
+    eth_balance_before = accounts[1].balance()
+
+    router.swapRouterFundsBatch(
+        [
+            [
+                [["0x0000000000000000000000000000000000000000", 0, weth_executor.address]],
+                [[weth_address, input_amount, input_amount, accounts[1]]],
+                "0x0100000000000000000000000000000000000000000000000000000000000000",
+                weth_executor.address,
+            ],
+            [
+                [[weth_address, 0, weth_executor.address]],
+                [["0x0000000000000000000000000000000000000000", input_amount, input_amount, accounts[1]]],
+                "0x0000000000000000000000000000000000000000000000000000000000000000",
+                weth_executor.address,
+            ],
+        ],
+        {
+            "from": accounts[0],
+        },
+    )
+    assert WETH.balanceOf(accounts[1]) - weth_balance_before == input_amount
+    assert accounts[1].balance() - eth_balance_before == input_amount
+    assert router.balance() == 0
+    assert WETH.balanceOf(router.address) == 0
+
+
+def test_swap_router_funds_compact(router, weth_executor):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e18)
+
+    WETH = brownie.interface.IWETH(weth_address)
+
+    accounts[0].transfer(
+        router.address,
+        input_amount,
+    )
+    WETH.deposit(
+        {
+            "value": input_amount,
+            "from": accounts[0],
+        }
+    )
+    WETH.transfer(
+        router.address,
+        input_amount,
+        {
+            "from": accounts[0],
+        },
+    )
+    # Set address list to be used by the compact decoder
+    address_list = [weth_address, weth_executor.address]
+    router.writeAddressList(
+        address_list,
+        {
+            "from": accounts[0],
+        },
+    )
+    weth_balance_before = WETH.balanceOf(accounts[1])
+    eth_balance_before = accounts[1].balance()
+
+    compact_router_data = encode_compact.construct_compact_swap_router_funds_data(
+        [
+            [
+                [["0x0000000000000000000000000000000000000000", 0, weth_executor.address]],
+                [[weth_address, input_amount, input_amount, accounts[1].address]],
+                "0x01",
+                weth_executor.address,
+            ],
+            [
+                [[weth_address, 0, weth_executor.address]],
+                [["0x0000000000000000000000000000000000000000", input_amount, input_amount, accounts[1].address]],
+                "0x00",
+                weth_executor.address,
+            ],
+        ],
+        address_list,
+    )
+    accounts[0].transfer(
+        router.address,
+        0,
+        data=router.swapRouterFundsCompact.signature + compact_router_data[2:],
+    )
+    assert WETH.balanceOf(accounts[1]) - weth_balance_before == input_amount
+    assert accounts[1].balance() - eth_balance_before == input_amount
+    assert router.balance() == 0
+    assert WETH.balanceOf(router.address) == 0
+
+
+def test_swap_router_funds_batch_gas(router, weth_executor):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e18)
+    num_swaps = 4
+
+    WETH = brownie.interface.IWETH(weth_address)
+
+    swaps = [
+        [
+            [["0x0000000000000000000000000000000000000000", input_amount, weth_executor.address]],
+            [[weth_address, input_amount, input_amount, accounts[1].address]],
+            "0x0100000000000000000000000000000000000000000000000000000000000000",
+            weth_executor.address,
+        ]
+        for i in range(num_swaps)
+    ]
+    # Liquidate with one transaction per swap
+    accounts[0].transfer(
+        router.address,
+        input_amount * num_swaps,
+    )
+    sequential_gas_used = 0
+    for swap in swaps:
+        tx = router.swapRouterFunds(
+            *swap,
+            {
+                "from": accounts[0],
+            },
+        )
+        sequential_gas_used += tx.gas_used
+
+    # Liquidate the same swaps in a single transaction
+    accounts[0].transfer(
+        router.address,
+        input_amount * num_swaps,
+    )
+    weth_balance_before = WETH.balanceOf(accounts[1])
+
+    batch_gas_used = router.swapRouterFundsBatch(
+        swaps,
+        {
+            "from": accounts[0],
+        },
+    ).gas_used
+
+    assert WETH.balanceOf(accounts[1]) - weth_balance_before == input_amount * num_swaps
+
+    accounts[0].transfer(
+        router.address,
+        input_amount * num_swaps,
+    )
+    compact_swaps = [[swap[0], swap[1], "0x01", swap[3]] for swap in swaps]
+    weth_balance_before = WETH.balanceOf(accounts[1])
+
+    compact_gas_used = accounts[0].transfer(
+        router.address,
+        0,
+        data=router.swapRouterFundsCompact.signature
+        + encode_compact.construct_compact_swap_router_funds_data(compact_swaps, [])[2:],
+    ).gas_used
+
+    assert WETH.balanceOf(accounts[1]) - weth_balance_before == input_amount * num_swaps
+
+    # One transaction saves the per-transaction base cost of every swap but the first, and the
+    # compact encoding saves calldata on top of that
+    assert batch_gas_used < sequential_gas_used
+    assert compact_gas_used < batch_gas_used
+
+
 def test_write_address_list_protected(router, weth_executor):
     addresses_to_write = [utils.random_address() for i in range(3)]
     with brownie.reverts("OwnableUnauthorizedAccount: 0x33a4622b82d4c04a53e170c638b944ce27cffce3"):
@@ -194,6 +367,21 @@ def test_write_address_list(router, weth_executor):
     for i, address in enumerate(addresses_to_write):
         assert address == router.addressList(i)
 
+def test_write_address_list_event(router, weth_executor):
+
+    addresses_to_write = [utils.random_address() for i in range(3)]
+    for i in range(2):
+        tx = router.writeAddressList(
+            addresses_to_write,
+            {
+                "from": accounts[0],
+            },
+        )
+        assert tx.events["AddressListAppended"]["startIndex"] == i * len(addresses_to_write)
+        assert tx.events["AddressListAppended"]["addresses"] == addresses_to_write
+
+    assert router.addressListLength() == 2 * len(addresses_to_write)
+
 def test_change_liquidator_protected(router, weth_executor):
 
     new_liquidator = utils.random_address()
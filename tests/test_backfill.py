@@ -0,0 +1,202 @@
+import os
+
+import brownie
+import pytest
+from brownie import accounts
+from odos_router_v3 import backfill, event_store
+from test_lib import utils
+
+
+def swap_history(router, weth_executor, num_swaps):
+    weth_address = weth_executor.WETH()
+    transactions = []
+
+    for i in range(num_swaps):
+        input_amount = int(1e18) + i
+        transactions.append(
+            router.swap(
+                [
+                    "0x0000000000000000000000000000000000000000",
+                    input_amount,
+                    weth_executor.address,
+                    weth_address,
+                    input_amount,
+                    input_amount,
+                    accounts[0],
+                ],
+                "0x01",
+                weth_executor.address,
+                [
+                    i,
+                    0,
+                    "0x0000000000000000000000000000000000000000"
+                ],
+                {
+                    "value": input_amount,
+                    "from": accounts[0],
+                },
+            )
+        )
+
+    return transactions
+
+
+def columns_table(columns):
+    swaps, swap_multis = columns
+    return (
+        {field: getattr(swaps, field) for field in swaps.FIELDS},
+        {field: getattr(swap_multis, field) for field in swap_multis.FIELDS},
+    )
+
+
+def test_backfill_shards(tmp_path):
+    store = event_store.EventStore.open(tmp_path, 1, utils.random_address(), 95, 10)
+    assert backfill.backfill_shards(store, 94) == []
+    assert backfill.backfill_shards(store, 95) == [(95, 95)]
+    assert backfill.backfill_shards(store, 121) == [(95, 99), (100, 109), (110, 119), (120, 121)]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_backfill_matches_sync(router, weth_executor, tmp_path, workers):
+    endpoint_uri = brownie.web3.provider.endpoint_uri
+    transactions = swap_history(router, weth_executor, 10)
+
+    synced = event_store.sync_event_store(
+        endpoint_uri,
+        router.address,
+        tmp_path / "sync",
+        deployment_block=router.tx.block_number,
+        chunk_blocks=2,
+        partition_blocks=3,
+    )
+    backfilled = backfill.backfill_event_store(
+        endpoint_uri,
+        router.address,
+        tmp_path / "backfill",
+        deployment_block=router.tx.block_number,
+        workers=workers,
+        chunk_blocks=2,
+        partition_blocks=3,
+    )
+
+    assert backfilled.last_block == synced.last_block == brownie.chain.height
+    assert backfilled.partitions() == synced.partitions()
+    assert backfilled.checkpoints == synced.checkpoints
+    assert columns_table(backfilled.read()) == columns_table(synced.read())
+    assert backfilled.read()[0].transaction_hash == [tx.txid for tx in transactions]
+    assert os.listdir(tmp_path / "backfill" / backfill.BACKFILL_DIRECTORY) == []
+
+
+def test_backfill_resumes_failed_shards(router, weth_executor, tmp_path, monkeypatch):
+    endpoint_uri = brownie.web3.provider.endpoint_uri
+    transactions = swap_history(router, weth_executor, 10)
+    fetch_shard = backfill.fetch_shard
+    fetched = []
+
+    def flaky_fetch_shard(endpoint_uri, router_address, start, last, *args):
+        if start == router.tx.block_number + 4:
+            raise ConnectionError("node went away")
+        fetched.append(start)
+        return fetch_shard(endpoint_uri, router_address, start, last, *args)
+
+    monkeypatch.setattr(backfill, "fetch_shard", flaky_fetch_shard)
+    with pytest.raises(ValueError):
+        backfill.backfill_event_store(
+            endpoint_uri,
+            router.address,
+            tmp_path,
+            deployment_block=router.tx.block_number,
+            workers=1,
+            chunk_blocks=1,
+            partition_blocks=1,
+        )
+
+    # Shards before the failed one are merged, the ones after it wait on disk
+    store = event_store.EventStore.open(tmp_path, brownie.chain.id, router.address)
+    assert store.last_block == router.tx.block_number + 3
+    num_fetched = len(fetched)
+
+    def counting_fetch_shard(endpoint_uri, router_address, start, last, *args):
+        fetched.append(start)
+        return fetch_shard(endpoint_uri, router_address, start, last, *args)
+
+    monkeypatch.setattr(backfill, "fetch_shard", counting_fetch_shard)
+    store = backfill.backfill_event_store(endpoint_uri, router.address, tmp_path, workers=1)
+
+    assert fetched[num_fetched:] == [router.tx.block_number + 4]
+    assert store.last_block == brownie.chain.height
+    assert store.read()[0].transaction_hash == [tx.txid for tx in transactions]
+
+
+def test_backfill_refetches_reorged_shards(router, weth_executor, tmp_path, monkeypatch):
+    endpoint_uri = brownie.web3.provider.endpoint_uri
+    transactions = swap_history(router, weth_executor, 3)
+    swap_history(router, weth_executor, 3)
+    fetch_shard = backfill.fetch_shard
+
+    def flaky_fetch_shard(endpoint_uri, router_address, start, last, *args):
+        if start == router.tx.block_number + 2:
+            raise ConnectionError("node went away")
+        return fetch_shard(endpoint_uri, router_address, start, last, *args)
+
+    monkeypatch.setattr(backfill, "fetch_shard", flaky_fetch_shard)
+    with pytest.raises(ValueError):
+        backfill.backfill_event_store(
+            endpoint_uri,
+            router.address,
+            tmp_path,
+            deployment_block=router.tx.block_number,
+            workers=1,
+            chunk_blocks=1,
+            partition_blocks=1,
+        )
+
+    # The last three swaps are replaced while their shards wait on disk
+    brownie.chain.undo(3)
+    accounts[0].transfer(accounts[1], 1)
+    transactions += swap_history(router, weth_executor, 2)
+
+    monkeypatch.setattr(backfill, "fetch_shard", fetch_shard)
+    store = backfill.backfill_event_store(endpoint_uri, router.address, tmp_path, workers=1)
+
+    assert store.last_block == brownie.chain.height
+    assert store.read()[0].transaction_hash == [tx.txid for tx in transactions]
+
+
+def test_backfill_refetches_merged_blocks_after_reorg(router, weth_executor, tmp_path, monkeypatch):
+    endpoint_uri = brownie.web3.provider.endpoint_uri
+    transactions = swap_history(router, weth_executor, 6)
+    fetch_shard = backfill.fetch_shard
+
+    def flaky_fetch_shard(endpoint_uri, router_address, start, last, *args):
+        if start == router.tx.block_number + 4:
+            raise ConnectionError("node went away")
+        return fetch_shard(endpoint_uri, router_address, start, last, *args)
+
+    monkeypatch.setattr(backfill, "fetch_shard", flaky_fetch_shard)
+    with pytest.raises(ValueError):
+        backfill.backfill_event_store(
+            endpoint_uri,
+            router.address,
+            tmp_path,
+            deployment_block=router.tx.block_number,
+            workers=1,
+            chunk_blocks=1,
+            partition_blocks=1,
+        )
+    transactions = transactions[:1]
+
+    def reorging_fetch_shard(endpoint_uri, router_address, start, last, *args):
+        # The last five swaps are replaced after the merged blocks were checked, so the fork at
+        # the second swap lies below the newest merged checkpoint
+        if start == router.tx.block_number + 4:
+            brownie.chain.undo(5)
+            accounts[0].transfer(accounts[1], 1)
+            transactions.extend(swap_history(router, weth_executor, 4))
+        return fetch_shard(endpoint_uri, router_address, start, last, *args)
+
+    monkeypatch.setattr(backfill, "fetch_shard", reorging_fetch_shard)
+    store = backfill.backfill_event_store(endpoint_uri, router.address, tmp_path, workers=1)
+
+    assert store.last_block == brownie.chain.height
+    assert store.read()[0].transaction_hash == [tx.txid for tx in transactions]
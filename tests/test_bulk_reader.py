@@ -0,0 +1,110 @@
+import asyncio
+
+import aiohttp
+import brownie
+from brownie import accounts
+from odos_router_v3 import rpc
+from test_lib import utils
+
+
+def test_read_address_list(router):
+    endpoint_uri = brownie.web3.provider.endpoint_uri
+
+    addresses_to_write = [utils.random_address() for i in range(25)]
+    router.writeAddressList(
+        addresses_to_write,
+        {
+            "from": accounts[0],
+        },
+    )
+    assert rpc.read_address_list(
+        endpoint_uri, router.address, 0, 25, chunk_size=7
+    ) == addresses_to_write
+
+    # Reading past the end of the list reverts, which is reported as None when allowed
+    assert rpc.bulk_request(
+        endpoint_uri,
+        [rpc.address_list_call(router.address, 24), rpc.address_list_call(router.address, 25)],
+        allow_errors=True,
+    )[1] is None
+    assert rpc.read_address_list(endpoint_uri, router.address, 24, 2, allow_errors=True) == [
+        addresses_to_write[24],
+        None,
+    ]
+
+    async def read_async():
+        async with aiohttp.ClientSession() as session:
+            return await rpc.async_read_address_list(
+                session, endpoint_uri, router.address, 5, 20, chunk_size=3, max_concurrency=2
+            )
+
+    assert asyncio.run(read_async()) == addresses_to_write[5:]
+
+
+def test_decode_failed_calls():
+    assert rpc.decode_uint("0x" + "0" * 63 + "f") == 15
+    assert rpc.decode_uint("0x") == 0
+    assert rpc.decode_uint(None) is None
+    assert rpc.decode_address("0x" + "0" * 24 + "ab" * 20) == "0x" + "ab" * 20
+    assert rpc.decode_address(None) is None
+
+
+def test_read_failed_calls(monkeypatch):
+    # The second call reverts, and comes back as None through both decoders when allowed
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return [
+                {"jsonrpc": "2.0", "id": 0, "result": "0x" + "0" * 24 + "ab" * 20},
+                {"jsonrpc": "2.0", "id": 1, "error": {"code": 3, "message": "execution reverted"}},
+            ]
+
+    class Session:
+        def post(self, endpoint_uri, json, timeout):
+            return Response()
+
+    router_address = "0x" + "cd" * 20
+    assert rpc.read_address_list(
+        "http://node", router_address, 0, 2, session=Session(), allow_errors=True
+    ) == ["0x" + "ab" * 20, None]
+    assert rpc.read_balances(
+        "http://node", router_address, [rpc.ETH, rpc.ETH], session=Session(), allow_errors=True
+    ) == [int("ab" * 20, 16), None]
+
+
+def test_read_balances(router, weth):
+    endpoint_uri = brownie.web3.provider.endpoint_uri
+    input_amount = int(1e18)
+
+    accounts[0].transfer(
+        router.address,
+        input_amount,
+    )
+    weth.deposit(
+        {
+            "value": input_amount * 2,
+            "from": accounts[0],
+        }
+    )
+    weth.transfer(
+        router.address,
+        input_amount * 2,
+        {
+            "from": accounts[0],
+        },
+    )
+    tokens = [rpc.ETH, weth.address, weth.address]
+
+    assert rpc.read_balances(endpoint_uri, router.address, tokens, chunk_size=2) == [
+        input_amount,
+        input_amount * 2,
+        input_amount * 2,
+    ]
+
+    async def read_async():
+        async with aiohttp.ClientSession() as session:
+            return await rpc.async_read_balances(session, endpoint_uri, router.address, tokens)
+
+    assert asyncio.run(read_async()) == [router.balance(), weth.balanceOf(router), weth.balanceOf(router)]
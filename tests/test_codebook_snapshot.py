@@ -0,0 +1,136 @@
+import multiprocessing
+
+import pytest
+from odos_router_v3 import address_list, snapshot
+from test_lib import encode_compact, utils
+
+
+def test_snapshot_round_trip(tmp_path):
+    router_address = utils.random_address()
+    addresses = [utils.random_address() for i in range(1000)]
+
+    codebook = address_list.AddressListCodebook(1, router_address, addresses, 1234)
+    path = snapshot.write_codebook_snapshot(tmp_path, codebook)
+
+    with snapshot.MappedCodebook(path) as mapped:
+        assert len(mapped) == len(addresses)
+        assert mapped.chain_id == 1
+        assert mapped.router_address == router_address
+        assert mapped.last_block == 1234
+        assert [mapped[i] for i in range(len(mapped))] == addresses
+        assert all(mapped.index(address) == i for i, address in enumerate(addresses))
+
+        assert utils.random_address() not in mapped
+        with pytest.raises(ValueError):
+            mapped.index(utils.random_address())
+        with pytest.raises(IndexError):
+            mapped[len(addresses)]
+
+
+def test_snapshot_duplicate_addresses(tmp_path):
+    addresses = [utils.random_address() for i in range(3)]
+    path = tmp_path / "duplicates.bin"
+
+    snapshot.write_snapshot(path, 1, utils.random_address(), addresses + addresses[:1])
+
+    with snapshot.MappedCodebook(path) as mapped:
+        # The compact encoder always uses the first position of an address
+        assert mapped.index(addresses[0]) == 0
+        assert mapped[3] == addresses[0]
+
+
+def test_snapshot_address_forms(tmp_path):
+    router_address = utils.random_address()
+    addresses = [utils.random_address() for i in range(3)]
+    path = tmp_path / "forms.bin"
+    upper = ["0x" + address[2:].upper() for address in addresses]
+
+    # Hex in any case, bytes and ints all name the same address
+    snapshot.write_snapshot(
+        path,
+        1,
+        bytes.fromhex(router_address[2:]),
+        [upper[0], bytes.fromhex(addresses[1][2:]), int(addresses[2], 16)],
+    )
+
+    with snapshot.MappedCodebook(path) as mapped:
+        assert mapped.router_address == router_address
+        assert [mapped[i] for i in range(3)] == addresses
+        assert mapped[0] is mapped[0]
+        assert mapped.index(bytes.fromhex(addresses[0][2:])) == 0
+        assert mapped.index(int(addresses[1], 16)) == 1
+        assert upper[2] in mapped
+
+
+def test_load_latest_snapshot(tmp_path):
+    router_address = utils.random_address()
+    addresses = [utils.random_address() for i in range(10)]
+
+    for length in [3, 10, 5]:
+        snapshot.write_codebook_snapshot(
+            tmp_path, address_list.AddressListCodebook(1, router_address, addresses[:length])
+        )
+    with snapshot.load_latest_snapshot(tmp_path, 1, router_address) as mapped:
+        assert len(mapped) == 10
+
+    assert snapshot.load_latest_snapshot(tmp_path, 1, router_address, min_length=11) is None
+    assert snapshot.load_latest_snapshot(tmp_path, 2, router_address) is None
+
+
+def test_snapshot_compact_encoding(tmp_path):
+    addresses = [utils.random_address() for i in range(100)]
+    path = tmp_path / "codebook.bin"
+
+    snapshot.write_snapshot(path, 1, utils.random_address(), addresses)
+
+    with snapshot.MappedCodebook(path) as mapped:
+        for address_list_arg in [addresses, mapped]:
+            compact_router_data = encode_compact.construct_compact_swap_data(
+                "0x01",
+                "0x0000000000000000000000000000000000000000",
+                addresses[42],
+                0,
+                int(1e18),
+                0.01,
+                addresses[7],
+                addresses[7],
+                "msg.sender",
+                address_list_arg,
+                0,
+                0,
+                "0x0000000000000000000000000000000000000000"
+            )
+            assert utils.decode_address(6, compact_router_data, mapped) == (addresses[42], 10)
+
+        assert compact_router_data == encode_compact.construct_compact_swap_data(
+            "0x01",
+            "0x0000000000000000000000000000000000000000",
+            addresses[42],
+            0,
+            int(1e18),
+            0.01,
+            addresses[7],
+            addresses[7],
+            "msg.sender",
+            addresses,
+            0,
+            0,
+            "0x0000000000000000000000000000000000000000"
+        )
+
+
+def _worker_lookup(path, address):
+    with snapshot.MappedCodebook(path) as mapped:
+        return mapped.find(address)
+
+
+def test_snapshot_shared_by_workers(tmp_path):
+    addresses = [utils.random_address() for i in range(100)]
+    path = str(tmp_path / "codebook.bin")
+
+    snapshot.write_snapshot(path, 1, utils.random_address(), addresses)
+
+    with multiprocessing.Pool(2) as pool:
+        assert pool.starmap(_worker_lookup, [(path, address) for address in addresses]) == list(
+            range(100)
+        )
@@ -0,0 +1,91 @@
+import random
+
+import pytest
+from odos_router_v3 import compact, structs
+from odos_router_v3.compact_template import CompactTemplate
+from test_lib import utils
+
+
+def random_amount(rng):
+    # Amounts of every byte length, zero included
+    return rng.getrandbits(rng.randint(0, 256))
+
+
+def test_patch_swap_compact():
+    rng = random.Random(0)
+    executor = utils.random_address()
+    token_info = structs.SwapTokenInfo(
+        compact.NULL_ADDRESS,
+        10**18,
+        executor,
+        utils.random_address(),
+        3 * 10**9,
+        1,
+        compact.NULL_ADDRESS,
+    )
+    referral_info = structs.SwapReferralInfo(7, 10**15, utils.random_address())
+    address_list = [token_info.output_token]
+
+    def encode():
+        return structs.encode_swap_compact(
+            token_info, executor, 1000, referral_info, b"\x01" * 64, address_list
+        )
+
+    template = CompactTemplate(encode())
+    for i in range(200):
+        token_info.input_amount = random_amount(rng)
+        token_info.output_quote = random_amount(rng)
+        template.set_input_amount(token_info.input_amount)
+        template.set_output_quote(token_info.output_quote)
+
+        assert bytes(template) == encode()
+        assert template.amounts() == ([token_info.input_amount], [token_info.output_quote])
+
+    decoded = compact.decode_compact_call(bytes(template), address_list)
+    assert decoded.inputs[0].amount == token_info.input_amount
+    assert decoded.outputs[0].quote == token_info.output_quote
+    assert decoded.path_definition == b"\x01" * 64
+
+    with pytest.raises(IndexError):
+        template.set_output_quote(1, 1)
+
+
+def test_patch_swap_multi_compact():
+    rng = random.Random(1)
+    executor = utils.random_address()
+    inputs = [
+        structs.InputTokenInfo(utils.random_address(), 10**18, compact.NULL_ADDRESS)
+        for i in range(3)
+    ]
+    outputs = [
+        structs.OutputTokenInfo(utils.random_address(), 10**6, 1, compact.NULL_ADDRESS)
+        for i in range(2)
+    ]
+    referral_info = structs.SwapReferralInfo(0, 0, compact.NULL_ADDRESS)
+
+    def encode():
+        return structs.encode_swap_multi_compact(
+            inputs, outputs, executor, 1000, referral_info, b"\x02" * 32
+        )
+
+    template = CompactTemplate("0x" + encode().hex())
+    for i in range(200):
+        token_info = rng.choice(inputs + outputs)
+        amount = random_amount(rng)
+        if token_info in inputs:
+            token_info.amount_in = amount
+            template.set_input_amount(amount, inputs.index(token_info))
+        else:
+            token_info.amount_quote = amount
+            template.set_output_quote(amount, outputs.index(token_info))
+        assert bytes(template) == encode()
+
+    assert template.amounts() == (
+        [token_info.amount_in for token_info in inputs],
+        [token_info.amount_quote for token_info in outputs],
+    )
+
+
+def test_template_rejects_other_calls():
+    with pytest.raises(ValueError):
+        CompactTemplate(b"\x12\x34\x56\x78" + bytes(64))
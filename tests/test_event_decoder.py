@@ -0,0 +1,185 @@
+import random
+
+import brownie
+import pytest
+from brownie import accounts
+from eth_abi import decode, encode
+from eth_utils import keccak
+from odos_router_v3 import events
+from test_lib import utils
+
+
+def random_amount():
+    return random.choice([0, 1, random.getrandbits(128), random.getrandbits(256)])
+
+
+def random_slippage():
+    return random.choice([0, -1, 1, -(2**255), 2**255 - 1, random.getrandbits(100) - 2**99])
+
+
+def swap_log(block_number, log_index):
+    values = [
+        utils.random_address(),
+        random_amount(),
+        utils.random_address(),
+        random_amount(),
+        utils.random_address(),
+        random_slippage(),
+        random.getrandbits(64),
+        random.getrandbits(64),
+        utils.random_address(),
+    ]
+    log = {
+        "topics": [events.SWAP_TOPIC],
+        "data": "0x" + encode(events.SWAP_TYPES, values).hex(),
+        "blockNumber": hex(block_number),
+        "logIndex": hex(log_index),
+        "transactionHash": utils.random_hex_string(32),
+    }
+    return log, values
+
+
+def swap_multi_log(block_number, log_index):
+    num_inputs = random.randint(0, 4)
+    num_outputs = random.randint(0, 4)
+    values = [
+        utils.random_address(),
+        [random_amount() for i in range(num_inputs)],
+        [utils.random_address() for i in range(num_inputs)],
+        [random_amount() for i in range(num_outputs)],
+        [utils.random_address() for i in range(num_outputs)],
+        [random_slippage() for i in range(num_outputs)],
+        random.getrandbits(64),
+        random.getrandbits(64),
+        utils.random_address(),
+    ]
+    log = {
+        "topics": [events.SWAP_MULTI_TOPIC],
+        "data": "0x" + encode(events.SWAP_MULTI_TYPES, values).hex(),
+        "blockNumber": hex(block_number),
+        "logIndex": hex(log_index),
+        "transactionHash": utils.random_hex_string(32),
+    }
+    return log, values
+
+
+def test_topics():
+    assert events.SWAP_TOPIC == "0x" + keccak(text=f"Swap({','.join(events.SWAP_TYPES)})").hex()
+    assert events.SWAP_MULTI_TOPIC == "0x" + keccak(
+        text=f"SwapMulti({','.join(events.SWAP_MULTI_TYPES)})"
+    ).hex()
+
+
+def test_decode_matches_eth_abi():
+    random.seed(1)
+    logs = []
+    for i in range(300):
+        if random.random() < 0.5:
+            logs.append(swap_log(i, i % 7)[0])
+        else:
+            logs.append(swap_multi_log(i, i % 7)[0])
+    # Other router events are skipped
+    logs.append({"topics": [utils.random_hex_string(32)], "data": "0x"})
+
+    swaps, swap_multis = events.decode_router_logs(logs)
+    assert len(swaps) + len(swap_multis) == 300
+
+    swap_index = 0
+    multi_index = 0
+    for i, log in enumerate(logs[:-1]):
+        if log["topics"][0] == events.SWAP_TOPIC:
+            expected = decode(events.SWAP_TYPES, bytes.fromhex(log["data"][2:]))
+            row = [getattr(swaps, field)[swap_index] for field in events.SwapColumns.FIELDS]
+
+            assert row[:3] == [i, i % 7, log["transactionHash"]]
+            assert tuple(row[3:]) == expected
+            swap_index += 1
+        else:
+            expected = decode(events.SWAP_MULTI_TYPES, bytes.fromhex(log["data"][2:]))
+            start, end = swap_multis.input_range(multi_index)
+            output_start, output_end = swap_multis.output_range(multi_index)
+
+            assert swap_multis.block_number[multi_index] == i
+            assert swap_multis.sender[multi_index] == expected[0]
+            assert tuple(swap_multis.amounts_in[start:end]) == expected[1]
+            assert tuple(swap_multis.tokens_in[start:end]) == expected[2]
+            assert tuple(swap_multis.amounts_out[output_start:output_end]) == expected[3]
+            assert tuple(swap_multis.tokens_out[output_start:output_end]) == expected[4]
+            assert tuple(swap_multis.slippage[output_start:output_end]) == expected[5]
+            assert swap_multis.referral_code[multi_index] == expected[6]
+            assert swap_multis.referral_fee[multi_index] == expected[7]
+            assert swap_multis.referral_fee_recipient[multi_index] == expected[8]
+            multi_index += 1
+
+
+def test_decode_appends():
+    swaps, swap_multis = events.decode_router_logs([swap_log(1, 0)[0], swap_multi_log(1, 1)[0]])
+    events.decode_router_logs([swap_log(2, 0)[0], swap_multi_log(2, 1)[0]], swaps, swap_multis)
+
+    assert swaps.block_number == [1, 2]
+    assert swap_multis.block_number == [1, 2]
+    assert swap_multis.inputs_end[1] == len(swap_multis.tokens_in)
+
+
+def test_decode_rejects_malformed_swap_multi():
+    random.seed(2)
+    swap_multis = events.decode_router_logs([swap_multi_log(1, 0)[0]])[1]
+    columns = {
+        field: list(getattr(swap_multis, field))
+        for field in swap_multis.FIELDS + swap_multis.INPUT_FIELDS + swap_multis.OUTPUT_FIELDS
+    }
+
+    # Two input amounts for one input token
+    log, values = swap_multi_log(2, 0)
+    values[1] = [1, 2]
+    values[2] = [utils.random_address()]
+    log["data"] = "0x" + encode(events.SWAP_MULTI_TYPES, values).hex()
+    with pytest.raises(ValueError):
+        swap_multis.append_log(log)
+
+    # The columns are left as they were, and later logs line up with their legs
+    assert {field: getattr(swap_multis, field) for field in columns} == columns
+    log, values = swap_multi_log(3, 0)
+    swap_multis.append_log(log)
+    start, end = swap_multis.input_range(1)
+    assert swap_multis.block_number == [1, 3]
+    assert tuple(swap_multis.tokens_in[start:end]) == tuple(values[2])
+
+
+def test_decode_router_swap_log(router, weth_executor):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e18)
+
+    tx = router.swap(
+        [
+            "0x0000000000000000000000000000000000000000",
+            input_amount,
+            weth_executor.address,
+            weth_address,
+            input_amount,
+            input_amount,
+            "0x0000000000000000000000000000000000000000"
+        ],
+        "0x01",
+        weth_executor.address,
+        [
+            7,
+            0,
+            "0x0000000000000000000000000000000000000000"
+        ],
+        {
+            "value": input_amount,
+            "from": accounts[0],
+        },
+    )
+    receipt = brownie.web3.eth.get_transaction_receipt(tx.txid)
+    swaps, swap_multis = events.decode_router_logs(receipt["logs"])
+
+    assert len(swaps) == 1 and len(swap_multis) == 0
+    assert swaps.sender == [accounts[0].address.lower()]
+    assert swaps.input_amount == [input_amount]
+    assert swaps.output_token == [weth_address.lower()]
+    assert swaps.amount_out == [tx.events["Swap"]["amountOut"]]
+    assert swaps.slippage == [tx.events["Swap"]["slippage"]]
+    assert swaps.referral_code == [7]
+    assert swaps.block_number == [tx.block_number]
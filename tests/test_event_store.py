@@ -0,0 +1,311 @@
+import os
+import random
+
+import brownie
+import pytest
+from brownie import accounts
+from eth_abi import encode
+from odos_router_v3 import event_store, events
+from test_lib import utils
+
+
+def synthetic_columns(seed, from_block, to_block, logs_per_block=2):
+    # Decoded Swap and SwapMulti logs spread over [from_block, to_block]
+    rng = random.Random(seed)
+
+    logs = []
+    for block in range(from_block, to_block + 1):
+        for log_index in range(rng.randint(0, logs_per_block)):
+            legs = [rng.randint(0, 3) for i in range(2)]
+            if rng.random() < 0.5:
+                topic, types = events.SWAP_TOPIC, events.SWAP_TYPES
+                values = [
+                    utils.random_address(),
+                    rng.getrandbits(256),
+                    utils.random_address(),
+                    rng.getrandbits(128),
+                    utils.random_address(),
+                    rng.getrandbits(128) - 2**127,
+                    rng.getrandbits(64),
+                    rng.getrandbits(64),
+                    utils.random_address(),
+                ]
+            else:
+                topic, types = events.SWAP_MULTI_TOPIC, events.SWAP_MULTI_TYPES
+                values = [
+                    utils.random_address(),
+                    [rng.getrandbits(256) for i in range(legs[0])],
+                    [utils.random_address() for i in range(legs[0])],
+                    [rng.getrandbits(256) for i in range(legs[1])],
+                    [utils.random_address() for i in range(legs[1])],
+                    [rng.getrandbits(128) - 2**127 for i in range(legs[1])],
+                    rng.getrandbits(64),
+                    rng.getrandbits(64),
+                    utils.random_address(),
+                ]
+            logs.append(
+                {
+                    "topics": [topic],
+                    "data": "0x" + encode(types, values).hex(),
+                    "blockNumber": hex(block),
+                    "logIndex": hex(log_index),
+                    "transactionHash": utils.random_hex_string(32),
+                }
+            )
+
+    return events.decode_router_logs(logs)
+
+
+def table(columns):
+    fields = columns.FIELDS + getattr(columns, "INPUT_FIELDS", ()) + getattr(
+        columns, "OUTPUT_FIELDS", ()
+    )
+    return {field: getattr(columns, field) for field in fields}
+
+
+def assert_same_events(actual, expected):
+    assert table(actual[0]) == table(expected[0])
+    assert table(actual[1]) == table(expected[1])
+
+
+def rows_in(columns, from_block, to_block):
+    swaps, swap_multis = columns
+    return (
+        swaps.rows(
+            sum(block < from_block for block in swaps.block_number),
+            sum(block <= to_block for block in swaps.block_number),
+        ),
+        swap_multis.rows(
+            sum(block < from_block for block in swap_multis.block_number),
+            sum(block <= to_block for block in swap_multis.block_number),
+        ),
+    )
+
+
+def test_column_round_trip():
+    values = {
+        "u64": [0, 1, 2**64 - 1],
+        "uint256": [0, 1, 2**256 - 1],
+        "int256": [0, -1, 2**255 - 1, -(2**255)],
+        "address": [utils.random_address().lower() for i in range(3)],
+        "hash": [utils.random_hex_string(32) for i in range(3)],
+    }
+    for kind, column in values.items():
+        data = event_store.encode_column(kind, column)
+        assert len(data) == len(column) * event_store._WIDTHS[kind]
+        assert event_store.decode_column(kind, data) == column
+
+
+def test_rows_and_extend():
+    columns = synthetic_columns(0, 0, 100)
+    for split in [0, 1, 50, len(columns[1]), len(columns[1]) + 5]:
+        for full in columns:
+            joined = full.rows(0, split)
+            joined.extend(full.rows(split, len(full)))
+            assert table(joined) == table(full)
+
+
+def test_append_and_read(tmp_path):
+    full = synthetic_columns(1, 100, 999)
+    store = event_store.EventStore.open(tmp_path, 1, utils.random_address(), 100, 64)
+
+    for from_block, to_block in [(100, 130), (131, 131), (132, 460), (461, 999)]:
+        store.append(*rows_in(full, from_block, to_block), to_block)
+
+    assert store.last_block == 999
+    assert [start for start, last in store.partitions()] == list(range(64, 1000, 64))
+    assert_same_events(store.read(), full)
+    assert_same_events(store.read(200, 517), rows_in(full, 200, 517))
+
+    # A reopened store sees the same events, and can read a subset of the columns
+    store = event_store.EventStore.open(tmp_path, 1, store.router_address)
+    swaps, swap_multis = store.read(fields=["amount_out", "tokens_out"])
+    assert swaps.amount_out == full[0].amount_out
+    assert swaps.sender == []
+    assert swap_multis.tokens_out == full[1].tokens_out
+    assert swap_multis.outputs_end == full[1].outputs_end
+
+    with pytest.raises(ValueError):
+        event_store.EventStore.open(tmp_path, 2, store.router_address)
+    with pytest.raises(ValueError):
+        store.append(*rows_in(full, 990, 999), 1000)
+
+
+def test_append_rewrites_new_partitions_only(tmp_path):
+    full = synthetic_columns(2, 0, 499)
+    store = event_store.EventStore.open(tmp_path, 1, utils.random_address(), 0, 100)
+    store.append(*rows_in(full, 0, 250), 250)
+
+    before = sorted(os.listdir(tmp_path / "partitions"))
+    modified = {name: os.stat(tmp_path / "partitions" / name).st_mtime_ns for name in before}
+    store.append(*rows_in(full, 251, 499), 499)
+    after = sorted(os.listdir(tmp_path / "partitions"))
+
+    # Only the partially filled partition is replaced by a new version
+    assert before == [
+        "000000000000-000000000099",
+        "000000000100-000000000199",
+        "000000000200-000000000250",
+    ]
+    assert after == before[:2] + [
+        "000000000200-000000000299",
+        "000000000300-000000000399",
+        "000000000400-000000000499",
+    ]
+    for name in before[:2]:
+        assert os.stat(tmp_path / "partitions" / name).st_mtime_ns == modified[name]
+    assert_same_events(store.read(), full)
+
+
+def test_rollback(tmp_path):
+    old = synthetic_columns(3, 0, 399)
+    new = synthetic_columns(4, 0, 399)
+    store = event_store.EventStore.open(tmp_path, 1, utils.random_address(), 0, 100)
+    store.append(*old, 399, [(99, "0x01"), (399, "0x02")])
+
+    store.rollback(150)
+    assert store.last_block == 150
+    assert store.checkpoints == [(99, "0x01")]
+    assert_same_events(store.read(), rows_in(old, 0, 150))
+
+    # The replaced blocks come back with different events
+    store.append(*rows_in(new, 151, 399), 399)
+    swaps, swap_multis = store.read()
+    assert swaps.transaction_hash == (
+        rows_in(old, 0, 150)[0].transaction_hash + rows_in(new, 151, 399)[0].transaction_hash
+    )
+    assert len(swap_multis) == len(rows_in(old, 0, 150)[1]) + len(rows_in(new, 151, 399)[1])
+
+
+def test_interrupted_append(tmp_path):
+    full = synthetic_columns(5, 0, 299)
+    store = event_store.EventStore.open(tmp_path, 1, utils.random_address(), 0, 100)
+    store.append(*rows_in(full, 0, 150), 150)
+
+    # A run that wrote partitions but stopped before moving the cursor
+    stray = synthetic_columns(6, 151, 299)
+    store.write_partition(100, 199, *stray)
+    store.write_partition(200, 299, *stray)
+
+    store = event_store.EventStore.open(tmp_path, 1, store.router_address)
+    assert store.last_block == 150
+    assert_same_events(store.read(), rows_in(full, 0, 150))
+
+    store.append(*rows_in(full, 151, 299), 299)
+    assert_same_events(store.read(), full)
+
+
+def swap_history(router, weth_executor, num_swaps):
+    # Single and multi swaps of ETH to WETH with varying amounts and referral codes
+    weth_address = weth_executor.WETH()
+    transactions = []
+
+    for i in range(num_swaps):
+        input_amount = int(1e18) + i
+        referral_info = [
+            i,
+            0,
+            "0x0000000000000000000000000000000000000000"
+        ]
+        if i % 3:
+            tx = router.swap(
+                [
+                    "0x0000000000000000000000000000000000000000",
+                    input_amount,
+                    weth_executor.address,
+                    weth_address,
+                    input_amount,
+                    input_amount,
+                    accounts[0],
+                ],
+                "0x01",
+                weth_executor.address,
+                referral_info,
+                {
+                    "value": input_amount,
+                    "from": accounts[0],
+                },
+            )
+        else:
+            tx = router.swapMulti(
+                [
+                    [
+                        "0x0000000000000000000000000000000000000000",
+                        input_amount,
+                        weth_executor.address,
+                    ]
+                ],
+                [[weth_address, input_amount, input_amount, accounts[0]]],
+                "0x0100000000000000000000000000000000000000000000000000000000000000",
+                weth_executor.address,
+                referral_info,
+                {
+                    "value": input_amount,
+                    "from": accounts[0],
+                },
+            )
+        transactions.append(tx)
+
+    return transactions
+
+
+def test_sync_event_store(router, weth_executor, tmp_path):
+    endpoint_uri = brownie.web3.provider.endpoint_uri
+
+    transactions = swap_history(router, weth_executor, 12)
+    store = event_store.sync_event_store(
+        endpoint_uri,
+        router.address,
+        tmp_path,
+        deployment_block=router.tx.block_number,
+        chunk_blocks=2,
+        partition_blocks=5,
+    )
+    assert store.last_block == brownie.chain.height
+
+    swaps, swap_multis = store.read()
+    assert swaps.transaction_hash == [tx.txid for tx in transactions if "Swap" in tx.events]
+    assert swaps.amount_out == [
+        tx.events["Swap"]["amountOut"] for tx in transactions if "Swap" in tx.events
+    ]
+    assert swap_multis.referral_code == [i for i in range(12) if i % 3 == 0]
+    assert swap_multis.amounts_in == [int(1e18) + i for i in range(12) if i % 3 == 0]
+
+    # A re-run only reads the new blocks and keeps the old partitions as they are
+    old_partitions = store.partitions()[:-1]
+    new_transactions = swap_history(router, weth_executor, 4)
+    store = event_store.sync_event_store(endpoint_uri, router.address, tmp_path)
+
+    assert store.partitions()[:len(old_partitions)] == old_partitions
+    swaps, swap_multis = store.read()
+    assert len(swaps) + len(swap_multis) == 16
+    assert swaps.transaction_hash[-1] == new_transactions[-1].txid
+
+
+def test_sync_event_store_reorg(router, weth_executor, tmp_path):
+    endpoint_uri = brownie.web3.provider.endpoint_uri
+
+    swap_history(router, weth_executor, 3)
+    brownie.chain.snapshot()
+    orphaned = swap_history(router, weth_executor, 3)
+    event_store.sync_event_store(
+        endpoint_uri,
+        router.address,
+        tmp_path,
+        deployment_block=router.tx.block_number,
+        chunk_blocks=1,
+        partition_blocks=4,
+    )
+
+    # The last swaps are replaced by a different branch of the same length
+    brownie.chain.revert()
+    brownie.chain.mine(len(orphaned) - 1)
+    replacement = swap_history(router, weth_executor, 1)
+    store = event_store.sync_event_store(endpoint_uri, router.address, tmp_path)
+
+    assert store.last_block == brownie.chain.height
+    swaps, swap_multis = store.read()
+    transaction_hashes = set(swaps.transaction_hash + swap_multis.transaction_hash)
+    assert replacement[0].txid in transaction_hashes
+    assert not transaction_hashes & {tx.txid for tx in orphaned}
+    assert len(transaction_hashes) == 4
@@ -0,0 +1,147 @@
+import pytest
+from brownie import accounts
+from odos_router_v3 import gas
+from test_lib import encode_compact
+
+
+def test_calldata_gas():
+    assert gas.calldata_gas(b"") == 0
+    assert gas.calldata_gas("0x0001ff00") == 2 * 4 + 2 * 16
+    assert gas.intrinsic_gas("0x00") == 21000 + 4
+
+
+def test_compact_payload_shape():
+    weth_address = "0x" + "11" * 20
+    executor = "0x" + "22" * 20
+    router_address = "0x" + "33" * 20
+
+    compact_router_data = encode_compact.construct_compact_swap_multi_data(
+        "0x01" + "00" * 40,
+        ["0x0000000000000000000000000000000000000000", weth_address],
+        [weth_address],
+        [1, 2],
+        [3],
+        0.01,
+        executor,
+        [executor, executor],
+        ["msg.sender"],
+        [weth_address],
+        0,
+        10**15,
+        router_address,
+    )
+    data = "0x84a7f3dd" + compact_router_data[2:]
+
+    assert gas.compact_payload_shape(data, router_address) == gas.PayloadShape(
+        "swapMultiCompact", 2, 1, 1, 1, 0, 2, 2
+    )
+    # Without the router address a fee is assumed to be paid out for every output
+    assert gas.compact_payload_shape(data).fee_transfers == 1
+
+
+def test_fit_gas_model():
+    def execution_gas(shape):
+        intercept = {"swap": 30000, "swapCompact": 25000}[shape.function]
+        return (
+            intercept
+            + 20000 * shape.erc20_inputs
+            + 9000 * shape.fee_transfers
+            + 40 * shape.path_words
+        )
+
+    shapes = [
+        gas.PayloadShape(function, 1, 1, erc20_inputs, 1 - erc20_inputs, fee, hits, words)
+        for function in ["swap", "swapCompact"]
+        for erc20_inputs in [0, 1]
+        for fee in [0, 1]
+        for hits in [0, 2]
+        for words in [1, 3]
+    ]
+    samples = [gas.GasSample(shape, 21500, 21500 + execution_gas(shape)) for shape in shapes]
+
+    model = gas.fit_gas_model(samples)
+    assert model.samples == len(samples)
+
+    unseen = gas.PayloadShape("swapCompact", 1, 1, 1, 0, 1, 0, 7)
+    assert model.execution_gas(unseen) == pytest.approx(execution_gas(unseen))
+    # Features that never vary in the calibration runs are folded into the intercepts
+    assert model.coefficients[gas.SHAPE_FEATURES.index("inputs")] == 0
+
+    with pytest.raises(ValueError):
+        model.execution_gas(unseen._replace(function="swapMulti"))
+
+
+def test_gas_model_error_bounds(tmp_path):
+    shapes = [gas.PayloadShape("swap", 1, 1, 0, 1, 0, 0, words) for words in range(1, 5)]
+    noise = [30, -10, -40, 20]
+    samples = [
+        gas.GasSample(shape, 21000, 21000 + 50000 + 100 * shape.path_words + error)
+        for shape, error in zip(shapes, noise)
+    ]
+    model = gas.fit_gas_model(samples)
+
+    low, high = model.error_bounds()
+    for sample in samples:
+        error = sample.gas_used - sample.intrinsic_gas - model.execution_gas(sample.shape)
+        assert low - 1e-6 <= error <= high + 1e-6
+        assert model.gas_limit(sample.shape, "0x") >= sample.gas_used
+    assert low < 0 < high
+
+    path = tmp_path / "gas_model.json"
+    model.save(path)
+    loaded = gas.GasModel.load(path)
+
+    assert loaded.error_bounds() == model.error_bounds()
+    assert loaded.predict(shapes[0], "0x1234") == model.predict(shapes[0], "0x1234")
+
+
+def test_gas_model_local_calibration(router, weth_executor):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e15)
+
+    address_list = [weth_address, weth_executor.address]
+    router.writeAddressList(
+        address_list,
+        {
+            "from": accounts[0],
+        },
+    )
+
+    def swap(words, cached):
+        compact_router_data = encode_compact.construct_compact_swap_data(
+            "0x01" + "00" * (32 * words - 1),
+            "0x0000000000000000000000000000000000000000",
+            weth_address,
+            input_amount,
+            input_amount,
+            0.01,
+            weth_executor.address,
+            weth_executor.address,
+            "msg.sender",
+            address_list if cached else [],
+            0,
+            0,
+            "0x0000000000000000000000000000000000000000"
+        )
+        data = router.swapCompact.signature + compact_router_data[2:]
+
+        # Measure the second swap so no run pays for first time balance writes
+        accounts[0].transfer(router.address, input_amount, data=data)
+        tx = accounts[0].transfer(router.address, input_amount, data=data)
+
+        return data, tx.gas_used
+
+    samples = []
+    for words in [1, 2, 4]:
+        for cached in [False, True]:
+            data, gas_used = swap(words, cached)
+            samples.append(
+                gas.GasSample(gas.compact_payload_shape(data), gas.intrinsic_gas(data), gas_used)
+            )
+    model = gas.fit_gas_model(samples)
+
+    data, gas_used = swap(8, True)
+    prediction = model.predict(gas.compact_payload_shape(data), data)
+
+    assert abs(prediction - gas_used) < 0.01 * gas_used
+    assert model.gas_limit(gas.compact_payload_shape(data), data) > 0.99 * gas_used
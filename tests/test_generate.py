@@ -0,0 +1,46 @@
+from eth_keys import keys
+from test_lib.generate import NULL_ADDRESS, Generator
+
+
+def test_same_seed_same_corpus():
+    def corpus(seed):
+        generator = Generator(seed)
+        tokens = generator.token_set(10)
+        return [
+            generator.addresses(50),
+            generator.private_keys(5),
+            generator.amounts(50, decimals=6),
+            generator.edge_amounts(50),
+            tokens,
+            generator.popular_tokens(tokens, 50),
+            generator.path_definitions(5),
+        ]
+
+    assert corpus(1) == corpus(1)
+    assert corpus(1) != corpus(2)
+
+
+def test_corpus_shapes():
+    generator = Generator(0)
+
+    addresses = generator.addresses(1000)
+    assert all(len(address) == 42 and address == address.lower() for address in addresses)
+    assert len(set(addresses)) == 1000
+    assert len(generator.hex_string(7)) == 16
+
+    for key in generator.private_keys(10):
+        keys.PrivateKey(bytes.fromhex(key[2:]))
+
+    amounts = generator.amounts(1000, decimals=6, low=0, high=3)
+    assert all(10**6 <= amount <= 10**9 for amount in amounts)
+    edge_amounts = generator.edge_amounts(1000)
+    assert all(0 <= amount < 2**256 for amount in edge_amounts)
+    assert {0, 2**256 - 1} & set(edge_amounts)
+
+    tokens = generator.token_set(20)
+    assert tokens[0] == NULL_ADDRESS and len(set(tokens)) == 20
+    draws = generator.popular_tokens(tokens, 10_000)
+    assert draws.count(tokens[0]) > draws.count(tokens[1]) > draws.count(tokens[-1])
+
+    for path_definition in generator.path_definitions(100, 2, 4):
+        assert len(path_definition) in [64, 96, 128]
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+import odos_router_v3
+
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(odos_router_v3.__file__))
+
+# Modules that decode, encode and hash without a node or a signer
+LIGHT_MODULES = [
+    "odos_router_v3.abi",
+    "odos_router_v3.address_list",
+    "odos_router_v3.addresses",
+    "odos_router_v3.compact",
+    "odos_router_v3.compact_template",
+    "odos_router_v3.event_store",
+    "odos_router_v3.events",
+    "odos_router_v3.permit2",
+    "odos_router_v3.preflight",
+    "odos_router_v3.structs",
+    "odos_router_v3.transactions",
+]
+HEAVY_MODULES = ["web3", "eth_account", "eth_abi", "eth_utils", "requests", "aiohttp", "asyncio"]
+
+
+def test_light_modules_import_lazily():
+    # A fresh interpreter, as this one has already imported everything the other tests use
+    code = (
+        f"import sys\nimport {', '.join(LIGHT_MODULES)}\n"
+        f"print(sorted(set(sys.modules) & {set(HEAVY_MODULES)!r}))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": PACKAGE_ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert output.strip() == "[]"
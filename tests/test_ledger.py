@@ -0,0 +1,252 @@
+import brownie
+from brownie import accounts
+from odos_router_v3 import event_store, events, ledger
+from test_lib import utils
+
+
+def swap_columns(rows):
+    # rows of (block, amount_out, output_token, slippage, code, fee, fee_recipient)
+    swaps = events.SwapColumns()
+    for block, amount_out, token, slippage, code, fee, recipient in rows:
+        swaps.block_number.append(block)
+        swaps.transaction_hash.append(utils.random_hex_string(32))
+        swaps.amount_out.append(amount_out)
+        swaps.output_token.append(token)
+        swaps.slippage.append(slippage)
+        swaps.referral_code.append(code)
+        swaps.referral_fee.append(fee)
+        swaps.referral_fee_recipient.append(recipient)
+    return swaps
+
+
+def test_ledger_totals():
+    router_address = utils.random_address().lower()
+    referrer = utils.random_address().lower()
+    token = utils.random_address().lower()
+    other_token = utils.random_address().lower()
+    fee = 10**15
+
+    net = 10**18 * (10**18 - fee) // 10**18
+    swaps = swap_columns(
+        [
+            # Capped positive slippage of 50
+            (10, 1000, token, 50, 7, 0, ledger.settlement.NULL_ADDRESS),
+            # Positive slippage passed on to the user
+            (10, 1000, token, 50, 7 + (1 << 48), 0, ledger.settlement.NULL_ADDRESS),
+            # Fee with a custom split, the router keeps the rest
+            (11, net, other_token, 0, 8 + (5000 << 32), fee, referrer),
+            # Fee sent to the router itself
+            (20, net, token, 0, 8, fee, router_address),
+        ]
+    )
+    swap_multis = events.SwapMultiColumns()
+    swap_multis.block_number = [20, 21]
+    swap_multis.transaction_hash = ["0x01", "0x02"]
+    swap_multis.referral_code = [7, 0]
+    swap_multis.referral_fee = [0, 0]
+    swap_multis.referral_fee_recipient = [ledger.settlement.NULL_ADDRESS] * 2
+    swap_multis.tokens_in = [other_token]
+    swap_multis.amounts_in = [123]
+    swap_multis.inputs_end = [0, 1]
+    swap_multis.tokens_out = [token, other_token, token]
+    swap_multis.amounts_out = [100, 200, 300]
+    swap_multis.slippage = [3, -4, 0]
+    swap_multis.outputs_end = [2, 3]
+
+    revenue_ledger = ledger.RevenueLedger(router_address)
+    revenue_ledger.apply(
+        swaps,
+        swap_multis,
+        {10: 1, 11: 1, 20: 2, 21: 2},
+        30,
+        router_funds_transactions=["0x02"],
+    )
+
+    fee_revenue = 10**18 * fee // 10**18
+    assert revenue_ledger.token_revenue == {
+        token: 50 + fee_revenue + 3,
+        other_token: fee_revenue - fee_revenue * 5000 // 10000,
+    }
+    assert revenue_ledger.referral_revenue == {
+        (7, token): 53,
+        (8, other_token): fee_revenue // 2,
+        (8, token): fee_revenue,
+    }
+    assert revenue_ledger.daily_revenue == {
+        (1, token): 50,
+        (1, other_token): fee_revenue // 2,
+        (2, token): fee_revenue + 3,
+    }
+    # The swapRouterFunds input left the router
+    assert revenue_ledger.withdrawals == {other_token: 123}
+    assert revenue_ledger.balances[other_token] == fee_revenue // 2 - 123
+    assert revenue_ledger.last_block == 30
+
+    assert revenue_ledger.reconcile({token: 50 + fee_revenue + 3, other_token: 0}) == {
+        other_token: 123 - fee_revenue // 2
+    }
+    assert ledger.RevenueLedger.from_json(revenue_ledger.to_json()).to_json() == (
+        revenue_ledger.to_json()
+    )
+
+
+def test_ledger_withdrawals():
+    token = utils.random_address().lower()
+    swaps = swap_columns(
+        [
+            (block, 1000, token, 10, 0, 0, ledger.settlement.NULL_ADDRESS)
+            for block in [5, 6, 7, 8]
+        ]
+    )
+    revenue_ledger = ledger.RevenueLedger(utils.random_address())
+    revenue_ledger.apply(
+        swaps.rows(0, 3),
+        events.SwapMultiColumns(),
+        {5: 0, 6: 0, 7: 0},
+        7,
+        # A full balance withdrawal sees the events before its block only
+        [
+            ledger.Withdrawal(7, token, 0),
+            ledger.Withdrawal(6, token, 5),
+            ledger.Withdrawal(8, token, 0),
+        ],
+    )
+    assert revenue_ledger.withdrawals == {token: 20}
+    assert revenue_ledger.balances == {token: 10}
+
+    # Events and withdrawals up to the last block are not applied again
+    revenue_ledger.apply(
+        swaps, events.SwapMultiColumns(), {8: 0}, 8, [ledger.Withdrawal(8, token, 0)]
+    )
+    assert revenue_ledger.token_revenue == {token: 40}
+    assert revenue_ledger.withdrawals == {token: 30}
+    assert revenue_ledger.balances == {token: 10}
+
+
+def test_router_transfers():
+    token = utils.random_address().lower()
+    other_token = utils.random_address().lower()
+
+    swaps = swap_columns([(5, 1000, token, 0, 0, 0, ledger.settlement.NULL_ADDRESS)])
+    swap_multis = events.SwapMultiColumns()
+    swap_multis.block_number = [6, 7, 8, 9]
+    swap_multis.transaction_hash = ["0x06", "0x07", "0x08", "0x09"]
+    swap_multis.referral_code = [0, 0, 0, 1]
+    swap_multis.referral_fee = [0, 0, 0, 0]
+    swap_multis.referral_fee_recipient = [ledger.settlement.NULL_ADDRESS] * 4
+    swap_multis.tokens_in = [token, other_token, other_token, ledger.NULL_ADDRESS, token]
+    swap_multis.amounts_in = [10, 20, 30, 40, 50]
+    swap_multis.inputs_end = [2, 3, 4, 5]
+    swap_multis.tokens_out = [token] * 4
+    swap_multis.amounts_out = [1, 2, 3, 4]
+    swap_multis.slippage = [0] * 4
+    swap_multis.outputs_end = [1, 2, 3, 4]
+
+    transfers = [
+        # Payout of a user swap
+        ledger.RouterTransfer(5, swaps.transaction_hash[0], token, 990),
+        # Inputs of a router fund swap made through another contract
+        ledger.RouterTransfer(6, "0x06", token, 10),
+        ledger.RouterTransfer(6, "0x06", other_token, 20),
+        # Withdrawals, the empty transfer is not a full balance withdrawal
+        ledger.RouterTransfer(7, "0x0a", token, 60),
+        ledger.RouterTransfer(8, "0x0b", other_token, 0),
+    ]
+
+    # 0x07 takes its input from the user, 0x08 only has a native input and 0x09 has referral info
+    assert ledger.router_funds_transactions(swap_multis, transfers) == ({"0x06"}, {"0x08"})
+    assert ledger.transfer_withdrawals(transfers, swaps, swap_multis) == [
+        ledger.Withdrawal(7, token, 60)
+    ]
+
+
+def test_transfer_router_funds_withdrawals(router):
+    token = utils.random_address()
+    data = router.transferRouterFunds.encode_input([token], [0], accounts[1])
+
+    assert ledger.transfer_router_funds_withdrawals({"input": data, "blockNumber": "0x10"}) == [
+        ledger.Withdrawal(16, token.lower(), 0)
+    ]
+    assert ledger.transfer_router_funds_withdrawals({"input": "0x", "blockNumber": 16}) == []
+
+
+def test_ledger_reconciles_with_router(router, weth_executor, tmp_path):
+    endpoint_uri = brownie.web3.provider.endpoint_uri
+    weth_address = weth_executor.WETH()
+    WETH = brownie.interface.IWETH(weth_address)
+    input_amount = int(1e18)
+    fee = int(1e14)
+
+    for quote, code, fee_recipient in [
+        (input_amount // 2, 1, accounts[1].address),
+        (input_amount // 2, 2 + (1 << 48), router.address),
+        (input_amount - fee * 10, 3 + (2500 << 32), accounts[2].address),
+    ]:
+        router.swap(
+            [
+                "0x0000000000000000000000000000000000000000",
+                input_amount,
+                weth_executor.address,
+                weth_address,
+                quote,
+                quote // 2,
+                accounts[0],
+            ],
+            "0x01",
+            weth_executor.address,
+            [
+                code,
+                fee,
+                fee_recipient
+            ],
+            {
+                "value": input_amount,
+                "from": accounts[0],
+            },
+        )
+    # Found from its Transfer log, only native token withdrawals need passing in
+    router.transferRouterFunds(
+        [weth_address],
+        [input_amount // 4],
+        accounts[3],
+        {
+            "from": accounts[0],
+        },
+    )
+
+    store = event_store.sync_event_store(
+        endpoint_uri, router.address, tmp_path, deployment_block=router.tx.block_number
+    )
+    revenue_ledger = ledger.sync_revenue_ledger(
+        endpoint_uri,
+        store,
+        ledger.RevenueLedger(router.address),
+        [],
+        deployment_block=router.tx.block_number,
+    )
+
+    assert revenue_ledger.balances == {weth_address.lower(): WETH.balanceOf(router.address)}
+    assert revenue_ledger.reconcile_on_chain(endpoint_uri) == {}
+    assert set(revenue_ledger.referral_revenue) == {
+        (1, weth_address.lower()),
+        (2, weth_address.lower()),
+        (3, weth_address.lower()),
+    }
+
+    # Funds sent to the router outside of a swap show up as unexplained income
+    WETH.deposit(
+        {
+            "value": 5,
+            "from": accounts[0],
+        }
+    )
+    WETH.transfer(
+        router.address,
+        5,
+        {
+            "from": accounts[0],
+        },
+    )
+    assert revenue_ledger.reconcile_on_chain(endpoint_uri, brownie.chain.height) == {
+        weth_address.lower(): 5
+    }
@@ -2,7 +2,6 @@ import math
 import random
 
 from test_lib.utils import encode_address, encode_amount, encode_bytes, encode_bytes_string
-from web3 import Web3
 
 
 def construct_compact_swap_data(
@@ -107,3 +106,37 @@ def construct_compact_swap_multi_data(
     compact_router_data += encode_bytes(path_def_bytes)
 
     return compact_router_data
+
+
+def construct_compact_swap_router_funds_data(
+    swaps,
+    address_list
+):
+    # Each swap is given in routerFundsSwapInfo order: (inputs, outputs, path_def_bytes, executor)
+    compact_router_data = "0x"
+
+    compact_router_data += encode_bytes_string(len(swaps), 1)
+
+    for inputs, outputs, path_def_bytes, executor in swaps:
+        compact_router_data += encode_bytes_string(len(inputs), 1)
+        compact_router_data += encode_bytes_string(len(outputs), 1)
+
+        compact_router_data += encode_address(executor, address_list)
+
+        for input_token, input_amount, input_dest in inputs:
+            compact_router_data += encode_address(input_token, address_list)
+            compact_router_data += encode_amount(input_amount)
+
+            if input_dest == executor:
+                compact_router_data += "0000"
+            else:
+                compact_router_data += encode_address(input_dest, address_list)
+
+        for output_token, output_quote, output_min, output_dest in outputs:
+            compact_router_data += encode_address(output_token, address_list)
+            compact_router_data += encode_amount(output_min)
+            compact_router_data += encode_address(output_dest, address_list)
+
+        compact_router_data += encode_bytes(path_def_bytes)
+
+    return compact_router_data
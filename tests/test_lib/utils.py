@@ -1,35 +1,10 @@
 import math
 import random
 
-from web3 import Web3
-
 
 def random_hex_string(num_bytes):
-    hex_string = "0x"
-
-    for i in range(num_bytes * 2):
-        hex_string += random.choice(
-            [
-                "0",
-                "1",
-                "2",
-                "3",
-                "4",
-                "5",
-                "6",
-                "7",
-                "8",
-                "9",
-                "a",
-                "b",
-                "c",
-                "d",
-                "e",
-                "f",
-            ]
-        )
-
-    return hex_string
+    # Seeded by random.seed like the rest of the random module, see test_lib.generate for bulk data
+    return "0x" + random.randbytes(num_bytes).hex()
 
 
 def random_private_key():
@@ -0,0 +1,133 @@
+import brownie
+from brownie import accounts
+from odos_router_v3 import liquidation
+
+
+def test_plan_skips_dust():
+    tokens = ["0x" + "11" * 20, "0x" + "22" * 20, "0x" + "33" * 20]
+    prices = {token: 1.0 for token in tokens}
+
+    candidates = liquidation.liquidation_candidates(
+        tokens,
+        [10_000_000, 100, 0],
+        prices,
+        gas_cost=0.001,
+        dust_value=1_000,
+    )
+    # The second token is worth less than the gas needed to swap it and the third is empty
+    assert [c.token for c in candidates] == [tokens[0]]
+
+
+def test_plan_orders_by_value_per_gas():
+    tokens = ["0x" + "11" * 20, "0x" + "22" * 20, "0x" + "33" * 20]
+    prices = {token: 1.0 for token in tokens}
+
+    candidates = liquidation.liquidation_candidates(
+        tokens,
+        [10**6, 10**8, 10**7],
+        prices,
+        gas_cost=0,
+        swap_gas={tokens[2]: 10**6},
+        transfer_tokens=[tokens[0]],
+    )
+    calls = liquidation.plan_liquidation(
+        candidates,
+        accounts[1].address,
+        lambda token, amount: ([], "0x", accounts[2].address),
+    )
+    ratios = [call.value / call.gas for call in calls]
+
+    assert ratios == sorted(ratios, reverse=True)
+    assert [call.function for call in calls] == [
+        "swapRouterFunds",
+        "transferRouterFunds",
+        "swapRouterFunds",
+    ]
+    # A gas budget keeps only the best prefix of the plan
+    assert (
+        liquidation.plan_liquidation(
+            candidates,
+            accounts[1].address,
+            lambda token, amount: ([], "0x", accounts[2].address),
+            max_gas=calls[0].gas + calls[1].gas,
+        )
+        == calls[:2]
+    )
+
+
+def test_plan_router_liquidation(router, weth_executor):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e18)
+
+    WETH = brownie.interface.IWETH(weth_address)
+
+    # Hold ETH to be swapped into WETH, and WETH to be transferred directly
+    accounts[0].transfer(
+        router.address,
+        input_amount,
+    )
+    WETH.deposit(
+        {
+            "value": input_amount,
+            "from": accounts[0],
+        }
+    )
+    WETH.transfer(
+        router.address,
+        input_amount,
+        {
+            "from": accounts[0],
+        },
+    )
+    dust_token = brownie.WETH9.deploy(
+        {
+            "from": accounts[0],
+        }
+    )
+    dust_token.deposit(
+        {
+            "value": 1,
+            "from": accounts[0],
+        }
+    )
+    dust_token.transfer(
+        router.address,
+        1,
+        {
+            "from": accounts[0],
+        },
+    )
+
+    def get_swap(token, amount):
+        return (
+            [[weth_address, amount, amount, accounts[1].address]],
+            "0x0100000000000000000000000000000000000000000000000000000000000000",
+            weth_executor.address,
+        )
+
+    calls = liquidation.plan_router_liquidation(
+        "http://localhost:8545",
+        router.address,
+        [liquidation.ETH, weth_address, dust_token.address],
+        {liquidation.ETH: 1.0, weth_address: 1.0, dust_token.address: 1.0},
+        1e-9,
+        accounts[1].address,
+        get_swap,
+        transfer_tokens=[weth_address],
+        dust_value=1e9,
+    )
+    assert {call.function for call in calls} == {"swapRouterFunds", "transferRouterFunds"}
+
+    balance_before = WETH.balanceOf(accounts[1])
+
+    for call in calls:
+        getattr(router, call.function)(
+            *call.args,
+            {
+                "from": accounts[0],
+            },
+        )
+    assert WETH.balanceOf(accounts[1]) - balance_before == 2 * input_amount
+    assert router.balance() == 0
+    assert WETH.balanceOf(router.address) == 0
+    assert dust_token.balanceOf(router.address) == 1
@@ -0,0 +1,108 @@
+import random
+
+from odos_router_v3 import events, metrics, settlement
+from test_lib import utils
+
+
+def brute_force_stats(added, now, seconds, bucket_seconds, token):
+    # Recomputes a window from every event added so far. The window holds the buckets after
+    # now's bucket less the window size, an event older than the window when it was added is dropped
+    head = None
+    kept = []
+    for timestamp, event_token, volume, positive, fee in added:
+        bucket = timestamp // bucket_seconds
+        head = bucket if head is None else max(head, bucket)
+        if bucket > head - seconds // bucket_seconds and event_token == token:
+            kept.append((bucket, volume, positive, fee))
+    head = max(head, now // bucket_seconds)
+    kept = [event for event in kept if event[0] > head - seconds // bucket_seconds]
+    return metrics.WindowStats(
+        sum(event[1] for event in kept),
+        len(kept),
+        sum(event[2] for event in kept),
+        sum(event[3] for event in kept),
+    )
+
+
+def test_windows_match_brute_force():
+    rng = random.Random(0)
+    tokens = [utils.random_address().lower() for i in range(5)]
+    windows = {"short": (10, 1), "long": (300, 30)}
+    swap_metrics = metrics.SwapMetrics(windows)
+
+    added = []
+    timestamp = 1_700_000_000
+    for i in range(3000):
+        # Mostly increasing timestamps with some late events and some long gaps
+        timestamp += rng.choice([0, 0, 1, 2, 40, 400])
+        event_timestamp = timestamp - rng.choice([0, 0, 0, 3, 50])
+        event = (
+            event_timestamp,
+            rng.choice(tokens),
+            rng.randint(1, 10**20),
+            rng.getrandbits(1),
+            rng.choice([0, rng.randint(1, 10**16)]),
+        )
+        swap_metrics.add(*event)
+        added.append(event)
+
+        if i % 100 == 0:
+            swap_metrics.advance(timestamp)
+            for name, (seconds, bucket_seconds) in windows.items():
+                for token in tokens:
+                    assert swap_metrics.stats(name, token) == brute_force_stats(
+                        added, timestamp, seconds, bucket_seconds, token
+                    )
+
+    # Tokens without swaps in a window are dropped from it
+    swap_metrics.advance(timestamp + 11)
+    assert swap_metrics.tokens("short") == []
+    assert swap_metrics.stats("short", tokens[0]) == metrics.EMPTY_STATS
+    assert all(not bucket for bucket in swap_metrics.windows["short"].buckets)
+    assert set(swap_metrics.tokens("long")) <= set(tokens)
+
+
+def test_add_decoded_logs():
+    checksum_token = utils.random_address()
+    token = checksum_token.lower()
+    other_token = utils.random_address().lower()
+    fee = 10**15
+    net = 10**18 * (settlement.FEE_DENOM - fee) // settlement.FEE_DENOM
+
+    swaps = events.SwapColumns()
+    swaps.block_number = [1, 2, 3]
+    swaps.output_token = [token, token, other_token]
+    swaps.amount_out = [1000, net, 500]
+    swaps.slippage = [20, 0, -1]
+    swaps.referral_code = [0, 0, 0]
+    swaps.referral_fee = [0, fee, 0]
+    swaps.referral_fee_recipient = [utils.random_address().lower()] * 3
+
+    swap_multis = events.SwapMultiColumns()
+    swap_multis.block_number = [3]
+    swap_multis.referral_code = [0]
+    swap_multis.referral_fee = [0]
+    swap_multis.tokens_out = [token, other_token]
+    swap_multis.amounts_out = [100, 200]
+    swap_multis.slippage = [5, 0]
+    swap_multis.outputs_end = [2]
+
+    block_timestamps = {1: 1000, 2: 1030, 3: 1070}
+    swap_metrics = metrics.SwapMetrics()
+    swap_metrics.add_swaps(swaps, block_timestamps)
+    swap_metrics.add_swap_multis(swap_multis, block_timestamps)
+
+    # The fee is the difference between the replayed executor output and the logged output
+    replayed = settlement.settle_swaps(swaps, utils.random_address())
+    fee_amount = replayed.referrer_payout[1] + replayed.router_revenue[1]
+
+    stats = swap_metrics.stats("1h", checksum_token)
+    assert stats == metrics.WindowStats(1000 + net + 100, 3, 2, fee_amount)
+    assert stats.positive_slippage_rate == 2 / 3
+    assert swap_metrics.stats("1h", other_token) == metrics.WindowStats(700, 2, 0, 0)
+    assert swap_metrics.top_tokens("1h", 1) == [token]
+
+    # The first block is out of the minute
+    assert swap_metrics.stats("1m", token) == metrics.WindowStats(net + 100, 2, 1, fee_amount)
+    assert swap_metrics.stats("1m", other_token).swaps == 2
+    assert metrics.EMPTY_STATS.positive_slippage_rate == 0.0
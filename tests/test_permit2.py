@@ -0,0 +1,178 @@
+import random
+
+from eth_account import Account
+from eth_account.messages import SignableMessage, _hash_eip191_message, encode_typed_data
+from eth_utils import keccak
+from odos_router_v3 import permit2
+from test_lib import utils
+
+
+TOKEN_PERMISSIONS = [
+    {"name": "token", "type": "address"},
+    {"name": "amount", "type": "uint256"},
+]
+PERMIT_DETAILS = [
+    {"name": "token", "type": "address"},
+    {"name": "amount", "type": "uint160"},
+    {"name": "expiration", "type": "uint48"},
+    {"name": "nonce", "type": "uint48"},
+]
+
+
+def domain(chain_id):
+    return {"name": "Permit2", "chainId": chain_id, "verifyingContract": permit2.PERMIT2_ADDRESS}
+
+
+def typed_data_hash(chain_id, primary_type, types, message):
+    return _hash_eip191_message(
+        encode_typed_data(domain(chain_id), {primary_type: types[0], **types[1]}, message)
+    )
+
+
+def test_type_hashes():
+    token_permissions = "TokenPermissions(address token,uint256 amount)"
+    details = "PermitDetails(address token,uint160 amount,uint48 expiration,uint48 nonce)"
+    for type_hash, type_string in [
+        (
+            permit2.DOMAIN_TYPEHASH,
+            "EIP712Domain(string name,uint256 chainId,address verifyingContract)",
+        ),
+        (permit2.PERMIT2_NAME_HASH, "Permit2"),
+        (permit2.TOKEN_PERMISSIONS_TYPEHASH, token_permissions),
+        (
+            permit2.PERMIT_TRANSFER_FROM_TYPEHASH,
+            "PermitTransferFrom(TokenPermissions permitted,address spender,uint256 nonce,"
+            "uint256 deadline)" + token_permissions,
+        ),
+        (
+            permit2.PERMIT_BATCH_TRANSFER_FROM_TYPEHASH,
+            "PermitBatchTransferFrom(TokenPermissions[] permitted,address spender,uint256 nonce,"
+            "uint256 deadline)" + token_permissions,
+        ),
+        (permit2.PERMIT_DETAILS_TYPEHASH, details),
+        (
+            permit2.PERMIT_SINGLE_TYPEHASH,
+            "PermitSingle(PermitDetails details,address spender,uint256 sigDeadline)" + details,
+        ),
+        (
+            permit2.PERMIT_BATCH_TYPEHASH,
+            "PermitBatch(PermitDetails[] details,address spender,uint256 sigDeadline)" + details,
+        ),
+    ]:
+        assert type_hash == keccak(text=type_string)
+
+
+def test_hashes_match_eth_account():
+    random.seed(0)
+    for i in range(10):
+        chain_id = random.randint(1, 2**32)
+        tokens = [utils.random_address() for i in range(3)]
+        amounts = [random.getrandbits(160) for i in range(3)]
+        nonces = [random.getrandbits(48) for i in range(3)]
+        spender = utils.random_address()
+        deadline = random.getrandbits(48)
+        separator = permit2.domain_separator(chain_id)
+
+        expected = typed_data_hash(
+            chain_id,
+            "PermitTransferFrom",
+            [
+                [
+                    {"name": "permitted", "type": "TokenPermissions"},
+                    {"name": "spender", "type": "address"},
+                    {"name": "nonce", "type": "uint256"},
+                    {"name": "deadline", "type": "uint256"},
+                ],
+                {"TokenPermissions": TOKEN_PERMISSIONS},
+            ],
+            {
+                "permitted": {"token": tokens[0], "amount": amounts[0]},
+                "spender": spender,
+                "nonce": nonces[0],
+                "deadline": deadline,
+            },
+        )
+        struct_hash = permit2.permit_transfer_from_hash(
+            tokens[0], amounts[0], spender, nonces[0], deadline
+        )
+        assert permit2.signing_hash(separator, struct_hash) == expected
+
+        # ETH inputs are not permitted, the batch hash only covers the ERC20 inputs
+        expected = typed_data_hash(
+            chain_id,
+            "PermitBatchTransferFrom",
+            [
+                [
+                    {"name": "permitted", "type": "TokenPermissions[]"},
+                    {"name": "spender", "type": "address"},
+                    {"name": "nonce", "type": "uint256"},
+                    {"name": "deadline", "type": "uint256"},
+                ],
+                {"TokenPermissions": TOKEN_PERMISSIONS},
+            ],
+            {
+                "permitted": [
+                    {"token": tokens[i], "amount": amounts[i]} for i in [0, 2]
+                ],
+                "spender": spender,
+                "nonce": nonces[0],
+                "deadline": deadline,
+            },
+        )
+        struct_hash = permit2.permit_batch_transfer_from_hash(
+            [tokens[0], bytes(20), tokens[2]], amounts, spender, nonces[0], deadline
+        )
+        assert permit2.signing_hash(separator, struct_hash) == expected
+
+        expected = typed_data_hash(
+            chain_id,
+            "PermitBatch",
+            [
+                [
+                    {"name": "details", "type": "PermitDetails[]"},
+                    {"name": "spender", "type": "address"},
+                    {"name": "sigDeadline", "type": "uint256"},
+                ],
+                {"PermitDetails": PERMIT_DETAILS},
+            ],
+            {
+                "details": [
+                    {
+                        "token": tokens[i],
+                        "amount": amounts[i],
+                        "expiration": deadline,
+                        "nonce": nonces[i],
+                    }
+                    for i in range(3)
+                ],
+                "spender": spender,
+                "sigDeadline": deadline,
+            },
+        )
+        struct_hash = permit2.permit_batch_hash(
+            tokens, amounts, deadline, nonces, spender, deadline
+        )
+        assert permit2.signing_hash(separator, struct_hash) == expected
+        assert permit2.permit_single_hash(
+            tokens[0], amounts[0], deadline, nonces[0], spender, deadline
+        ) == keccak(
+            permit2.PERMIT_SINGLE_TYPEHASH
+            + permit2.permit_details_hash(tokens[0], amounts[0], deadline, nonces[0])
+            + bytes(12)
+            + bytes.fromhex(spender[2:])
+            + deadline.to_bytes(32, "big")
+        )
+
+
+def test_sign_matches_eth_account():
+    private_key = utils.random_private_key()
+    separator = permit2.domain_separator(1)
+    struct_hash = permit2.permit_transfer_from_hash(
+        utils.random_address(), 10**18, utils.random_address(), 0, 2**48 - 1
+    )
+
+    signature = permit2.sign(private_key, separator, struct_hash)
+    expected = Account.sign_message(
+        SignableMessage(b"\x01", separator, struct_hash), private_key=private_key
+    )
+    assert signature == bytes(expected.signature)
@@ -0,0 +1,320 @@
+import brownie
+import pytest
+from brownie import accounts
+from odos_router_v3 import abi, preflight
+from odos_router_v3.compact import NULL_ADDRESS, SWAP_COMPACT_SELECTOR
+from test_lib import encode_compact, utils
+
+
+AMOUNT = 10**18
+FEE_RECIPIENT = "0x000000000000000000000000000000000000dEaD"
+NO_REFERRAL = (0, 0, NULL_ADDRESS)
+
+# (token_info changes, referral_info, value, expected revert) for an ETH to WETH swap that
+# otherwise succeeds through the WETH executor
+SWAP_CASES = [
+    ({}, NO_REFERRAL, AMOUNT, None),
+    ({"input_amount": 0}, NO_REFERRAL, AMOUNT, None),
+    ({}, NO_REFERRAL, 0, "Wrong msg.value"),
+    ({"input_token": "weth"}, NO_REFERRAL, AMOUNT, "Wrong msg.value"),
+    ({"output_min": AMOUNT + 1}, NO_REFERRAL, AMOUNT, "Minimum greater than quote"),
+    ({"output_min": 0}, NO_REFERRAL, AMOUNT, "Minimum output is zero"),
+    ({"output_token": NULL_ADDRESS}, NO_REFERRAL, AMOUNT, "Arbitrage not supported"),
+    ({"output_min": 1}, (0, 10**14, NULL_ADDRESS), AMOUNT, "Null fee recipient"),
+    ({"output_min": 1}, (0, 10**17, FEE_RECIPIENT), AMOUNT, "Fee too high"),
+    ({"output_min": 1}, (10001 << 32, 10**14, FEE_RECIPIENT), AMOUNT, "Invalid Ref Code"),
+    # _swap only checks the split when there is a fee
+    ({}, (10001 << 32, 0, NULL_ADDRESS), AMOUNT, None),
+]
+
+# (inputs, outputs, referral_info, value, expected revert), "weth" is replaced by its address
+SWAP_MULTI_CASES = [
+    ([(NULL_ADDRESS, AMOUNT)], [("weth", AMOUNT)], NO_REFERRAL, AMOUNT, None),
+    ([(NULL_ADDRESS, 0)], [("weth", AMOUNT)], NO_REFERRAL, AMOUNT, None),
+    ([(NULL_ADDRESS, AMOUNT)], [("weth", AMOUNT)], NO_REFERRAL, 0, "Wrong msg.value"),
+    ([], [("weth", AMOUNT)], NO_REFERRAL, AMOUNT, "Wrong msg.value"),
+    (
+        [(NULL_ADDRESS, AMOUNT), (NULL_ADDRESS, AMOUNT)],
+        [("weth", AMOUNT)],
+        NO_REFERRAL,
+        AMOUNT,
+        "Duplicate source tokens",
+    ),
+    (
+        [(NULL_ADDRESS, AMOUNT)],
+        [(NULL_ADDRESS, AMOUNT)],
+        NO_REFERRAL,
+        AMOUNT,
+        "Arbitrage not supported",
+    ),
+    (
+        [(NULL_ADDRESS, AMOUNT)],
+        [("weth", AMOUNT, AMOUNT + 1)],
+        NO_REFERRAL,
+        AMOUNT,
+        "Minimum greater than quote",
+    ),
+    (
+        [(NULL_ADDRESS, AMOUNT)],
+        [("weth", AMOUNT, 0)],
+        NO_REFERRAL,
+        AMOUNT,
+        "Minimum output is zero",
+    ),
+    (
+        [(NULL_ADDRESS, AMOUNT)],
+        [("weth", AMOUNT), ("weth", AMOUNT)],
+        NO_REFERRAL,
+        AMOUNT,
+        "Duplicate destination tokens",
+    ),
+    (
+        [(NULL_ADDRESS, AMOUNT)],
+        [("weth", AMOUNT, 1)],
+        (10001 << 32, 0, NULL_ADDRESS),
+        AMOUNT,
+        "Invalid Ref Code",
+    ),
+    (
+        [(NULL_ADDRESS, AMOUNT)],
+        [("weth", AMOUNT, 1)],
+        (0, 10**14, NULL_ADDRESS),
+        AMOUNT,
+        "Null fee recipient",
+    ),
+    (
+        [(NULL_ADDRESS, AMOUNT)],
+        [("weth", AMOUNT, 1)],
+        (0, 10**17, FEE_RECIPIENT),
+        AMOUNT,
+        "Fee too high",
+    ),
+    # Without outputs the fee is never checked
+    ([(NULL_ADDRESS, AMOUNT)], [], (0, 10**14, NULL_ADDRESS), AMOUNT, None),
+]
+
+
+def swap_args(weth_address, executor, changes, referral_info):
+    token_info = {
+        "input_token": NULL_ADDRESS,
+        "input_amount": AMOUNT,
+        "input_receiver": executor,
+        "output_token": weth_address,
+        "quote": AMOUNT,
+        "output_min": AMOUNT,
+        "receiver": FEE_RECIPIENT,
+    }
+    token_info.update(changes)
+    if token_info["input_token"] == "weth":
+        token_info["input_token"] = weth_address
+    return (tuple(token_info.values()), "0x01", executor, referral_info)
+
+
+def swap_multi_args(weth_address, executor, inputs, outputs, referral_info):
+    inputs = [(token, amount, executor) for token, amount in inputs]
+    outputs = [
+        (weth_address if output[0] == "weth" else output[0], output[1], output[-1], FEE_RECIPIENT)
+        for output in outputs
+    ]
+    return (
+        inputs,
+        outputs,
+        "0x0100000000000000000000000000000000000000000000000000000000000000",
+        executor,
+        referral_info,
+    )
+
+
+def test_check_swap():
+    weth_address = utils.random_address()
+    executor = utils.random_address()
+    for changes, referral_info, value, expected in SWAP_CASES:
+        args = swap_args(weth_address, executor, changes, referral_info)
+        assert preflight.check_call("swap", *args, value=value) == expected
+        assert preflight.check_call("swapWithHook", *args, executor, "0x", value=value) == expected
+
+
+def test_check_swap_multi():
+    weth_address = utils.random_address()
+    executor = utils.random_address()
+    calls = []
+    for inputs, outputs, referral_info, value, expected in SWAP_MULTI_CASES:
+        args = swap_multi_args(weth_address, executor, inputs, outputs, referral_info)
+        assert preflight.check_call("swapMulti", *args, value=value) == expected
+        calls.append(("swapMulti", args, value))
+
+    assert preflight.check_calls(calls) == [case[-1] for case in SWAP_MULTI_CASES]
+
+
+def test_check_swap_multi_first_failure():
+    # The router reports the first failing require, the set based checks keep that order
+    token = utils.random_address()
+    other_token = utils.random_address()
+    assert (
+        preflight.check_swap_multi(
+            [(token, 1, NULL_ADDRESS), (other_token, 1, NULL_ADDRESS), (token, 1, NULL_ADDRESS)],
+            [(other_token.lower(), 1, 1, NULL_ADDRESS)],
+            NO_REFERRAL,
+        )
+        == "Arbitrage not supported"
+    )
+    assert (
+        preflight.check_swap_multi(
+            [(token, 1, NULL_ADDRESS)],
+            [(other_token, 1, 1, NULL_ADDRESS), (other_token, 1, 0, NULL_ADDRESS)],
+            NO_REFERRAL,
+        )
+        == "Minimum output is zero"
+    )
+
+
+def test_check_permit2_swaps():
+    weth_address = utils.random_address()
+    executor = utils.random_address()
+    permit2 = (utils.random_address(), 0, 0, b"")
+    permit2_address = utils.random_address()
+    token = utils.random_address()
+
+    # The Permit2 variants are not payable and share the checks of _swap once the input moved
+    for changes, referral_info, value, expected in SWAP_CASES:
+        if expected == "Wrong msg.value":
+            continue
+        args = swap_args(weth_address, executor, changes, referral_info)
+        assert preflight.check_call("swapPermit2", permit2, *args) == expected
+        assert preflight.check_call("swapPermit2WithHook", permit2, *args, executor, "0x") == (
+            expected
+        )
+        assert preflight.check_call("swapPermit2Allowance", permit2_address, *args) == expected
+        assert preflight.check_call("swapPermit2", permit2, *args, value=AMOUNT) == (
+            "Cannot send ether to nonpayable function"
+        )
+
+    args = swap_args(
+        weth_address, executor, {"input_token": token, "input_amount": 2**160}, NO_REFERRAL
+    )
+    assert preflight.check_call("swapPermit2Allowance", permit2_address, *args) == (
+        "Amount too large"
+    )
+    assert preflight.check_call("swapPermit2", permit2, *args) is None
+
+
+def test_check_permit2_swap_multis():
+    weth_address = utils.random_address()
+    executor = utils.random_address()
+    permit2 = (utils.random_address(), 0, 0, b"")
+    permit2_address = utils.random_address()
+
+    for inputs, outputs, referral_info, value, expected in SWAP_MULTI_CASES:
+        args = swap_multi_args(weth_address, executor, inputs, outputs, referral_info)
+        assert preflight.check_call("swapMultiPermit2", permit2, *args, value=value) == expected
+        assert (
+            preflight.check_call(
+                "swapMultiPermit2WithHook", permit2, *args, executor, "0x", value=value
+            )
+            == expected
+        )
+        assert (
+            preflight.check_call("swapMultiPermit2Allowance", permit2_address, *args, value=value)
+            == expected
+        )
+
+    # The amounts are checked in the loop before the msg.value require, ETH inputs are not
+    token = utils.random_address()
+    args = swap_multi_args(
+        weth_address, executor, [(token, 2**160)], [("weth", AMOUNT)], NO_REFERRAL
+    )
+    assert preflight.check_call("swapMultiPermit2Allowance", permit2_address, *args) == (
+        "Amount too large"
+    )
+    assert preflight.check_call(
+        "swapMultiPermit2Allowance", permit2_address, *args, value=AMOUNT
+    ) == "Amount too large"
+    assert preflight.check_call("swapMultiPermit2", permit2, *args) is None
+    args = swap_multi_args(
+        weth_address, executor, [(NULL_ADDRESS, 2**160)], [("weth", AMOUNT)], NO_REFERRAL
+    )
+    assert preflight.check_call(
+        "swapMultiPermit2Allowance", permit2_address, *args, value=2**160
+    ) is None
+
+
+def test_check_call_unsupported():
+    with pytest.raises(ValueError, match="swapRouterFunds"):
+        preflight.check_call("swapRouterFunds", [], [], "0x", utils.random_address())
+    with pytest.raises(ValueError):
+        preflight.check_calls([("transferRouterFunds", ([], [], NULL_ADDRESS), 0)])
+
+
+def test_encode_checked_call():
+    args = swap_args(utils.random_address(), utils.random_address(), {}, NO_REFERRAL)
+    assert preflight.encode_checked_call("swap", *args, value=AMOUNT) == abi.encode_call(
+        "swap", *args
+    )
+    with pytest.raises(ValueError, match="Wrong msg.value"):
+        preflight.encode_checked_call("swap", *args)
+
+
+def test_check_compact_call():
+    weth_address = utils.random_address()
+    executor = utils.random_address()
+
+    def compact_call(max_slippage_percent, address_list):
+        return SWAP_COMPACT_SELECTOR.hex() + encode_compact.construct_compact_swap_data(
+            "0x01",
+            NULL_ADDRESS,
+            weth_address,
+            AMOUNT,
+            AMOUNT,
+            max_slippage_percent,
+            executor,
+            executor,
+            "msg.sender",
+            address_list,
+            0,
+            0,
+            NULL_ADDRESS,
+        )[2:]
+
+    assert preflight.check_compact_call("0x" + compact_call(0.01, []), AMOUNT) is None
+    assert preflight.check_compact_call("0x" + compact_call(0.01, []), 0) == "Wrong msg.value"
+    # The full tolerance takes the minimum output to zero
+    assert preflight.check_compact_call("0x" + compact_call(1, []), AMOUNT) == (
+        "Minimum output is zero"
+    )
+
+    data = "0x" + compact_call(0.01, [weth_address])
+    with pytest.raises(ValueError):
+        preflight.check_compact_call(data, AMOUNT)
+    assert preflight.check_compact_call(data, AMOUNT, [weth_address]) is None
+
+
+def assert_router_agrees(router, function, args, value, expected):
+    assert preflight.check_call(function, *args, value=value) == expected
+    transaction = [
+        *args,
+        {
+            "value": value,
+            "from": accounts[0],
+        },
+    ]
+    if expected is None:
+        getattr(router, function)(*transaction)
+    else:
+        with brownie.reverts(expected):
+            getattr(router, function)(*transaction)
+
+
+@pytest.mark.parametrize("case", SWAP_CASES)
+def test_swap_checks_match_router(router, weth_executor, case):
+    changes, referral_info, value, expected = case
+    args = swap_args(weth_executor.WETH(), weth_executor.address, changes, referral_info)
+    assert_router_agrees(router, "swap", args, value, expected)
+
+
+@pytest.mark.parametrize("case", SWAP_MULTI_CASES)
+def test_swap_multi_checks_match_router(router, weth_executor, case):
+    inputs, outputs, referral_info, value, expected = case
+    args = swap_multi_args(
+        weth_executor.WETH(), weth_executor.address, inputs, outputs, referral_info
+    )
+    assert_router_agrees(router, "swapMulti", args, value, expected)
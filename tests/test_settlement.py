@@ -0,0 +1,197 @@
+import random
+
+import brownie
+import pytest
+from brownie import accounts
+from odos_router_v3 import events, settlement
+from test_lib import utils
+
+
+def random_code(rng):
+    return (
+        rng.getrandbits(32)
+        + (rng.choice([0, 1, 5000, 8000, 10000, 10001]) << 32)
+        + (rng.getrandbits(1) << 48)
+    )
+
+
+def random_settlement_inputs(rng, router_address, n):
+    amounts_out = [rng.randint(1, 10**24) for i in range(n)]
+    quotes = [amount * rng.randint(9_900, 10_100) // 10_000 for amount in amounts_out]
+    amounts_min = [quote * rng.randint(9_900, 10_000) // 10_000 for quote in quotes]
+    codes = [random_code(rng) for i in range(n)]
+    fees = [rng.choice([0, 0, 1, 10**14, settlement.MAX_FEE]) for i in range(n)]
+    fee_recipients = [
+        rng.choice([utils.random_address().lower(), router_address.lower()]) for i in range(n)
+    ]
+    return amounts_out, quotes, amounts_min, codes, fees, fee_recipients
+
+
+def test_settle():
+    router_address = utils.random_address()
+    recipient = utils.random_address()
+    fee = 10**15
+
+    result = settlement.settle(
+        [10**18, 10**18, 10**18, 10**18, 10**18],
+        [10**18 // 2, 10**18 // 2, 10**18, 10**18, 10**18 // 2],
+        [1, 1, 10**18, 1, 10**18 // 2],
+        [0, 1 << 48, 0, 1 << 32, 10001 << 32],
+        [0, 0, fee, fee, fee],
+        [settlement.NULL_ADDRESS, settlement.NULL_ADDRESS, recipient, router_address, recipient],
+        router_address,
+    )
+
+    # Positive slippage is kept by the router unless bit 48 of the code is set
+    assert result.user_payout[:2] == [10**18 // 2, 10**18]
+    assert result.router_revenue[:2] == [10**18 // 2, 0]
+    assert result.slippage[:2] == [10**18 // 2, 10**18 // 2]
+
+    # The fee takes the output below the minimum
+    assert result.error[2] == "Slippage Limit Exceeded"
+    assert result.user_payout[2] == 0
+
+    # A fee sent to the router itself is not split
+    net = 10**18 * (settlement.FEE_DENOM - fee) // settlement.FEE_DENOM
+    assert result.user_payout[3] == net
+    assert result.referrer_payout[3] == 0
+    assert result.router_revenue[3] == 10**18 - net
+    assert result.slippage[3] == net - 10**18
+    assert result.error[4] == "Invalid Ref Code"
+
+    # Only _swapMulti checks the split without a fee
+    assert settlement.settle(
+        [1], [1], [1], [10001 << 32], [0], [recipient], router_address
+    ).error == [None]
+    assert settlement.settle(
+        [1], [1], [1], [10001 << 32], [0], [recipient], router_address, multi=True
+    ).error == ["Invalid Ref Code"]
+
+
+def test_settle_default_split():
+    router_address = utils.random_address()
+    result = settlement.settle(
+        [10**18], [1], None, [123], [10**16], [utils.random_address()], router_address
+    )
+    assert result.referrer_payout == [
+        10**18 * 10**16 * settlement.DEFAULT_SPLIT_BPS // (settlement.FEE_DENOM * 10000)
+    ]
+    assert sum(getattr(result, field)[0] for field in settlement.Settlements.FIELDS[:3]) == 10**18
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_replay_swap_logs(seed):
+    # Settling the inputs recovered from the logs reproduces the logged amounts exactly
+    rng = random.Random(seed)
+    router_address = utils.random_address()
+    amounts_out, quotes, amounts_min, codes, fees, fee_recipients = random_settlement_inputs(
+        rng, router_address, 2000
+    )
+    settled = settlement.settle(
+        amounts_out, quotes, amounts_min, codes, fees, fee_recipients, router_address
+    )
+
+    swaps = events.SwapColumns()
+    for i, error in enumerate(settled.error):
+        if error is None:
+            swaps.amount_out.append(settled.user_payout[i])
+            swaps.slippage.append(settled.slippage[i])
+            swaps.referral_code.append(codes[i])
+            swaps.referral_fee.append(fees[i])
+            swaps.referral_fee_recipient.append(fee_recipients[i])
+            swaps.block_number.append(i)
+    assert len(swaps) > 1000
+
+    replayed = settlement.settle_swaps(swaps, router_address)
+    assert replayed.error == [None] * len(swaps)
+    assert replayed.user_payout == swaps.amount_out
+    assert replayed.slippage == swaps.slippage
+
+    # The same history without referral fees
+    unpriced = settlement.settle_swaps(swaps, router_address, fees=[0] * len(swaps))
+    assert unpriced.referrer_payout == [0] * len(swaps)
+    assert all(
+        user >= original for user, original in zip(unpriced.user_payout, replayed.user_payout)
+    )
+
+
+def test_replay_swap_multi_logs():
+    router_address = utils.random_address()
+    swap_multis = events.SwapMultiColumns()
+    swap_multis.amounts_out = [100, 200, 300, 400]
+    swap_multis.slippage = [0, 0, -5, 7]
+    swap_multis.outputs_end = [2, 3, 4]
+    swap_multis.referral_code = [0, 10001 << 32, 1 << 48]
+    swap_multis.referral_fee = [0, 0, 0]
+    swap_multis.referral_fee_recipient = [settlement.NULL_ADDRESS] * 3
+
+    replayed = settlement.settle_swap_multis(swap_multis, router_address)
+    assert replayed.user_payout == [100, 200, 0, 400]
+    assert replayed.error == [None, None, "Invalid Ref Code", None]
+
+    # Failing one leg fails every leg of that swap
+    replayed = settlement.settle_swap_multis(swap_multis, router_address, fees=[10**15, 0, 0])
+    assert replayed.error[:2] == ["Null fee recipient"] * 2
+    assert replayed.user_payout[:2] == [0, 0]
+
+
+def test_settle_matches_router(router, weth_executor):
+    weth_address = weth_executor.WETH()
+    WETH = brownie.interface.IWETH(weth_address)
+    rng = random.Random(0)
+
+    for amount_out, _, _, code, fee, fee_recipient in zip(
+        *random_settlement_inputs(rng, router.address, 40)
+    ):
+        # The WETH executor wraps the input one to one, so the input amount is the executor output
+        amount_out = amount_out % 10**18 + 1
+        quote = amount_out * rng.randint(9_900, 10_100) // 10_000
+        amount_min = quote * rng.randint(9_900, 10_000) // 10_000
+        expected = settlement.settle(
+            [amount_out], [quote], [amount_min], [code], [fee], [fee_recipient], router.address
+        )
+
+        balances_before = [
+            WETH.balanceOf(accounts[0]),
+            WETH.balanceOf(fee_recipient),
+            WETH.balanceOf(router.address),
+        ]
+        args = [
+            [
+                "0x0000000000000000000000000000000000000000",
+                amount_out,
+                weth_executor.address,
+                weth_address,
+                quote,
+                amount_min,
+                accounts[0],
+            ],
+            "0x01",
+            weth_executor.address,
+            [
+                code,
+                fee,
+                fee_recipient
+            ],
+            {
+                "value": amount_out,
+                "from": accounts[0],
+            },
+        ]
+        if expected.error[0] is not None:
+            with brownie.reverts(expected.error[0]):
+                router.swap(*args)
+            continue
+
+        tx = router.swap(*args)
+        balances_after = [
+            WETH.balanceOf(accounts[0]),
+            WETH.balanceOf(fee_recipient),
+            WETH.balanceOf(router.address),
+        ]
+        assert tx.events["Swap"]["amountOut"] == expected.user_payout[0]
+        assert tx.events["Swap"]["slippage"] == expected.slippage[0]
+        assert balances_after[0] - balances_before[0] == expected.user_payout[0]
+        if fee_recipient != router.address.lower():
+            assert balances_after[1] - balances_before[1] == expected.referrer_payout[0]
+        assert balances_after[2] - balances_before[2] == expected.router_revenue[0]
@@ -0,0 +1,150 @@
+import pytest
+from odos_router_v3 import abi, compact, structs
+from test_lib import encode_compact, utils
+
+
+def token_info_values():
+    return (
+        compact.NULL_ADDRESS,
+        10**18 + 1,
+        utils.random_address(),
+        utils.random_address(),
+        3 * 10**9 + 7,
+        3 * 10**9,
+        utils.random_address(),
+    )
+
+
+def test_abi_encodings_match_tuples():
+    token_info = token_info_values()
+    referral_info = (123, 10**15, utils.random_address())
+    permit2 = (utils.random_address(), 3, 2**48 - 1, bytes(range(65)))
+    inputs = [(utils.random_address(), 10**18 - i, utils.random_address()) for i in range(3)]
+    outputs = [(utils.random_address(), 10**18, i + 1, utils.random_address()) for i in range(2)]
+    executor = utils.random_address()
+
+    assert abi.encode_swap(
+        structs.SwapTokenInfo(*token_info),
+        b"\x01",
+        executor,
+        structs.SwapReferralInfo(*referral_info),
+    ) == abi.encode_swap(token_info, b"\x01", executor, referral_info)
+    assert abi.encode_swap_multi_permit2(
+        structs.Permit2Info(*permit2),
+        [structs.InputTokenInfo(*token) for token in inputs],
+        [structs.OutputTokenInfo(*token) for token in outputs],
+        b"\x01" * 40,
+        executor,
+        structs.SwapReferralInfo(*referral_info),
+    ) == abi.encode_swap_multi_permit2(
+        permit2, inputs, outputs, b"\x01" * 40, executor, referral_info
+    )
+
+    # Structs unpack like the tuples they replace
+    assert tuple(structs.SwapTokenInfo(*token_info)) == token_info
+    assert structs.SwapTokenInfo(*token_info) == structs.SwapTokenInfo(*token_info)
+
+    with pytest.raises(ValueError):
+        structs.SwapReferralInfo(1 << 64, 0, compact.NULL_ADDRESS).abi_encoding
+    with pytest.raises(ValueError):
+        structs.InputTokenInfo(compact.NULL_ADDRESS, 1)
+
+
+def test_setting_a_field_invalidates_only_that_field():
+    values = token_info_values()
+    token_info = structs.SwapTokenInfo(*values)
+    encoding = token_info.abi_encoding
+    assert token_info.abi_encoding is encoding
+    words = list(token_info._abi_words)
+    compact_quote = token_info.compact_field("output_quote")
+    compact_token = token_info.compact_field("input_token")
+
+    token_info.output_quote = 5 * 10**9
+    assert token_info.abi_encoding == structs.SwapTokenInfo(
+        *values[:4], 5 * 10**9, *values[5:]
+    ).abi_encoding
+    assert [word is before for word, before in zip(token_info._abi_words, words)] == [
+        True, True, True, True, False, True, True
+    ]
+    assert token_info.compact_field("output_quote") != compact_quote
+    assert token_info.compact_field("input_token") is compact_token
+
+    referral_info = structs.SwapReferralInfo(1, 0, compact.NULL_ADDRESS)
+    assert referral_info.compact() == (1).to_bytes(8, "big") + b"\x00"
+    referral_info.fee = 10**15
+    referral_info.fee_recipient = utils.random_address()
+    assert referral_info.compact() == compact.encode_referral(
+        1, 10**15, referral_info.fee_recipient
+    )
+
+
+def test_encode_swap_compact():
+    values = token_info_values()
+    executor = utils.random_address()
+    output_token = values[3]
+    referral = (7, 10**15, utils.random_address())
+
+    token_info = structs.SwapTokenInfo(*values[:2], executor, *values[3:6], compact.NULL_ADDRESS)
+    referral_info = structs.SwapReferralInfo(*referral)
+
+    for address_list in [[], [output_token, executor]]:
+        expected = compact.SWAP_COMPACT_SELECTOR + bytes.fromhex(
+            encode_compact.construct_compact_swap_data(
+                "0x01",
+                values[0],
+                output_token,
+                values[1],
+                values[4],
+                0.01,
+                executor,
+                executor,
+                "msg.sender",
+                address_list,
+                *referral,
+            )[2:]
+        )
+        data = structs.encode_swap_compact(
+            token_info, executor, int(0xFFFFFF * 0.01), referral_info, "0x01", address_list
+        )
+        assert data == expected
+
+    decoded = compact.decode_compact_call(data, [output_token, executor])
+    assert decoded.inputs == [compact.CompactInput(values[0], values[1], executor)]
+    assert decoded.outputs[0].token == output_token
+    assert decoded.outputs[0].quote == values[4]
+
+
+def test_encode_swap_multi_compact():
+    executor = utils.random_address()
+    inputs = [(utils.random_address(), 10**18 - i, executor) for i in range(2)]
+    outputs = [(utils.random_address(), 10**9 + i, 1, compact.NULL_ADDRESS) for i in range(3)]
+    referral = (7, 0, compact.NULL_ADDRESS)
+
+    expected = compact.SWAP_MULTI_COMPACT_SELECTOR + bytes.fromhex(
+        encode_compact.construct_compact_swap_multi_data(
+            "0x" + "01" * 40,
+            [token for token, _, _ in inputs],
+            [token for token, _, _, _ in outputs],
+            [amount for _, amount, _ in inputs],
+            [quote for _, quote, _, _ in outputs],
+            0.5,
+            executor,
+            [executor, executor],
+            ["msg.sender"] * 3,
+            [],
+            *referral,
+        )[2:]
+    )
+    # A null input receiver stands for the executor
+    data = structs.encode_swap_multi_compact(
+        [
+            structs.InputTokenInfo(token, amount, compact.NULL_ADDRESS)
+            for token, amount, _ in inputs
+        ],
+        [structs.OutputTokenInfo(*token) for token in outputs],
+        executor,
+        int(0xFFFFFF * 0.5),
+        structs.SwapReferralInfo(*referral),
+        b"\x01" * 40,
+    )
+    assert data == expected
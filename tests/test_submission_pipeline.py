@@ -0,0 +1,292 @@
+import asyncio
+
+import aiohttp
+import brownie
+import pytest
+from brownie import accounts
+from odos_router_v3 import rpc, submission, transactions
+from test_lib import encode_compact, utils
+
+
+def funded_assembler(router, input_amount, count):
+    private_key = utils.random_private_key()
+    w3 = brownie.web3
+    base_fee_per_gas = w3.eth.get_block("latest").get("baseFeePerGas", 0)
+
+    assembler = transactions.TransactionAssembler(
+        private_key,
+        w3.eth.chain_id,
+        router.address,
+        2 * base_fee_per_gas + 10**9,
+        10**9,
+    )
+    accounts[0].transfer(
+        assembler.sender,
+        count * input_amount + int(1e18),
+    )
+    return assembler
+
+
+def wrap_payload(weth_executor, input_amount):
+    return encode_compact.construct_compact_swap_data(
+        "0x01",
+        "0x0000000000000000000000000000000000000000",
+        weth_executor.WETH(),
+        input_amount,
+        input_amount,
+        0.01,
+        weth_executor.address,
+        weth_executor.address,
+        "msg.sender",
+        [],
+        0,
+        0,
+        "0x0000000000000000000000000000000000000000"
+    )
+
+
+class FakeNode:
+    # Stands in for an aiohttp session. handlers maps a JSON-RPC method to a function of its
+    # params that returns the result, or raises to fail the whole request
+    def __init__(self, **handlers):
+        self.handlers = handlers
+
+    def post(self, endpoint_uri, json):
+        node = self
+
+        class Response:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                pass
+
+            def raise_for_status(self):
+                pass
+
+            async def json(self, content_type):
+                return [
+                    {"jsonrpc": "2.0", "id": item["id"], **node.respond(item)} for item in json
+                ]
+
+        return Response()
+
+    def respond(self, item):
+        result = self.handlers[item["method"]](*item["params"])
+        if isinstance(result, dict) and "message" in result:
+            return {"error": result}
+        return {"result": result}
+
+
+class SignedTransaction:
+    def __init__(self, nonce):
+        self.raw_transaction = bytes([nonce])
+        self.hash = bytes([nonce]) * 32
+
+
+def test_nonce_manager_release():
+    async def run():
+        nonces = submission.AsyncNonceManager(None, None)
+        sender = utils.random_address()
+        nonces.set(sender, 10)
+
+        allocated = [await nonces.allocate(sender) for i in range(3)]
+        assert allocated == [10, 11, 12]
+
+        # Released nonces are handed out again before new ones, lowest first
+        nonces.release(sender, 12)
+        nonces.release(sender, 10)
+        assert [await nonces.allocate(sender) for i in range(3)] == [10, 12, 13]
+
+        nonces.release(sender, 14)
+        nonces.claim(sender, 14)
+        assert await nonces.allocate(sender) == 14
+
+    asyncio.run(run())
+
+
+def test_pipeline_keeps_nonce_on_ambiguous_send():
+    sender = utils.random_address()
+
+    def send_raw_transaction(raw_transaction):
+        nonce = int(raw_transaction, 16)
+        if nonce == 0:
+            raise asyncio.TimeoutError()
+        if nonce == 1:
+            return {"code": -32000, "message": "replacement transaction underpriced"}
+        return "0x" + raw_transaction[2:] * 32
+
+    async def run():
+        node = FakeNode(
+            eth_getTransactionCount=lambda address, block: "0x0",
+            eth_sendRawTransaction=send_raw_transaction,
+            eth_getTransactionReceipt=lambda tx_hash: None,
+        )
+        pipeline = submission.SubmissionPipeline(node, "http://node", max_in_flight=1)
+        pipeline.nonces.set(sender, 0)
+
+        # A timeout leaves it unknown whether the node got nonce 0, so it stays reserved and is
+        # reported as a gap as the node has not seen it
+        with pytest.raises(asyncio.TimeoutError):
+            await pipeline.send(sender, SignedTransaction)
+        assert await pipeline.detect_gaps(sender) == [0]
+
+        # A rejection from the node hands nonce 1 out again
+        with pytest.raises(rpc.RPCError):
+            await pipeline.send(sender, SignedTransaction)
+        assert await pipeline.nonces.allocate(sender) == 1
+
+        # A caller supplied nonce is never released to the manager
+        with pytest.raises(rpc.RPCError):
+            await pipeline.send(sender, SignedTransaction, nonce=1)
+        assert pipeline.nonces.released[sender.lower()] == []
+
+        # A nonce is in flight rather than a gap while it is signed and sent. With one slot, this
+        # send only goes through if none of the failed sends kept theirs
+        def sign(nonce):
+            assert nonce in pipeline.in_flight[sender.lower()]
+            return SignedTransaction(nonce)
+
+        await asyncio.wait_for(pipeline.send(sender, sign), 5)
+        assert await pipeline.detect_gaps(sender) == [0, 1]
+        await pipeline.close()
+
+    asyncio.run(run())
+
+
+def test_pipeline_poller_survives_failed_polls():
+    sender = utils.random_address()
+    polls = []
+
+    def receipt(tx_hash):
+        polls.append(tx_hash)
+        if len(polls) < 3:
+            raise aiohttp.ClientConnectionError()
+        return {"transactionHash": tx_hash, "status": "0x1"}
+
+    async def run():
+        node = FakeNode(
+            eth_sendRawTransaction=lambda raw_transaction: "0x",
+            eth_getTransactionReceipt=receipt,
+        )
+        pipeline = submission.SubmissionPipeline(
+            node, "http://node", max_in_flight=1, poll_interval=0.001
+        )
+        pipeline.nonces.set(sender, 0)
+
+        assert (await pipeline.submit(sender, SignedTransaction, timeout=5))["status"] == "0x1"
+        assert pipeline.poller is None
+
+        # Once polls keep failing, pending transactions fail with the error instead of hanging
+        del polls[:]
+        node.handlers["eth_getTransactionReceipt"] = lambda tx_hash: 1 / 0
+        tx_hash = await asyncio.wait_for(pipeline.send(sender, SignedTransaction), 5)
+        with pytest.raises(ZeroDivisionError):
+            await pipeline.wait(tx_hash, timeout=5)
+        assert pipeline.poller is None and not pipeline.pending
+
+    asyncio.run(run())
+
+
+def test_pipeline_times_out_dropped_transactions():
+    sender = utils.random_address()
+    dropped_hash = "0x" + "00" * 32
+
+    async def run():
+        node = FakeNode(
+            eth_sendRawTransaction=lambda raw_transaction: "0x",
+            eth_getTransactionReceipt=lambda tx_hash: (
+                None if tx_hash == dropped_hash else {"transactionHash": tx_hash, "status": "0x1"}
+            ),
+        )
+        pipeline = submission.SubmissionPipeline(
+            node, "http://node", max_in_flight=2, poll_interval=0.001, receipt_timeout=0.05
+        )
+        pipeline.nonces.set(sender, 0)
+
+        # A transaction the node dropped fails once its deadline passes and gives its nonce back
+        assert await pipeline.send(sender, SignedTransaction) == dropped_hash
+        with pytest.raises(TimeoutError):
+            await pipeline.wait(dropped_hash, timeout=5)
+        assert await pipeline.nonces.allocate(sender) == 0
+
+        # Receipts nobody waits for are only kept for the last max_in_flight transactions
+        tx_hashes = [await pipeline.send(sender, SignedTransaction) for i in range(5)]
+        while pipeline.pending:
+            await asyncio.sleep(0.001)
+        assert not pipeline.receipts
+        assert list(pipeline.resolved) == tx_hashes[-2:]
+        assert (await pipeline.wait(tx_hashes[-1]))["status"] == "0x1"
+        assert list(pipeline.resolved) == tx_hashes[-2:-1]
+        with pytest.raises(KeyError):
+            await pipeline.wait(tx_hashes[0])
+
+    asyncio.run(run())
+
+
+def test_pipeline_concurrent_swaps(router, weth_executor):
+    input_amount = int(1e15)
+    count = 20
+
+    assembler = funded_assembler(router, input_amount, count)
+    payload = bytes.fromhex(wrap_payload(weth_executor, input_amount)[2:])
+
+    def sign(nonce):
+        return assembler.swap_compact(payload, input_amount, 1_000_000, nonce=nonce)
+
+    async def run():
+        async with submission.pooled_session() as session:
+            pipeline = submission.SubmissionPipeline(
+                session, brownie.web3.provider.endpoint_uri, poll_interval=0.01
+            )
+            receipts = await asyncio.gather(
+                *[pipeline.submit(assembler.sender, sign, timeout=60) for i in range(count)]
+            )
+            await pipeline.close()
+            return receipts
+
+    receipts = asyncio.run(run())
+
+    assert [int(receipt["status"], 16) for receipt in receipts] == [1] * count
+    assert brownie.web3.eth.get_transaction_count(assembler.sender) == count
+
+    WETH = brownie.interface.IWETH(weth_executor.WETH())
+    assert WETH.balanceOf(assembler.sender) == count * input_amount
+
+
+def test_pipeline_refills_gaps(router, weth_executor):
+    input_amount = int(1e15)
+
+    assembler = funded_assembler(router, input_amount, 2)
+    payload = bytes.fromhex(wrap_payload(weth_executor, input_amount)[2:])
+
+    def sign(nonce):
+        return assembler.swap_compact(payload, input_amount, 1_000_000, nonce=nonce)
+
+    def sign_self_transfer(nonce):
+        return assembler.sign(assembler.sender, b"", 0, 21000, nonce=nonce)
+
+    async def run():
+        async with submission.pooled_session() as session:
+            pipeline = submission.SubmissionPipeline(
+                session, brownie.web3.provider.endpoint_uri, poll_interval=0.01
+            )
+            # A transaction that was signed but never reached the node leaves a gap
+            lost_nonce = await pipeline.nonces.allocate(assembler.sender)
+            stuck = await pipeline.send(assembler.sender, sign)
+
+            assert await pipeline.detect_gaps(assembler.sender) == [lost_nonce]
+
+            (filler,) = await pipeline.refill_gaps(assembler.sender, sign_self_transfer)
+            receipts = await asyncio.gather(
+                pipeline.wait(filler, timeout=60), pipeline.wait(stuck, timeout=60)
+            )
+            assert await pipeline.detect_gaps(assembler.sender) == []
+
+            await pipeline.close()
+            return receipts
+
+    receipts = asyncio.run(run())
+
+    assert [int(receipt["status"], 16) for receipt in receipts] == [1, 1]
+    assert brownie.web3.eth.get_transaction_count(assembler.sender) == 2
@@ -1,8 +1,6 @@
-import json
 import random
 
 import brownie
-import pytest
 from brownie import accounts
 from eth_account import Account
 from hexbytes import HexBytes
@@ -10,31 +8,6 @@ from test_lib import encode_compact, permit2, utils
 from web3 import Web3
 
 
-@pytest.fixture
-def router():
-    return brownie.OdosRouterV3.deploy(
-        accounts[0].address,
-        {
-            "from": accounts[0],
-        },
-    )
-
-
-@pytest.fixture
-def weth_executor():
-    WETH = brownie.WETH9.deploy(
-        {
-            "from": accounts[0],
-        }
-    )
-    return brownie.OdosWETHExecutor.deploy(
-        WETH.address,
-        {
-            "from": accounts[0],
-        },
-    )
-
-
 def test_swap_wrong_msg_value_zero(router, weth_executor):
     weth_address = weth_executor.WETH()
     input_amount = int(1e18)
@@ -695,15 +668,10 @@ def test_swap_referral_fee_no_transfer(router, weth_executor):
     )
 
 
-def test_swap_permit2(router, weth_executor):
+def test_swap_permit2(router, weth_executor, permit2_contract):
     weth_address = weth_executor.WETH()
     input_amount = int(1e18)
 
-    PERMIT2 = brownie.Permit2.deploy(
-        {
-            "from": accounts[0],
-        }
-    )
     WETH = brownie.interface.IWETH(weth_address)
 
     # Use accounts to sign and send EIP712 signature for Permit2
@@ -740,7 +708,7 @@ def test_swap_permit2(router, weth_executor):
     )
     # Approve WETH for use by Permit2
     WETH.approve(
-        PERMIT2.address,
+        permit2_contract.address,
         input_amount,
         {
             "from": this_account,
@@ -754,7 +722,7 @@ def test_swap_permit2(router, weth_executor):
     )
     message = permit2.SignableMessage(
         HexBytes("0x1"),
-        HexBytes(PERMIT2.DOMAIN_SEPARATOR()),
+        HexBytes(permit2_contract.DOMAIN_SEPARATOR()),
         HexBytes(permit2_sign_hash),
     )
     signed_message = Account.sign_message(message, private_key=private_key)
@@ -763,7 +731,7 @@ def test_swap_permit2(router, weth_executor):
     balance_before = accounts[0].balance()
 
     router.swapPermit2(
-        [PERMIT2.address, permit2_nonce, permit2_deadline, signature],
+        [permit2_contract.address, permit2_nonce, permit2_deadline, signature],
         [
             weth_address,
             input_amount,
@@ -787,15 +755,10 @@ def test_swap_permit2(router, weth_executor):
     )
     assert accounts[0].balance() - balance_before == input_amount
 
-def test_swap_permit2_hook(router, weth_executor):
+def test_swap_permit2_hook(router, weth_executor, permit2_contract):
     weth_address = weth_executor.WETH()
     input_amount = int(1e18)
 
-    PERMIT2 = brownie.Permit2.deploy(
-        {
-            "from": accounts[0],
-        }
-    )
     TRANSFER_HOOK = brownie.OdosTransferHook.deploy(
         {
             "from": accounts[0],
@@ -837,7 +800,7 @@ def test_swap_permit2_hook(router, weth_executor):
     )
     # Approve WETH for use by Permit2
     WETH.approve(
-        PERMIT2.address,
+        permit2_contract.address,
         input_amount,
         {
             "from": this_account,
@@ -851,7 +814,7 @@ def test_swap_permit2_hook(router, weth_executor):
     )
     message = permit2.SignableMessage(
         HexBytes("0x1"),
-        HexBytes(PERMIT2.DOMAIN_SEPARATOR()),
+        HexBytes(permit2_contract.DOMAIN_SEPARATOR()),
         HexBytes(permit2_sign_hash),
     )
     signed_message = Account.sign_message(message, private_key=private_key)
@@ -860,7 +823,7 @@ def test_swap_permit2_hook(router, weth_executor):
     balance_before = accounts[0].balance()
 
     router.swapPermit2WithHook(
-        [PERMIT2.address, permit2_nonce, permit2_deadline, signature],
+        [permit2_contract.address, permit2_nonce, permit2_deadline, signature],
         [
             weth_address,
             input_amount,
@@ -887,6 +850,269 @@ def test_swap_permit2_hook(router, weth_executor):
     assert accounts[0].balance() - balance_before == input_amount
 
 
+def test_swap_permit2_allowance(router, weth_executor, permit2_contract):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e18)
+
+    WETH = brownie.interface.IWETH(weth_address)
+
+    # Use accounts to sign and send EIP712 signature for Permit2
+    private_key = utils.random_private_key()
+    this_account = Account.from_key(private_key).address
+
+    # Get WETH into the account
+    router.swap(
+        [
+            "0x0000000000000000000000000000000000000000",
+            input_amount * 2,
+            weth_executor.address,
+            weth_address,
+            input_amount * 2,
+            input_amount * 2,
+            this_account,
+        ],
+        "0x0100000000000000000000000000000000000000000000000000000000000000",
+        weth_executor.address,
+        [
+            0,
+            0,
+            "0x0000000000000000000000000000000000000000"
+        ],
+        {
+            "value": input_amount * 2,
+            "from": accounts[0],
+        },
+    )
+    # Transfer ETH into the account
+    accounts[0].transfer(
+        this_account,
+        int(1e18),
+    )
+    # Approve WETH for use by Permit2
+    WETH.approve(
+        permit2_contract.address,
+        input_amount * 2,
+        {
+            "from": this_account,
+        },
+    )
+    # Create the one-time Permit2 allowance signature for the router
+    permit2_nonce = 0
+    permit2_expiration = (1 << 48) - 1
+    permit2_sig_deadline = (1 << 48) - 1
+    permit2_sign_hash = permit2.single_permit2_allowance_hash(
+        weth_address,
+        input_amount * 2,
+        permit2_expiration,
+        permit2_nonce,
+        router.address,
+        permit2_sig_deadline,
+    )
+    message = permit2.SignableMessage(
+        HexBytes("0x1"),
+        HexBytes(permit2_contract.DOMAIN_SEPARATOR()),
+        HexBytes(permit2_sign_hash),
+    )
+    signed_message = Account.sign_message(message, private_key=private_key)
+    signature = signed_message.signature.hex()
+
+    # permit is overloaded on struct arguments, so select the PermitSingle variant by signature
+    brownie.web3.eth.contract(
+        abi=permit2_contract.abi, address=permit2_contract.address
+    ).get_function_by_signature(
+        "permit(address,((address,uint160,uint48,uint48),address,uint256),bytes)"
+    )(
+        this_account,
+        (
+            (weth_address, input_amount * 2, permit2_expiration, permit2_nonce),
+            router.address,
+            permit2_sig_deadline,
+        ),
+        signature,
+    ).transact(
+        {
+            "from": accounts[0].address,
+        }
+    )
+    # The standing allowance is reused for every swap without a new signature
+    for i in range(2):
+        balance_before = accounts[0].balance()
+
+        router.swapPermit2Allowance(
+            permit2_contract.address,
+            [
+                weth_address,
+                input_amount,
+                weth_executor.address,
+                "0x0000000000000000000000000000000000000000",
+                input_amount,
+                input_amount,
+                accounts[0],
+            ],
+            "0x0000000000000000000000000000000000000000000000000000000000000000",
+            weth_executor.address,
+            [
+                0,
+                0,
+                "0x0000000000000000000000000000000000000000"
+            ],
+            {
+                "value": 0,
+                "from": this_account,
+            },
+        )
+        assert accounts[0].balance() - balance_before == input_amount
+
+    assert permit2_contract.allowance(this_account, weth_address, router.address)[0] == 0
+
+
+def test_swap_permit2_allowance_gas(router, weth_executor, permit2_contract):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e18)
+
+    WETH = brownie.interface.IWETH(weth_address)
+
+    private_key = utils.random_private_key()
+    this_account = Account.from_key(private_key).address
+
+    # Get WETH into the account for two swaps through each path
+    router.swap(
+        [
+            "0x0000000000000000000000000000000000000000",
+            input_amount * 4,
+            weth_executor.address,
+            weth_address,
+            input_amount * 4,
+            input_amount * 4,
+            this_account,
+        ],
+        "0x0100000000000000000000000000000000000000000000000000000000000000",
+        weth_executor.address,
+        [
+            0,
+            0,
+            "0x0000000000000000000000000000000000000000"
+        ],
+        {
+            "value": input_amount * 4,
+            "from": accounts[0],
+        },
+    )
+    # Transfer ETH into the account
+    accounts[0].transfer(
+        this_account,
+        int(1e18),
+    )
+    WETH.approve(
+        permit2_contract.address,
+        input_amount * 4,
+        {
+            "from": this_account,
+        },
+    )
+    swap_token_info = [
+        weth_address,
+        input_amount,
+        weth_executor.address,
+        "0x0000000000000000000000000000000000000000",
+        input_amount,
+        input_amount,
+        accounts[0],
+    ]
+    # Signature transfers pay for a fresh signature and nonce on every swap
+    signature_gas_used = []
+    permit2_deadline = (1 << 48) - 1
+
+    for permit2_nonce in range(2):
+        permit2_sign_hash = permit2.single_permit2_hash(
+            weth_address, input_amount, router.address, permit2_nonce, permit2_deadline
+        )
+        message = permit2.SignableMessage(
+            HexBytes("0x1"),
+            HexBytes(permit2_contract.DOMAIN_SEPARATOR()),
+            HexBytes(permit2_sign_hash),
+        )
+        signed_message = Account.sign_message(message, private_key=private_key)
+
+        tx = router.swapPermit2(
+            [
+                permit2_contract.address,
+                permit2_nonce,
+                permit2_deadline,
+                signed_message.signature.hex(),
+            ],
+            swap_token_info,
+            "0x0000000000000000000000000000000000000000000000000000000000000000",
+            weth_executor.address,
+            [
+                0,
+                0,
+                "0x0000000000000000000000000000000000000000"
+            ],
+            {
+                "value": 0,
+                "from": this_account,
+            },
+        )
+        signature_gas_used.append(tx.gas_used)
+
+    # Allowance transfers only pay for the permit once
+    permit2_sign_hash = permit2.single_permit2_allowance_hash(
+        weth_address,
+        input_amount * 2,
+        permit2_deadline,
+        0,
+        router.address,
+        permit2_deadline,
+    )
+    message = permit2.SignableMessage(
+        HexBytes("0x1"),
+        HexBytes(permit2_contract.DOMAIN_SEPARATOR()),
+        HexBytes(permit2_sign_hash),
+    )
+    signed_message = Account.sign_message(message, private_key=private_key)
+
+    brownie.web3.eth.contract(
+        abi=permit2_contract.abi, address=permit2_contract.address
+    ).get_function_by_signature(
+        "permit(address,((address,uint160,uint48,uint48),address,uint256),bytes)"
+    )(
+        this_account,
+        (
+            (weth_address, input_amount * 2, permit2_deadline, 0),
+            router.address,
+            permit2_deadline,
+        ),
+        signed_message.signature.hex(),
+    ).transact(
+        {
+            "from": accounts[0].address,
+        }
+    )
+    allowance_gas_used = []
+
+    for i in range(2):
+        tx = router.swapPermit2Allowance(
+            permit2_contract.address,
+            swap_token_info,
+            "0x0000000000000000000000000000000000000000000000000000000000000000",
+            weth_executor.address,
+            [
+                0,
+                0,
+                "0x0000000000000000000000000000000000000000"
+            ],
+            {
+                "value": 0,
+                "from": this_account,
+            },
+        )
+        allowance_gas_used.append(tx.gas_used)
+
+    # Compare the repeat swaps so neither path pays for first-time storage writes
+    assert allowance_gas_used[1] < signature_gas_used[1]
+
+
 def test_swap_compact_max(router, weth_executor):
     weth_address = weth_executor.WETH()
     input_amount = int(1e18)
@@ -906,10 +1132,7 @@ def test_swap_compact_max(router, weth_executor):
     WETH = brownie.interface.IWETH(weth_address)
     balance_before = WETH.balanceOf(test_account.address)
 
-    with open("build/contracts/OdosRouterV3.json", "r") as f:
-        router_v2_contract = w3.eth.contract(
-            abi=json.load(f)["abi"], address=router.address
-        )
+    router_v2_contract = w3.eth.contract(abi=brownie.OdosRouterV3.abi, address=router.address)
     compact_router_data = encode_compact.construct_compact_swap_data(
         "0x01",
         "0x0000000000000000000000000000000000000000",
@@ -999,10 +1222,7 @@ def test_swap_compact_transfer(router, weth_executor):
     WETH = brownie.interface.IWETH(weth_address)
     balance_before = WETH.balanceOf(accounts[1].address)
 
-    with open("build/contracts/OdosRouterV3.json", "r") as f:
-        router_v2_contract = w3.eth.contract(
-            abi=json.load(f)["abi"], address=router.address
-        )
+    router_v2_contract = w3.eth.contract(abi=brownie.OdosRouterV3.abi, address=router.address)
     compact_router_data = encode_compact.construct_compact_swap_data(
         "0x01",
         "0x0000000000000000000000000000000000000000",
@@ -1061,10 +1281,7 @@ def test_swap_compact_address_list(router, weth_executor):
     WETH = brownie.interface.IWETH(weth_address)
     balance_before = WETH.balanceOf(test_account.address)
 
-    with open("build/contracts/OdosRouterV3.json", "r") as f:
-        router_v2_contract = w3.eth.contract(
-            abi=json.load(f)["abi"], address=router.address
-        )
+    router_v2_contract = w3.eth.contract(abi=brownie.OdosRouterV3.abi, address=router.address)
     compact_multi_router_data = encode_compact.construct_compact_swap_data(
         "0x01",
         "0x0000000000000000000000000000000000000000",
@@ -1129,10 +1346,7 @@ def test_swap_compact_referral_fee(router, weth_executor):
     router_balance_before = WETH.balanceOf(router.address)
     beneficiary_balance_before = WETH.balanceOf(referral_beneficiary)
 
-    with open("build/contracts/OdosRouterV3.json", "r") as f:
-        router_v2_contract = w3.eth.contract(
-            abi=json.load(f)["abi"], address=router.address
-        )
+    router_v2_contract = w3.eth.contract(abi=brownie.OdosRouterV3.abi, address=router.address)
     compact_router_data = encode_compact.construct_compact_swap_data(
         "0x01",
         "0x0000000000000000000000000000000000000000",
@@ -1,8 +1,6 @@
-import json
 import random
 
 import brownie
-import pytest
 from brownie import accounts
 from eth_account import Account
 from hexbytes import HexBytes
@@ -10,31 +8,6 @@ from test_lib import encode_compact, permit2, utils
 from web3 import Web3
 
 
-@pytest.fixture
-def router():
-    return brownie.OdosRouterV3.deploy(
-        accounts[0].address,
-        {
-            "from": accounts[0],
-        },
-    )
-
-
-@pytest.fixture
-def weth_executor():
-    WETH = brownie.WETH9.deploy(
-        {
-            "from": accounts[0],
-        }
-    )
-    return brownie.OdosWETHExecutor.deploy(
-        WETH.address,
-        {
-            "from": accounts[0],
-        },
-    )
-
-
 def test_swap_invalid_msg_value(router, weth_executor):
     weth_address = weth_executor.WETH()
     input_amount = int(1e18)
@@ -703,15 +676,10 @@ def test_swap_referral_fee_no_transfer(router, weth_executor):
     )
 
 
-def test_batch_swap_permit2(router, weth_executor):
+def test_batch_swap_permit2(router, weth_executor, permit2_contract):
     weth_address = weth_executor.WETH()
     input_amount = int(1e18)
 
-    PERMIT2 = brownie.Permit2.deploy(
-        {
-            "from": accounts[0],
-        }
-    )
     WETH = brownie.interface.IWETH(weth_address)
 
     # Use accounts to sign and send EIP712 signature for Permit2
@@ -743,7 +711,7 @@ def test_batch_swap_permit2(router, weth_executor):
     )
     # Approve WETH for use by Permit2
     WETH.approve(
-        PERMIT2.address,
+        permit2_contract.address,
         input_amount,
         {
             "from": this_account,
@@ -757,7 +725,7 @@ def test_batch_swap_permit2(router, weth_executor):
     )
     message = permit2.SignableMessage(
         HexBytes("0x1"),
-        HexBytes(PERMIT2.DOMAIN_SEPARATOR()),
+        HexBytes(permit2_contract.DOMAIN_SEPARATOR()),
         HexBytes(permit2_sign_hash),
     )
     signed_message = Account.sign_message(message, private_key=private_key)
@@ -770,7 +738,7 @@ def test_batch_swap_permit2(router, weth_executor):
     router_balance_before = router.balance()
 
     router.swapMultiPermit2(
-        [PERMIT2.address, permit2_nonce, permit2_deadline, signature],
+        [permit2_contract.address, permit2_nonce, permit2_deadline, signature],
         [[weth_address, input_amount, weth_executor.address]],
         [
             [
@@ -795,15 +763,10 @@ def test_batch_swap_permit2(router, weth_executor):
     assert accounts[0].balance() - user_balance_before == expected_user_delta
     assert router.balance() - router_balance_before == expected_router_delta
 
-def test_batch_swap_permit2_with_hook(router, weth_executor):
+def test_batch_swap_permit2_with_hook(router, weth_executor, permit2_contract):
     weth_address = weth_executor.WETH()
     input_amount = int(1e18)
 
-    PERMIT2 = brownie.Permit2.deploy(
-        {
-            "from": accounts[0],
-        }
-    )
     TRANSFER_HOOK = brownie.OdosTransferHook.deploy(
         {
             "from": accounts[0],
@@ -840,7 +803,7 @@ def test_batch_swap_permit2_with_hook(router, weth_executor):
     )
     # Approve WETH for use by Permit2
     WETH.approve(
-        PERMIT2.address,
+        permit2_contract.address,
         input_amount,
         {
             "from": this_account,
@@ -854,7 +817,7 @@ def test_batch_swap_permit2_with_hook(router, weth_executor):
     )
     message = permit2.SignableMessage(
         HexBytes("0x1"),
-        HexBytes(PERMIT2.DOMAIN_SEPARATOR()),
+        HexBytes(permit2_contract.DOMAIN_SEPARATOR()),
         HexBytes(permit2_sign_hash),
     )
     signed_message = Account.sign_message(message, private_key=private_key)
@@ -867,7 +830,7 @@ def test_batch_swap_permit2_with_hook(router, weth_executor):
     router_balance_before = router.balance()
 
     router.swapMultiPermit2WithHook(
-        [PERMIT2.address, permit2_nonce, permit2_deadline, signature],
+        [permit2_contract.address, permit2_nonce, permit2_deadline, signature],
         [[weth_address, input_amount, weth_executor.address]],
         [
             [
@@ -895,6 +858,123 @@ def test_batch_swap_permit2_with_hook(router, weth_executor):
     assert router.balance() - router_balance_before == expected_router_delta
 
 
+def test_batch_swap_permit2_allowance(router, weth_executor, permit2_contract):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e18)
+
+    WETH = brownie.interface.IWETH(weth_address)
+
+    # Use accounts to sign and send EIP712 signature for Permit2
+    private_key = utils.random_private_key()
+    this_account = Account.from_key(private_key).address
+
+    # Get WETH into the account
+    router.swap(
+        [
+            "0x0000000000000000000000000000000000000000",
+            input_amount,
+            weth_executor.address,
+            weth_address,
+            input_amount,
+            input_amount,
+            this_account,
+        ],
+        "0x0100000000000000000000000000000000000000000000000000000000000000",
+        weth_executor.address,
+        [
+            0,
+            0,
+            "0x0000000000000000000000000000000000000000"
+        ],
+        {
+            "value": input_amount,
+            "from": accounts[0],
+        },
+    )
+    # Transfer ETH into the account
+    accounts[0].transfer(
+        this_account,
+        int(1e18),
+    )
+    # Approve WETH for use by Permit2
+    WETH.approve(
+        permit2_contract.address,
+        input_amount,
+        {
+            "from": this_account,
+        },
+    )
+    # Create the one-time Permit2 allowance signature for the router
+    permit2_nonce = 0
+    permit2_expiration = (1 << 48) - 1
+    permit2_sig_deadline = (1 << 48) - 1
+    permit2_sign_hash = permit2.batch_permit2_allowance_hash(
+        [weth_address],
+        [input_amount],
+        permit2_expiration,
+        [permit2_nonce],
+        router.address,
+        permit2_sig_deadline,
+    )
+    message = permit2.SignableMessage(
+        HexBytes("0x1"),
+        HexBytes(permit2_contract.DOMAIN_SEPARATOR()),
+        HexBytes(permit2_sign_hash),
+    )
+    signed_message = Account.sign_message(message, private_key=private_key)
+    signature = signed_message.signature.hex()
+
+    # permit is overloaded on struct arguments, so select the PermitBatch variant by signature
+    brownie.web3.eth.contract(
+        abi=permit2_contract.abi, address=permit2_contract.address
+    ).get_function_by_signature(
+        "permit(address,((address,uint160,uint48,uint48)[],address,uint256),bytes)"
+    )(
+        this_account,
+        (
+            [(weth_address, input_amount, permit2_expiration, permit2_nonce)],
+            router.address,
+            permit2_sig_deadline,
+        ),
+        signature,
+    ).transact(
+        {
+            "from": accounts[0].address,
+        }
+    )
+    expected_user_delta = input_amount
+    expected_router_delta = input_amount - expected_user_delta
+
+    user_balance_before = accounts[0].balance()
+    router_balance_before = router.balance()
+
+    router.swapMultiPermit2Allowance(
+        permit2_contract.address,
+        [[weth_address, input_amount, weth_executor.address]],
+        [
+            [
+                "0x0000000000000000000000000000000000000000",
+                expected_user_delta,
+                expected_user_delta,
+                accounts[0],
+            ]
+        ],
+        "0x0000000000000000000000000000000000000000000000000000000000000000",
+        weth_executor.address,
+        [
+            0,
+            0,
+            "0x0000000000000000000000000000000000000000"
+        ],
+        {
+            "value": 0,
+            "from": this_account,
+        },
+    )
+    assert accounts[0].balance() - user_balance_before == expected_user_delta
+    assert router.balance() - router_balance_before == expected_router_delta
+
+
 def test_swap_compact_max(router, weth_executor):
     weth_address = weth_executor.WETH()
     input_amount = int(1e18)
@@ -915,10 +995,7 @@ def test_swap_compact_max(router, weth_executor):
     user_balance_before = WETH.balanceOf(test_account.address)
     router_balance_before = WETH.balanceOf(router.address)
 
-    with open("build/contracts/OdosRouterV3.json", "r") as f:
-        router_v2_contract = w3.eth.contract(
-            abi=json.load(f)["abi"], address=router.address
-        )
+    router_v2_contract = w3.eth.contract(abi=brownie.OdosRouterV3.abi, address=router.address)
     compact_router_data = encode_compact.construct_compact_swap_multi_data(
         "0x01",
         ["0x0000000000000000000000000000000000000000"],
@@ -1028,10 +1105,7 @@ def test_swap_compact_transfer(router, weth_executor):
     user_balance_before = WETH.balanceOf(accounts[1])
     router_balance_before = WETH.balanceOf(router.address)
 
-    with open("build/contracts/OdosRouterV3.json", "r") as f:
-        router_v2_contract = w3.eth.contract(
-            abi=json.load(f)["abi"], address=router.address
-        )
+    router_v2_contract = w3.eth.contract(abi=brownie.OdosRouterV3.abi, address=router.address)
     compact_router_data = encode_compact.construct_compact_swap_multi_data(
         "0x01",
         ["0x0000000000000000000000000000000000000000"],
@@ -1096,10 +1170,7 @@ def test_swap_compact_address_list(router, weth_executor):
     user_balance_before = WETH.balanceOf(test_account.address)
     router_balance_before = WETH.balanceOf(router.address)
 
-    with open("build/contracts/OdosRouterV3.json", "r") as f:
-        router_v2_contract = w3.eth.contract(
-            abi=json.load(f)["abi"], address=router.address
-        )
+    router_v2_contract = w3.eth.contract(abi=brownie.OdosRouterV3.abi, address=router.address)
     compact_router_data = encode_compact.construct_compact_swap_multi_data(
         "0x01",
         ["0x0000000000000000000000000000000000000000"],
@@ -1168,10 +1239,7 @@ def test_swap_compact_referral_fee(router, weth_executor):
     router_balance_before = WETH.balanceOf(router.address)
     beneficiary_balance_before = WETH.balanceOf(referral_beneficiary)
 
-    with open("build/contracts/OdosRouterV3.json", "r") as f:
-        router_v2_contract = w3.eth.contract(
-            abi=json.load(f)["abi"], address=router.address
-        )
+    router_v2_contract = w3.eth.contract(abi=brownie.OdosRouterV3.abi, address=router.address)
     compact_router_data = encode_compact.construct_compact_swap_multi_data(
         "0x01",
         ["0x0000000000000000000000000000000000000000"],
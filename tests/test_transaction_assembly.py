@@ -0,0 +1,172 @@
+import brownie
+import pytest
+import rlp
+from brownie import accounts
+from eth_account import Account
+from odos_router_v3 import gas, transactions
+from test_lib import encode_compact, utils
+from web3 import Web3
+
+
+def test_rlp_encode():
+    for item in [
+        b"",
+        b"\x00",
+        b"\x7f",
+        b"\x80",
+        b"dog",
+        b"a" * 55,
+        b"a" * 56,
+        b"a" * 1024,
+        [],
+        [b"cat", b"dog"],
+        [[], [[]], [[], [[]]]],
+        [b"a" * 60, [b"b" * 60]],
+    ]:
+        assert transactions.rlp_encode(item) == rlp.encode(item)
+
+    for value in [0, 1, 127, 128, 1024, 2**256 - 1]:
+        assert transactions.rlp_encode(value) == rlp.encode(value)
+
+
+def test_sign_matches_eth_account():
+    private_key = utils.random_private_key()
+    router_address = Web3.to_checksum_address(utils.random_address())
+
+    assembler = transactions.TransactionAssembler(private_key, 1337, router_address, 10**10, 10**9)
+    assembler.nonce_tracker.set(assembler.sender, 5)
+
+    tx_access_list = [
+        {
+            "address": Web3.to_checksum_address(utils.random_address()),
+            "storageKeys": [utils.random_hex_string(32), utils.random_hex_string(32)],
+        }
+    ]
+    payload = utils.random_hex_string(100)
+
+    for multi in [False, True]:
+        build = assembler.swap_multi_compact if multi else assembler.swap_compact
+        signed = build(payload, 7, 200_000, tx_access_list)
+
+        expected = Account.sign_transaction(
+            {
+                "type": 2,
+                "chainId": 1337,
+                "nonce": signed.nonce,
+                "maxFeePerGas": 10**10,
+                "maxPriorityFeePerGas": 10**9,
+                "gas": 200_000,
+                "to": router_address,
+                "value": 7,
+                "data": ("0x84a7f3dd" if multi else "0x83bd37f9") + payload[2:],
+                "accessList": tx_access_list,
+            },
+            private_key,
+        )
+        assert signed.raw_transaction == expected.rawTransaction
+        assert signed.hash == expected.hash
+
+    # Nonces are handed out locally in order
+    assert assembler.nonce_tracker.next(assembler.sender) == 7
+
+
+def test_nonce_tracker():
+    tracker = transactions.NonceTracker()
+    sender = utils.random_address()
+
+    with pytest.raises(ValueError):
+        tracker.next(sender)
+
+    tracker.set(sender.upper().replace("0X", "0x"), 3)
+    assert [tracker.next(sender) for i in range(3)] == [3, 4, 5]
+
+    tracker.reset(sender)
+    with pytest.raises(ValueError):
+        tracker.next(sender)
+
+
+def test_predicted_gas():
+    assembler = transactions.TransactionAssembler(
+        utils.random_private_key(), 1, utils.random_address(), 10**10, 10**9
+    )
+    assembler.nonce_tracker.set(assembler.sender, 0)
+
+    payload = encode_compact.construct_compact_swap_data(
+        "0x01",
+        "0x0000000000000000000000000000000000000000",
+        utils.random_address(),
+        10**15,
+        10**15,
+        0.01,
+        utils.random_address(),
+        utils.random_address(),
+        "msg.sender",
+        [],
+        0,
+        0,
+        "0x0000000000000000000000000000000000000000"
+    )
+    with pytest.raises(ValueError):
+        assembler.swap_compact(payload)
+
+    assembler.gas_model = gas.GasModel({"swapCompact": 50_000}, [0] * 7, max_under=100)
+    signed = assembler.swap_compact(payload)
+
+    data = "0x83bd37f9" + payload[2:]
+    assert signed.gas == gas.intrinsic_gas(data) + 50_000 + 100
+
+
+def test_send_assembled_swap_compact(router, weth_executor):
+    weth_address = weth_executor.WETH()
+    input_amount = int(1e18)
+
+    private_key = utils.random_private_key()
+    test_account = Account.from_key(private_key)
+
+    accounts[0].transfer(
+        test_account.address,
+        3 * input_amount,
+    )
+    WETH = brownie.interface.IWETH(weth_address)
+
+    compact_router_data = encode_compact.construct_compact_swap_data(
+        "0x01",
+        "0x0000000000000000000000000000000000000000",
+        weth_address,
+        input_amount,
+        input_amount,
+        0.01,
+        weth_executor.address,
+        weth_executor.address,
+        "msg.sender",
+        [],
+        0,
+        0,
+        "0x0000000000000000000000000000000000000000"
+    )
+    w3 = brownie.web3
+    base_fee_per_gas = w3.eth.get_block("latest").get("baseFeePerGas", 0)
+
+    assembler = transactions.TransactionAssembler.from_node(
+        w3.provider.endpoint_uri,
+        private_key,
+        router.address,
+        2 * base_fee_per_gas + 10**9,
+        10**9,
+    )
+    assert assembler.chain_id == w3.eth.chain_id
+
+    # Both transactions are signed before either is sent, without asking the node for a nonce
+    signed = [
+        assembler.swap_compact(compact_router_data, input_amount, 10_000_000) for i in range(2)
+    ]
+    assert [tx.nonce for tx in signed] == [0, 1]
+
+    for tx in signed:
+        receipt = w3.eth.wait_for_transaction_receipt(
+            w3.eth.send_raw_transaction(tx.raw_transaction)
+        )
+        assert receipt.status == 1
+        assert receipt.transactionHash == tx.hash
+
+    assert WETH.balanceOf(test_account.address) == 2 * input_amount